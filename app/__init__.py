@@ -10,11 +10,57 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     
+    from app.utils.serializacion import ProveedorJSON
+    app.json = ProveedorJSON(app)
+    
     from app.models import db
     db.init_app(app)
     
+    from app.utils.replicas import enrutador_replicas
+    enrutador_replicas.init_app(app)
+    
+    from app.utils.metricas import metricas
+    metricas.init_app(app)
+    
+    from app.utils.compresion import compresion
+    compresion.init_app(app)
+    
+    from app.utils.admision import control_admision
+    control_admision.init_app(app)
+    
+    from app.utils.estadisticas import Estadisticas
+    Estadisticas.registrar()
+    
+    from app.utils import versiones
+    versiones.registrar()
+    
+    from app.utils.eventos import Eventos, despachador_eventos
+    Eventos.registrar()
+    despachador_eventos.init_app(app)
+    
+    from app.utils.posiciones import indice_posiciones
+    indice_posiciones.init_app(app)
+    
     login_manager.init_app(app)
     
+    from app.utils.cache_comprobantes import cache_comprobantes
+    cache_comprobantes.init_app(app)
+    
+    from app.utils.trabajos import cola_trabajos
+    cola_trabajos.init_app(app)
+    
+    from app.utils.catalogo import catalogo_municipios
+    catalogo_municipios.init_app(app)
+    
+    from app.utils.cache_usuarios import cache_usuarios
+    cache_usuarios.init_app(app)
+    
+    from app.utils.analitica import analitica_turnos
+    analitica_turnos.init_app(app)
+    
+    from app.utils.graficas import graficas_dashboard
+    graficas_dashboard.init_app(app)
+    
     from app.routes import main_bp
     from app.auth import auth_bp
     from app.api.routes import api_bp
@@ -23,9 +69,15 @@ def create_app():
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    from app.cli import registrar_comandos
+    registrar_comandos(app)
+    
+    if app.config['PRECARGAR_MODULOS']:
+        from app.utils.arranque import calentar
+        calentar(app)
+    
     @login_manager.user_loader
     def load_user(user_id):
-        from app.models import Usuario
-        return Usuario.query.get(int(user_id))
+        return cache_usuarios.obtener(int(user_id))
     
     return app
\ No newline at end of file
@@ -1,42 +1,118 @@
-from flask import Blueprint, request, jsonify
-from app.models import db, Ticket, Municipio
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context, send_file, url_for
+from flask_login import current_user
+from app.models import db, Ticket, Municipio, Trabajo
 from app.utils.turno_manager import TurnoManager
+from app.utils.consultas import ConsultasTicket, CAMPOS_API
+from app.utils.estadisticas import Estadisticas
+from app.utils.carga_masiva import CargaMasiva
+from app.utils.trabajos import ColaTrabajos
+from app.utils.replicas import solo_lectura
+from app.utils.catalogo import catalogo_municipios
+from app.utils.posiciones import indice_posiciones
+from app.utils.validadores import Validadores
+from app.utils.analitica import analitica_turnos
+from datetime import date
+from io import StringIO
+from sqlalchemy.exc import IntegrityError
+import csv
+import json
+import os
 
 api_bp = Blueprint('api', __name__)
 turno_manager = TurnoManager()
 
 @api_bp.route('/tickets', methods=['GET'])
+@solo_lectura
 def obtener_tickets():
     municipio_id = request.args.get('municipio_id')
     estatus = request.args.get('estatus')
+    after_id = request.args.get('after_id', type=int)
+    formato = request.args.get('format', 'json')
+    campos = _campos_solicitados()
     
-    query = Ticket.query
+    if formato != 'json' and formato not in FORMATOS_EXPORTACION:
+        return jsonify({'error': f'Formato no soportado: {formato}'}), 400
+    if not campos:
+        return jsonify({'error': 'Indica al menos un campo', 'campos': list(CAMPOS_API)}), 400
+    invalidos = [campo for campo in campos if campo not in CAMPOS_API]
+    if invalidos:
+        return jsonify({'error': f"Campos no soportados: {', '.join(invalidos)}", 'campos': list(CAMPOS_API)}), 400
     
-    if municipio_id:
-        query = query.filter_by(municipio_id=municipio_id)
-    if estatus:
-        query = query.filter_by(estatus=estatus)
-    
-    tickets = query.all()
-    
-    return jsonify([{
-        'id': ticket.id,
-        'curp': ticket.curp,
-        'nombre_completo': f"{ticket.nombre} {ticket.apellido_paterno} {ticket.apellido_materno}",
-        'municipio': ticket.municipio.nombre,
-        'numero_turno': ticket.numero_turno,
-        'estatus': ticket.estatus,
-        'fecha_creacion': ticket.fecha_creacion.isoformat()
-    } for ticket in tickets])
+    etag = Validadores.version_datos(catalogo_municipios.CLAVE_VERSION)
+    no_modificado = Validadores.no_modificado(etag)
+    if no_modificado:
+        return no_modificado
+    
+    if formato in FORMATOS_EXPORTACION:
+        filas = _filas_tickets(municipio_id, estatus, after_id, campos)
+        generador = FORMATOS_EXPORTACION[formato](filas, campos)
+        respuesta = Response(stream_with_context(generador), mimetype=MIMETYPES_EXPORTACION[formato])
+        return Validadores.marcar(respuesta, etag)
+    
+    query = ConsultasTicket.filas_api(municipio_id, estatus, after_id, campos)
+    if after_id:
+        query = query.order_by(Ticket.id)
+    
+    return Validadores.marcar(jsonify([ConsultasTicket.serializar_fila_api(fila, campos) for fila in query]), etag)
+
+def _campos_solicitados():
+    campos = request.args.get('fields')
+    if not campos:
+        return CAMPOS_API
+    return tuple(dict.fromkeys(campo.strip() for campo in campos.split(',') if campo.strip()))
+
+def _filas_tickets(municipio_id, estatus, after_id, campos):
+    tamano_lote = current_app.config['API_STREAM_CHUNK']
+    ultimo_id = after_id or 0
+    
+    while True:
+        query = ConsultasTicket.filas_api(municipio_id, estatus, ultimo_id, campos)
+        lote = query.order_by(Ticket.id).limit(tamano_lote).all()
+        for fila in lote:
+            yield ConsultasTicket.serializar_fila_api(fila, campos)
+        
+        if len(lote) < tamano_lote:
+            break
+        ultimo_id = lote[-1].id
+
+def _exportar_ndjson(filas, campos):
+    volcar = current_app.json.dumps
+    for fila in filas:
+        yield volcar(fila) + '\n'
+
+def _exportar_csv(filas, campos):
+    buffer = StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=campos)
+    writer.writeheader()
+    yield _vaciar(buffer)
+    
+    for fila in filas:
+        if isinstance(fila.get('fecha_creacion'), date):
+            fila['fecha_creacion'] = fila['fecha_creacion'].isoformat()
+        writer.writerow(fila)
+        yield _vaciar(buffer)
+
+def _vaciar(buffer):
+    contenido = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return contenido
+
+FORMATOS_EXPORTACION = {
+    'ndjson': _exportar_ndjson,
+    'csv': _exportar_csv
+}
+
+MIMETYPES_EXPORTACION = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
 
 @api_bp.route('/tickets', methods=['POST'])
 def crear_ticket():
     data = request.get_json()
     
     try:
-        if turno_manager.validar_turno_existente(data['municipio_id'], data['curp']):
-            return jsonify({'error': 'Ya existe un turno para esta CURP en el municipio'}), 400
-        
         numero_turno = turno_manager.obtener_siguiente_turno(data['municipio_id'])
         
         nuevo_ticket = Ticket(
@@ -59,25 +135,116 @@ def crear_ticket():
             'mensaje': 'Turno creado exitosamente'
         }), 201
         
+    except IntegrityError as e:
+        db.session.rollback()
+        if turno_manager.es_curp_duplicada(e, data['municipio_id'], data['curp']):
+            return jsonify({'error': 'Ya existe un turno para esta CURP en el municipio'}), 400
+        return jsonify({'error': str(e)}), 500
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/tickets/bulk', methods=['POST'])
+def crear_tickets_masivo():
+    formato = request.args.get('format')
+    if not formato:
+        formato = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+    if not CargaMasiva.autorizado(current_user):
+        return jsonify({'error': 'No autorizado'}), 403 if current_user.is_authenticated else 401
+    if formato not in ('ndjson', 'csv'):
+        return jsonify({'error': f'Formato no soportado: {formato}'}), 400
+    if request.content_length is None:
+        return jsonify({'error': 'Se requiere Content-Length'}), 411
+    if request.content_length > current_app.config['BULK_MAX_BYTES']:
+        return jsonify({'error': f"La carga excede {current_app.config['BULK_MAX_BYTES']} bytes"}), 413
+    
+    tamano_lote = request.args.get('chunk_size', type=int) or current_app.config['BULK_CHUNK_SIZE']
+    tamano_lote = max(1, min(tamano_lote, current_app.config['BULK_CHUNK_SIZE']))
+    carga = CargaMasiva(tamano_lote, current_app.config['BULK_MAX_FILAS'])
+    
+    lector = CargaMasiva.leer_csv if formato == 'csv' else CargaMasiva.leer_ndjson
+    return jsonify(carga.procesar(lector(request.stream)))
+
+@api_bp.route('/jobs/<trabajo_id>')
+def estado_trabajo(trabajo_id):
+    trabajo = db.session.get(Trabajo, trabajo_id)
+    if trabajo is None or not ColaTrabajos.autorizado(trabajo, current_user):
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    
+    url_resultado = url_for('api.resultado_trabajo', trabajo_id=trabajo.id)
+    return jsonify(ColaTrabajos.serializar(trabajo, url_resultado))
+
+@api_bp.route('/jobs/<trabajo_id>/resultado')
+def resultado_trabajo(trabajo_id):
+    trabajo = db.session.get(Trabajo, trabajo_id)
+    if trabajo is None or not ColaTrabajos.autorizado(trabajo, current_user):
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    if trabajo.estado != 'Completado':
+        return jsonify({'error': 'El trabajo aún no ha terminado', 'estado': trabajo.estado}), 409
+    
+    resultado = json.loads(trabajo.resultado)
+    if not os.path.exists(resultado['archivo']):
+        return jsonify({'error': 'El resultado del trabajo ya no está disponible'}), 410
+    return send_file(
+        resultado['archivo'],
+        as_attachment=True,
+        download_name=resultado['nombre'],
+        mimetype=resultado['mimetype']
+    )
+
+@api_bp.route('/turnos/<int:municipio_id>')
+def turno_actual(municipio_id):
+    if not catalogo_municipios.obtener(municipio_id):
+        return jsonify({'error': 'Municipio no encontrado'}), 404
+    
+    return jsonify(indice_posiciones.resumen(municipio_id))
+
+@api_bp.route('/turnos/<int:municipio_id>/<int:numero_turno>/posicion')
+def posicion_turno(municipio_id, numero_turno):
+    if not catalogo_municipios.obtener(municipio_id):
+        return jsonify({'error': 'Municipio no encontrado'}), 404
+    
+    posicion = indice_posiciones.posicion(municipio_id, numero_turno)
+    if posicion is None:
+        return jsonify({'error': 'Turno no encontrado'}), 404
+    return jsonify(posicion)
+
+@api_bp.route('/analitica')
+@solo_lectura
+def obtener_analitica():
+    instantanea = analitica_turnos.instantanea()
+    etag = instantanea['generado']
+    no_modificado = Validadores.no_modificado(etag)
+    if no_modificado:
+        return no_modificado
+    
+    municipio_id = request.args.get('municipio_id', type=int)
+    if municipio_id:
+        municipios = [m for m in instantanea['municipios'] if m['municipio_id'] == municipio_id]
+        if not municipios:
+            return jsonify({'error': 'Municipio sin datos en la ventana de análisis'}), 404
+        instantanea = dict(instantanea, municipios=municipios)
+    
+    return Validadores.marcar(jsonify(instantanea), etag)
+
 @api_bp.route('/estadisticas')
+@solo_lectura
 def obtener_estadisticas():
     municipio_id = request.args.get('municipio_id')
     
-    query = Ticket.query
-    if municipio_id:
-        query = query.filter_by(municipio_id=municipio_id)
+    etag = Validadores.version_datos()
+    no_modificado = Validadores.no_modificado(etag)
+    if no_modificado:
+        return no_modificado
     
-    total = query.count()
-    pendientes = query.filter_by(estatus='Pendiente').count()
-    resueltos = query.filter_by(estatus='Resuelto').count()
+    resumen = Estadisticas.resumen(municipio_id, incluir_archivo=request.args.get('incluir_archivo') == '1')
+    total = resumen['total']
+    pendientes = resumen['pendientes']
+    resueltos = resumen['resueltos']
     
-    return jsonify({
+    return Validadores.marcar(jsonify({
         'total': total,
         'pendientes': pendientes,
         'resueltos': resueltos,
         'porcentaje_resueltos': (resueltos / total * 100) if total > 0 else 0
-    })
\ No newline at end of file
+    }), etag)
\ No newline at end of file
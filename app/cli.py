@@ -0,0 +1,201 @@
+import click
+
+INDICES_OBSOLETOS = {'tickets': ['ix_tickets_curp']}
+
+def _dialectos_del_indice(indice):
+    condicion = getattr(indice, '_ddl_if', None)
+    if condicion is None or condicion.dialect is None:
+        return None
+    return (condicion.dialect,) if isinstance(condicion.dialect, str) else tuple(condicion.dialect)
+
+def registrar_comandos(app):
+    @app.cli.command('crear-indices')
+    def crear_indices():
+        """Crea los índices declarados en los modelos que aún no existan y elimina los obsoletos."""
+        from app.models import db
+        
+        inspector = db.inspect(db.engine)
+        fallidos = 0
+        for tabla in db.metadata.sorted_tables:
+            if not inspector.has_table(tabla.name):
+                continue
+            existentes = {indice['name'] for indice in inspector.get_indexes(tabla.name)}
+            
+            for indice in tabla.indexes:
+                dialectos = _dialectos_del_indice(indice)
+                if dialectos and db.engine.dialect.name not in dialectos:
+                    click.echo(f"⏭️  {tabla.name}.{indice.name}: solo aplica en {', '.join(dialectos)}, omitido")
+                    continue
+                
+                if indice.unique and indice.name not in existentes:
+                    columnas = list(indice.columns)
+                    duplicados = db.session.execute(
+                        db.select(*columnas, db.func.count())
+                        .group_by(*columnas)
+                        .having(db.func.count() > 1)
+                        .limit(20)
+                    ).all()
+                    if duplicados:
+                        fallidos += 1
+                        click.echo(f"❌ {tabla.name}.{indice.name}: hay valores duplicados, corrígelos antes de migrar")
+                        for *valores, cantidad in duplicados:
+                            click.echo(f"   {tuple(valores)} × {cantidad}")
+                        continue
+                
+                indice.create(db.engine, checkfirst=True)
+                click.echo(f"✅ {tabla.name}.{indice.name}")
+            
+            for nombre in INDICES_OBSOLETOS.get(tabla.name, []):
+                if nombre in existentes:
+                    sentencia = f"DROP INDEX {nombre} ON {tabla.name}" if db.engine.dialect.name == 'mysql' else f"DROP INDEX {nombre}"
+                    with db.engine.begin() as conexion:
+                        conexion.exec_driver_sql(sentencia)
+                    click.echo(f"🗑️  {tabla.name}.{nombre}")
+        
+        if fallidos:
+            raise SystemExit(1)
+    
+    @app.cli.command('verificar-planes')
+    def verificar_planes():
+        """Ejecuta EXPLAIN sobre las consultas registradas y falla si alguna recorre la tabla completa."""
+        from app.utils.planes import PlanesConsulta
+        
+        escaneos = 0
+        for nombre, lineas, escaneo_completo in PlanesConsulta.verificar():
+            click.echo(f"{'❌' if escaneo_completo else '✅'} {nombre}")
+            for linea in lineas:
+                click.echo(f"   {linea}")
+            escaneos += escaneo_completo
+        
+        if escaneos:
+            click.echo(f"❌ {escaneos} consultas recorren la tabla completa")
+            raise SystemExit(1)
+    
+    @app.cli.command('verificar-estadisticas')
+    @click.option('--reconstruir', is_flag=True, help='Recalcula los contadores desde la tabla tickets.')
+    def verificar_estadisticas(reconstruir):
+        """Compara los contadores de estadísticas contra la tabla tickets y reporta diferencias."""
+        from app.utils.estadisticas import Estadisticas
+        
+        diferencias = Estadisticas.verificar(reconstruir=reconstruir)
+        for clave, actual, esperado in diferencias:
+            click.echo(f"⚠️  {clave}: contador={actual} tickets={esperado}")
+        
+        if not diferencias:
+            click.echo("✅ Los contadores coinciden con la tabla tickets")
+        elif reconstruir:
+            click.echo(f"🔄 {len(diferencias)} contadores reconstruidos")
+        else:
+            raise SystemExit(1)
+    
+    @app.cli.command('verificar-posiciones')
+    @click.option('--municipio-id', type=int, help='Municipio a verificar; todos si se omite.')
+    def verificar_posiciones(municipio_id):
+        """Compara el índice de posiciones en la fila contra los turnos pendientes de la tabla tickets."""
+        from app.models import Municipio
+        from app.utils.posiciones import indice_posiciones
+        
+        municipios = [municipio_id] if municipio_id else [m.id for m in Municipio.query.order_by(Municipio.id)]
+        fallas = 0
+        for municipio in municipios:
+            for clave, actual, esperado in indice_posiciones.verificar(municipio):
+                click.echo(f"⚠️  municipio {municipio} {clave}: índice={actual} tickets={esperado}")
+                fallas += 1
+        
+        if fallas:
+            raise SystemExit(1)
+        click.echo(f"✅ Posiciones consistentes en {len(municipios)} municipios")
+    
+    @app.cli.command('startup-profile')
+    @click.option('--limite', type=int, default=15, help='Dependencias externas a mostrar.')
+    @click.option('--calentar', is_flag=True, help='Incluye el tiempo de precarga de módulos pesados.')
+    def startup_profile(limite, calentar):
+        """Mide en un proceso nuevo el tiempo de importación por módulo y el de create_app."""
+        from app.utils.arranque import perfilar
+        
+        tiempos, modulos = perfilar(calentar)
+        click.echo(f"⏱️  import app: {tiempos['importar'] * 1000:.0f} ms")
+        click.echo(f"⏱️  create_app(): {tiempos['create_app'] * 1000:.0f} ms")
+        if calentar:
+            click.echo(f"⏱️  calentar(): {tiempos['calentar'] * 1000:.0f} ms")
+        
+        propios = sorted(
+            (modulo for modulo in modulos if modulo['nombre'].split('.')[0] == 'app'),
+            key=lambda modulo: modulo['acumulado'], reverse=True
+        )
+        click.echo(f"\n{'módulo de la aplicación':<40} {'propio ms':>10} {'acumulado ms':>13}")
+        for modulo in propios:
+            click.echo(f"{modulo['nombre']:<40} {modulo['propio']:>10.1f} {modulo['acumulado']:>13.1f}")
+        
+        externos = {}
+        for modulo in modulos:
+            paquete = modulo['nombre'].split('.')[0]
+            if paquete == 'app' or (modulo['padre'] and modulo['padre'].split('.')[0] != 'app'):
+                continue
+            acumulado, importadores = externos.get(paquete, (0, set()))
+            importadores.add(modulo['padre'] or '-')
+            externos[paquete] = (acumulado + modulo['acumulado'], importadores)
+        
+        click.echo(f"\n{'dependencia':<24} {'acumulado ms':>13}  importada por")
+        for paquete, (acumulado, importadores) in sorted(externos.items(), key=lambda item: item[1][0], reverse=True)[:limite]:
+            click.echo(f"{paquete:<24} {acumulado:>13.1f}  {', '.join(sorted(importadores))}")
+    
+    @app.cli.command('archivar')
+    @click.option('--dias', type=int, help='Antigüedad mínima en días; por defecto ARCHIVO_DIAS.')
+    @click.option('--lote', type=int, help='Tickets por transacción; por defecto ARCHIVO_LOTE.')
+    @click.option('--pausa', type=float, help='Segundos de espera entre lotes; por defecto ARCHIVO_PAUSA.')
+    @click.option('--max-lotes', type=int, help='Detiene el proceso tras este número de lotes.')
+    def archivar(dias, lote, pausa, max_lotes):
+        """Mueve a tickets_archivo los tickets resueltos más antiguos que el periodo de retención."""
+        from flask import current_app
+        from app.utils.archivo import Archivador
+        
+        dias = current_app.config['ARCHIVO_DIAS'] if dias is None else dias
+        movidos = Archivador.archivar(
+            dias,
+            lote=lote or current_app.config['ARCHIVO_LOTE'],
+            pausa=current_app.config['ARCHIVO_PAUSA'] if pausa is None else pausa,
+            max_lotes=max_lotes
+        )
+        click.echo(f"✅ {movidos} tickets resueltos con más de {dias} días archivados")
+    
+    @app.cli.command('exportar-comprobantes')
+    @click.option('--municipio-id', type=int, help='Municipio a exportar; todos si se omite.')
+    @click.option('--estatus', type=click.Choice(['Pendiente', 'Resuelto']))
+    @click.option('--desde', type=click.DateTime(formats=['%Y-%m-%d']), help='Fecha inicial AAAA-MM-DD.')
+    @click.option('--hasta', type=click.DateTime(formats=['%Y-%m-%d']), help='Fecha final AAAA-MM-DD (inclusive).')
+    @click.option('--formato', type=click.Choice(['pdf', 'zip']), default='pdf')
+    @click.option('--salida', type=click.Path(dir_okay=False), required=True)
+    def exportar_comprobantes(municipio_id, estatus, desde, hasta, formato, salida):
+        """Genera los comprobantes de un municipio y rango de fechas en un PDF o un ZIP."""
+        from app.utils.exportador import ExportadorComprobantes
+        
+        query = ExportadorComprobantes.consultar(
+            municipio_id=municipio_id,
+            estatus=estatus,
+            desde=desde,
+            hasta=hasta
+        )
+        contenido = ExportadorComprobantes.exportar(query, formato, app.config['EXPORTACION_PROCESOS'])
+        
+        with open(salida, 'wb') as archivo:
+            for fragmento in contenido:
+                archivo.write(fragmento)
+        click.echo(f"✅ Comprobantes exportados en {salida}")
+    
+    @app.cli.command('procesar-trabajos')
+    def procesar_trabajos():
+        """Ejecuta en este proceso los trabajos pendientes de la cola y termina."""
+        from app.utils.trabajos import cola_trabajos
+        
+        ejecutados = cola_trabajos.ejecutar_pendientes()
+        click.echo(f"✅ {ejecutados} trabajos procesados")
+    
+    @app.cli.command('purgar-trabajos')
+    @click.option('--horas', type=float, help='Antigüedad mínima en horas; por defecto TRABAJOS_RETENCION_HORAS.')
+    def purgar_trabajos(horas):
+        """Elimina los trabajos terminados más antiguos que la retención junto con sus archivos."""
+        from app.utils.trabajos import cola_trabajos
+        
+        eliminados = cola_trabajos.purgar(horas)
+        click.echo(f"✅ {eliminados} trabajos terminados eliminados")
\ No newline at end of file
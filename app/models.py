@@ -1,11 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
-import qrcode
-from io import BytesIO
-import base64
+from app.utils.replicas import SesionEnrutada
+from app.utils.metricas import metricas
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': SesionEnrutada})
 
 class Municipio(db.Model):
     __tablename__ = 'municipios'
@@ -29,7 +28,7 @@ class Usuario(UserMixin, db.Model):
 class Ticket(db.Model):
     __tablename__ = 'tickets'
     id = db.Column(db.Integer, primary_key=True)
-    curp = db.Column(db.String(18), nullable=False, index=True)
+    curp = db.Column(db.String(18), nullable=False)
     nombre = db.Column(db.String(100), nullable=False)
     apellido_paterno = db.Column(db.String(100), nullable=False)
     apellido_materno = db.Column(db.String(100), nullable=False)
@@ -41,11 +40,27 @@ class Ticket(db.Model):
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    archivado = False
+    
     __table_args__ = (
         db.UniqueConstraint('municipio_id', 'numero_turno', name='uq_municipio_turno'),
+        db.Index('uq_municipio_curp', 'municipio_id', 'curp', unique=True),
+        db.Index('ix_tickets_curp_turno', 'curp', 'numero_turno'),
+        db.Index('ix_tickets_municipio_estatus', 'municipio_id', 'estatus'),
+        db.Index('ix_tickets_estatus_fecha', 'estatus', 'fecha_creacion'),
+        db.Index('ix_tickets_fecha_creacion', 'fecha_creacion'),
+        db.Index(
+            'ft_tickets_busqueda', 'curp', 'nombre', 'apellido_paterno', 'apellido_materno', 'email',
+            mysql_prefix='FULLTEXT', mysql_with_parser='ngram'
+        ).ddl_if(dialect='mysql'),
     )
     
+    @metricas.medir('qr')
     def generar_qr_base64(self):
+        import base64
+        from io import BytesIO
+        import qrcode
+        
         qr = qrcode.QRCode(
             version=1,
             error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -58,4 +73,91 @@ class Ticket(db.Model):
         img = qr.make_image(fill_color="black", back_color="white")
         buffered = BytesIO()
         img.save(buffered, format="PNG")
-        return base64.b64encode(buffered.getvalue()).decode()
\ No newline at end of file
+        return base64.b64encode(buffered.getvalue()).decode()
+
+class TicketArchivado(db.Model):
+    __tablename__ = 'tickets_archivo'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    curp = db.Column(db.String(18), nullable=False)
+    nombre = db.Column(db.String(100), nullable=False)
+    apellido_paterno = db.Column(db.String(100), nullable=False)
+    apellido_materno = db.Column(db.String(100), nullable=False)
+    telefono = db.Column(db.String(15), nullable=False)
+    email = db.Column(db.String(100), nullable=False)
+    municipio_id = db.Column(db.Integer, db.ForeignKey('municipios.id'), nullable=False)
+    numero_turno = db.Column(db.Integer, nullable=False)
+    estatus = db.Column(db.Enum('Pendiente', 'Resuelto'), default='Resuelto')
+    fecha_creacion = db.Column(db.DateTime)
+    fecha_actualizacion = db.Column(db.DateTime)
+    fecha_archivo = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    municipio = db.relationship('Municipio')
+    archivado = True
+    generar_qr_base64 = Ticket.generar_qr_base64
+    
+    __table_args__ = (
+        db.UniqueConstraint('municipio_id', 'numero_turno', name='uq_archivo_municipio_turno'),
+        db.Index('ix_archivo_curp_turno', 'curp', 'numero_turno'),
+        db.Index('ix_archivo_municipio_curp', 'municipio_id', 'curp'),
+        db.Index('ix_archivo_fecha_creacion', 'fecha_creacion'),
+    )
+
+class ContadorTurno(db.Model):
+    __tablename__ = 'contadores_turno'
+    municipio_id = db.Column(db.Integer, db.ForeignKey('municipios.id', ondelete='CASCADE'), primary_key=True)
+    ultimo_turno = db.Column(db.Integer, nullable=False, default=0)
+
+class EstadisticaMunicipio(db.Model):
+    __tablename__ = 'estadisticas_municipio'
+    municipio_id = db.Column(db.Integer, db.ForeignKey('municipios.id', ondelete='CASCADE'), primary_key=True)
+    pendientes = db.Column(db.Integer, nullable=False, default=0)
+    resueltos = db.Column(db.Integer, nullable=False, default=0)
+
+class EstadisticaArchivo(db.Model):
+    __tablename__ = 'estadisticas_archivo'
+    municipio_id = db.Column(db.Integer, db.ForeignKey('municipios.id', ondelete='CASCADE'), primary_key=True)
+    resueltos = db.Column(db.Integer, nullable=False, default=0)
+
+class EstadisticaDiaria(db.Model):
+    __tablename__ = 'estadisticas_diarias'
+    fecha = db.Column(db.Date, primary_key=True)
+    municipio_id = db.Column(db.Integer, db.ForeignKey('municipios.id', ondelete='CASCADE'), primary_key=True)
+    creados = db.Column(db.Integer, nullable=False, default=0)
+
+class Version(db.Model):
+    __tablename__ = 'versiones'
+    clave = db.Column(db.String(50), primary_key=True)
+    valor = db.Column(db.Integer, nullable=False, default=0)
+
+class Trabajo(db.Model):
+    __tablename__ = 'trabajos'
+    id = db.Column(db.String(32), primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)
+    estado = db.Column(db.Enum('Pendiente', 'En proceso', 'Completado', 'Fallido'), default='Pendiente', nullable=False)
+    parametros = db.Column(db.Text, nullable=False, default='{}')
+    resultado = db.Column(db.Text)
+    error = db.Column(db.Text)
+    intentos = db.Column(db.Integer, nullable=False, default=0)
+    max_intentos = db.Column(db.Integer, nullable=False, default=3)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'))
+    disponible_desde = db.Column(db.DateTime, default=datetime.utcnow)
+    latido = db.Column(db.DateTime)
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_trabajos_estado_disponible', 'estado', 'disponible_desde'),
+    )
+
+class Evento(db.Model):
+    __tablename__ = 'eventos'
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    tipo = db.Column(db.String(30), nullable=False)
+    ticket_id = db.Column(db.Integer)
+    municipio_id = db.Column(db.Integer)
+    datos = db.Column(db.Text, nullable=False, default='{}')
+    fecha = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_eventos_fecha', 'fecha'),
+    )
\ No newline at end of file
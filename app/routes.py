@@ -1,16 +1,33 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, send_file
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, send_file, current_app, Response, stream_with_context
+from datetime import datetime
+from io import BytesIO
+from sqlalchemy.exc import IntegrityError
 from flask_login import login_required, current_user
-from app.models import db, Ticket, Municipio, Usuario
+from app.models import db, Ticket, TicketArchivado, Municipio, Usuario
 from app.utils.pdf_generator import PDFGenerator
 from app.utils.turno_manager import TurnoManager
-from sqlalchemy import or_
+from app.utils.consultas import ConsultasTicket
+from app.utils.buscador import BuscadorTickets
+from app.utils.estadisticas import Estadisticas
+from app.utils.cache_comprobantes import cache_comprobantes
+from app.utils.exportador import ExportadorComprobantes, FORMATOS
+from app.utils.trabajos import cola_trabajos, ColaTrabajos
+from app.utils.catalogo import catalogo_municipios
+from app.utils.replicas import solo_lectura
+from app.utils.metricas import metricas
+from app.utils.eventos import despachador_eventos
+from app.utils.validadores import Validadores
+from app.utils.archivo import Archivador
+from app.utils.analitica import analitica_turnos
+from app.utils.graficas import graficas_dashboard, GraficasDashboard, FORMATOS as FORMATOS_GRAFICA
+from app.utils.admision import control_admision
 
 main_bp = Blueprint('main', __name__)
 turno_manager = TurnoManager()
 
 @main_bp.route('/')
 def index():
-    municipios = Municipio.query.filter_by(activo=True).all()
+    municipios = catalogo_municipios.activos()
     return render_template('public/solicitud.html', municipios=municipios)
 
 @main_bp.route('/solicitar-turno', methods=['POST'])
@@ -24,11 +41,6 @@ def solicitar_turno():
         email = request.form.get('email')
         municipio_id = request.form.get('municipio_id')
         
-        ticket_existente = turno_manager.validar_turno_existente(municipio_id, curp)
-        if ticket_existente:
-            flash('Ya existe un turno para esta CURP en el municipio seleccionado', 'warning')
-            return redirect(url_for('main.modificar_turno'))
-        
         numero_turno = turno_manager.obtener_siguiente_turno(municipio_id)
         
         nuevo_ticket = Ticket(
@@ -48,6 +60,13 @@ def solicitar_turno():
         flash(f'Turno asignado exitosamente. Su número de turno es: {numero_turno}', 'success')
         return redirect(url_for('main.descargar_comprobante', ticket_id=nuevo_ticket.id))
         
+    except IntegrityError as e:
+        db.session.rollback()
+        if not turno_manager.es_curp_duplicada(e, municipio_id, curp):
+            flash('Error al procesar la solicitud', 'error')
+            return redirect(url_for('main.index'))
+        flash('Ya existe un turno para esta CURP en el municipio seleccionado', 'warning')
+        return redirect(url_for('main.modificar_turno'))
     except Exception as e:
         db.session.rollback()
         flash('Error al procesar la solicitud', 'error')
@@ -62,13 +81,17 @@ def modificar_turno():
     curp = request.form.get('curp')
     numero_turno = request.form.get('numero_turno')
     
-    ticket = Ticket.query.filter_by(curp=curp, numero_turno=numero_turno).first()
+    ticket = ConsultasTicket.con_municipio().filter_by(curp=curp, numero_turno=numero_turno).first()
     
     if not ticket:
+        archivado = Archivador.buscar_por_curp(curp, numero_turno).first()
+        if archivado:
+            flash('Este turno ya fue atendido y archivado; solo puede descargar su comprobante', 'info')
+            return redirect(url_for('main.descargar_comprobante', ticket_id=archivado.id))
         flash('No se encontró ningún turno con los datos proporcionados', 'error')
         return redirect(url_for('main.modificar_turno_form'))
     
-    municipios = Municipio.query.filter_by(activo=True).all()
+    municipios = catalogo_municipios.activos()
     return render_template('public/editar_solicitud.html', ticket=ticket, municipios=municipios)
 
 @main_bp.route('/actualizar-turno/<int:ticket_id>', methods=['POST'])
@@ -82,92 +105,161 @@ def actualizar_turno(ticket_id):
     ticket.email = request.form.get('email')
     
     db.session.commit()
+    cache_comprobantes.invalidar(ticket.id)
     flash('Solicitud actualizada exitosamente', 'success')
     return redirect(url_for('main.descargar_comprobante', ticket_id=ticket.id))
 
 @main_bp.route('/comprobante/<int:ticket_id>')
 def descargar_comprobante(ticket_id):
-    ticket = Ticket.query.get_or_404(ticket_id)
-    pdf_buffer = PDFGenerator.generar_comprobante(ticket)
-    
-    return send_file(
-        pdf_buffer,
+    if request.args.get('async'):
+        ConsultasTicket.obtener_con_municipio(ticket_id, incluir_archivo=True)
+        limitado = control_admision.limitar('trabajos')
+        if limitado:
+            return limitado
+        trabajo = cola_trabajos.encolar('comprobante', {'ticket_id': ticket_id}, usuario_id=current_user.id if current_user.is_authenticated else None)
+        return jsonify(ColaTrabajos.serializar(trabajo)), 202, {
+            'Location': url_for('api.estado_trabajo', trabajo_id=trabajo.id)
+        }
+    
+    ticket = ConsultasTicket.obtener_con_municipio(ticket_id, incluir_archivo=True)
+    etag = cache_comprobantes.clave(ticket)
+    no_modificado = Validadores.no_modificado(etag, ticket.fecha_actualizacion)
+    if no_modificado:
+        return no_modificado
+    
+    pdf = cache_comprobantes.obtener(ticket, PDFGenerator.generar_comprobante)
+    
+    respuesta = send_file(
+        BytesIO(pdf),
         as_attachment=True,
         download_name=f"comprobante_turno_{ticket.numero_turno}.pdf",
-        mimetype='application/pdf'
+        mimetype='application/pdf',
+        etag=False
     )
+    return Validadores.marcar(respuesta, etag, ticket.fecha_actualizacion)
 
 @main_bp.route('/dashboard')
 @login_required
+@solo_lectura
 def dashboard():
     if not current_user.es_admin:
         flash('No tienes permisos para acceder a esta página', 'error')
         return redirect(url_for('main.index'))
     
-    total_tickets = Ticket.query.count()
-    tickets_pendientes = Ticket.query.filter_by(estatus='Pendiente').count()
-    tickets_resueltos = Ticket.query.filter_by(estatus='Resuelto').count()
-    
-    municipios_stats = db.session.query(
-        Municipio.nombre,
-        db.func.count(Ticket.id).label('total_tickets'),
-        db.func.sum(db.case((Ticket.estatus == 'Pendiente', 1), else_=0)).label('pendientes'),
-        db.func.sum(db.case((Ticket.estatus == 'Resuelto', 1), else_=0)).label('resueltos')
-    ).join(Ticket, Municipio.id == Ticket.municipio_id)\
-     .group_by(Municipio.id, Municipio.nombre)\
-     .all()
-    
-    from datetime import datetime, timedelta
-    fecha_limite = datetime.utcnow() - timedelta(days=7)
-    
-    tickets_por_fecha = db.session.query(
-        db.func.date(Ticket.fecha_creacion).label('fecha'),
-        db.func.count(Ticket.id).label('cantidad')
-    ).filter(Ticket.fecha_creacion >= fecha_limite)\
-     .group_by(db.func.date(Ticket.fecha_creacion))\
-     .order_by(db.func.date(Ticket.fecha_creacion))\
-     .all()
-    
-    municipios_nombres = [stat.nombre for stat in municipios_stats]
-    municipios_totales = [stat.total_tickets for stat in municipios_stats]
-    municipios_pendientes = [stat.pendientes for stat in municipios_stats]
-    municipios_resueltos = [stat.resueltos for stat in municipios_stats]
-    
-    fechas = [stat.fecha.strftime('%d/%m') for stat in tickets_por_fecha]
-    tickets_por_dia = [stat.cantidad for stat in tickets_por_fecha]
+    version = _version_graficas()
+    resumen, municipios_stats, tickets_por_fecha = _datos_dashboard()
+    
+    formato = current_app.config['GRAFICAS_FORMATO']
+    graficas_dashboard.preparar(version, graficas_dashboard.datos(resumen, municipios_stats, tickets_por_fecha), formato)
     
     return render_template('admin/dashboard.html',
-                         total_tickets=total_tickets,
-                         pendientes=tickets_pendientes,
-                         resueltos=tickets_resueltos,
+                         total_tickets=resumen['total'],
+                         pendientes=resumen['pendientes'],
+                         resueltos=resumen['resueltos'],
                          municipios_stats=municipios_stats,
-                         municipios_nombres=municipios_nombres,
-                         municipios_totales=municipios_totales,
-                         municipios_pendientes=municipios_pendientes,
-                         municipios_resueltos=municipios_resueltos,
-                         fechas=fechas,
-                         tickets_por_dia=tickets_por_dia)
+                         version_graficas='-'.join(map(str, version)),
+                         formato_graficas=formato)
+
+@main_bp.route('/admin/graficas/<nombre>.<formato>')
+@login_required
+@solo_lectura
+def grafica_dashboard(nombre, formato):
+    if not current_user.es_admin:
+        return jsonify({'error': 'No autorizado'}), 403
+    if nombre not in GraficasDashboard.GRAFICAS or formato not in FORMATOS_GRAFICA:
+        return jsonify({'error': 'Gráfica no encontrada'}), 404
+    
+    version = _version_graficas()
+    etag = '-'.join(map(str, (nombre, *version)))
+    no_modificado = Validadores.no_modificado(etag)
+    if no_modificado:
+        return no_modificado
+    
+    try:
+        imagen = graficas_dashboard.obtener(
+            nombre, formato, version,
+            lambda: graficas_dashboard.datos(*_datos_dashboard())
+        )
+    except Exception as e:
+        print(f"Error obteniendo gráfica {nombre}: {e}")
+        return jsonify({'error': 'No se pudo generar la gráfica'}), 503, {'Retry-After': '5'}
+    
+    return Validadores.marcar(Response(imagen, mimetype=FORMATOS_GRAFICA[formato]), etag)
+
+def _version_graficas():
+    # La actividad cubre los últimos 7 días y las barras llevan el nombre del municipio
+    valores = Validadores.version_datos(catalogo_municipios.CLAVE_VERSION).split('-')
+    return (datetime.utcnow().date().isoformat(), *map(int, valores))
+
+def _datos_dashboard():
+    return (
+        Estadisticas.resumen(incluir_archivo=True),
+        Estadisticas.por_municipio(incluir_archivo=True),
+        Estadisticas.por_dia(7)
+    )
+
+@main_bp.route('/admin/analitica')
+@login_required
+@solo_lectura
+def analitica():
+    if not current_user.es_admin:
+        flash('No tienes permisos para acceder a esta página', 'error')
+        return redirect(url_for('main.index'))
+    
+    return render_template('admin/analitica.html', analitica=analitica_turnos.instantanea())
+
+@main_bp.route('/metrics')
+def metricas_prometheus():
+    if not metricas.autorizado(current_user):
+        if not current_user.is_authenticated:
+            return current_app.login_manager.unauthorized()
+        return jsonify({'error': 'No autorizado'}), 403
+    
+    return Response(metricas.exportar(), mimetype='text/plain; version=0.0.4')
+
+@main_bp.route('/admin/stream')
+@login_required
+def stream_eventos():
+    if not current_user.es_admin:
+        return jsonify({'error': 'No autorizado'}), 403
+    
+    flujo = despachador_eventos.suscribir(request.headers.get('Last-Event-ID', type=int))
+    if flujo is None:
+        reintento = despachador_eventos.reintento_saturado
+        return Response(f"retry: {reintento * 1000}\n\n", status=503, mimetype='text/event-stream', headers={
+            'Retry-After': str(reintento),
+            'Cache-Control': 'no-cache'
+        })
+    
+    return Response(flujo, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 @main_bp.route('/admin/tickets')
 @login_required
+@solo_lectura
 def administrar_tickets():
     if not current_user.es_admin:
         flash('No tienes permisos para acceder a esta página', 'error')
         return redirect(url_for('main.index'))
     
     query = request.args.get('q', '')
+    incluir_archivo = request.args.get('archivo') == '1'
+    pagina = max(request.args.get('pagina', 1, type=int), 1)
+    hay_siguiente = False
     if query:
-        tickets = Ticket.query.filter(
-            or_(
-                Ticket.curp.contains(query),
-                Ticket.nombre.contains(query),
-                Ticket.apellido_paterno.contains(query)
-            )
-        ).order_by(Ticket.fecha_creacion.desc()).all()
+        tickets = BuscadorTickets.buscar(query, incluir_archivo=incluir_archivo)
     else:
-        tickets = Ticket.query.order_by(Ticket.fecha_creacion.desc()).all()
-    
-    return render_template('admin/tickets.html', tickets=tickets, query=query)
+        por_pagina = current_app.config['ADMIN_TICKETS_POR_PAGINA']
+        tickets = ConsultasTicket.con_municipio().order_by(Ticket.fecha_creacion.desc(), Ticket.id.desc())\
+            .offset((pagina - 1) * por_pagina).limit(por_pagina + 1).all()
+        hay_siguiente = len(tickets) > por_pagina
+        tickets = tickets[:por_pagina]
+    
+    municipios = catalogo_municipios.activos()
+    return render_template('admin/tickets.html', tickets=tickets, query=query, municipios=municipios,
+                           incluir_archivo=incluir_archivo, pagina=pagina, hay_siguiente=hay_siguiente)
 
 @main_bp.route('/admin/tickets/<int:ticket_id>/eliminar', methods=['POST'])
 @login_required
@@ -178,6 +270,7 @@ def eliminar_ticket(ticket_id):
     ticket = Ticket.query.get_or_404(ticket_id)
     db.session.delete(ticket)
     db.session.commit()
+    cache_comprobantes.invalidar(ticket_id)
     
     flash('Ticket eliminado exitosamente', 'success')
     return redirect(url_for('main.administrar_tickets'))
@@ -191,9 +284,56 @@ def cambiar_estatus(ticket_id):
     ticket = Ticket.query.get_or_404(ticket_id)
     ticket.estatus = 'Resuelto' if ticket.estatus == 'Pendiente' else 'Pendiente'
     db.session.commit()
+    cache_comprobantes.invalidar(ticket.id)
     
     return jsonify({'nuevo_estatus': ticket.estatus})
 
+@main_bp.route('/admin/comprobantes/exportar')
+@login_required
+def exportar_comprobantes():
+    if not current_user.es_admin:
+        return jsonify({'error': 'No autorizado'}), 403
+    
+    formato = request.args.get('formato', 'pdf')
+    if formato not in FORMATOS:
+        return jsonify({'error': f'Formato no soportado: {formato}'}), 400
+    
+    try:
+        desde = ExportadorComprobantes.parsear_fecha(request.args.get('desde'))
+        hasta = ExportadorComprobantes.parsear_fecha(request.args.get('hasta'))
+    except ValueError:
+        return jsonify({'error': 'Las fechas deben tener el formato AAAA-MM-DD'}), 400
+    
+    query = ExportadorComprobantes.consultar(
+        municipio_id=request.args.get('municipio_id'),
+        estatus=request.args.get('estatus'),
+        desde=desde,
+        hasta=hasta
+    )
+    
+    if request.args.get('async') or ExportadorComprobantes.requiere_trabajo(
+            query, formato, current_app.config['EXPORTACION_MAX_PDF']):
+        parametros = {
+            clave: request.args.get(clave)
+            for clave in ('municipio_id', 'estatus', 'desde', 'hasta')
+            if request.args.get(clave)
+        }
+        parametros['formato'] = formato
+        trabajo = cola_trabajos.encolar('exportar_comprobantes', parametros, usuario_id=current_user.id)
+        return jsonify(ColaTrabajos.serializar(trabajo)), 202, {
+            'Location': url_for('api.estado_trabajo', trabajo_id=trabajo.id)
+        }
+    
+    contenido = ExportadorComprobantes.exportar(
+        query, formato, current_app.config['EXPORTACION_PROCESOS']
+    )
+    
+    return Response(
+        stream_with_context(contenido),
+        mimetype='application/zip' if formato == 'zip' else 'application/pdf',
+        headers={'Content-Disposition': f'attachment; filename=comprobantes.{formato}'}
+    )
+
 @main_bp.route('/admin/tickets/crear', methods=['GET', 'POST'])
 @login_required
 def crear_ticket_admin():
@@ -201,7 +341,7 @@ def crear_ticket_admin():
         flash('No tienes permisos para acceder a esta página', 'error')
         return redirect(url_for('main.index'))
     
-    municipios = Municipio.query.filter_by(activo=True).all()
+    municipios = catalogo_municipios.activos()
     
     if request.method == 'POST':
         try:
@@ -214,11 +354,6 @@ def crear_ticket_admin():
             municipio_id = request.form.get('municipio_id')
             estatus = request.form.get('estatus', 'Pendiente')
             
-            ticket_existente = turno_manager.validar_turno_existente(municipio_id, curp)
-            if ticket_existente:
-                flash('Ya existe un turno para esta CURP en el municipio seleccionado', 'warning')
-                return redirect(url_for('main.crear_ticket_admin'))
-            
             numero_turno = turno_manager.obtener_siguiente_turno(municipio_id)
             
             nuevo_ticket = Ticket(
@@ -239,6 +374,13 @@ def crear_ticket_admin():
             flash(f'Ticket creado exitosamente. Número de turno: {numero_turno}', 'success')
             return redirect(url_for('main.administrar_tickets'))
             
+        except IntegrityError as e:
+            db.session.rollback()
+            if not turno_manager.es_curp_duplicada(e, municipio_id, curp):
+                flash(f'Error al crear el ticket: {str(e)}', 'error')
+                return render_template('admin/crear_ticket.html', municipios=municipios)
+            flash('Ya existe un turno para esta CURP en el municipio seleccionado', 'warning')
+            return redirect(url_for('main.crear_ticket_admin'))
         except Exception as e:
             db.session.rollback()
             flash(f'Error al crear el ticket: {str(e)}', 'error')
@@ -253,7 +395,7 @@ def editar_ticket(ticket_id):
         return redirect(url_for('main.index'))
     
     ticket = Ticket.query.get_or_404(ticket_id)
-    municipios = Municipio.query.filter_by(activo=True).all()
+    municipios = catalogo_municipios.activos()
     
     if request.method == 'POST':
         try:
@@ -262,10 +404,14 @@ def editar_ticket(ticket_id):
             ticket.apellido_materno = request.form.get('apellido_materno')
             ticket.telefono = request.form.get('telefono')
             ticket.email = request.form.get('email')
-            ticket.municipio_id = request.form.get('municipio_id')
+            municipio_id = request.form.get('municipio_id')
+            if str(ticket.municipio_id) != str(municipio_id):
+                ticket.numero_turno = turno_manager.obtener_siguiente_turno(municipio_id)
+            ticket.municipio_id = municipio_id
             ticket.estatus = request.form.get('estatus')
             
             db.session.commit()
+            cache_comprobantes.invalidar(ticket.id)
             flash('Ticket actualizado exitosamente', 'success')
             return redirect(url_for('main.administrar_tickets'))
             
@@ -283,7 +429,8 @@ def administrar_municipios():
         return redirect(url_for('main.index'))
     
     municipios = Municipio.query.all()
-    return render_template('admin/municipios.html', municipios=municipios)
+    totales = Estadisticas.totales_por_municipio()
+    return render_template('admin/municipios.html', municipios=municipios, totales=totales)
 
 @main_bp.route('/admin/municipios/crear', methods=['GET', 'POST'])
 @login_required
@@ -312,6 +459,7 @@ def crear_municipio():
             )
             
             db.session.add(nuevo_municipio)
+            catalogo_municipios.invalidar()
             db.session.commit()
             flash('Municipio creado exitosamente', 'success')
             return redirect(url_for('main.administrar_municipios'))
@@ -348,6 +496,7 @@ def editar_municipio(municipio_id):
             municipio.nombre = nombre
             municipio.codigo = codigo.upper()
             municipio.activo = activo
+            catalogo_municipios.invalidar()
             
             db.session.commit()
             flash('Municipio actualizado exitosamente', 'success')
@@ -368,12 +517,16 @@ def eliminar_municipio(municipio_id):
     try:
         municipio = Municipio.query.get_or_404(municipio_id)
         
-        if municipio.tickets:
+        if db.session.query(db.or_(
+            Ticket.query.filter_by(municipio_id=municipio.id).exists(),
+            TicketArchivado.query.filter_by(municipio_id=municipio.id).exists()
+        )).scalar():
             return jsonify({
                 'error': 'No se puede eliminar el municipio porque tiene tickets asociados'
             }), 400
         
         db.session.delete(municipio)
+        catalogo_municipios.invalidar()
         db.session.commit()
         
         return jsonify({'success': True})
@@ -0,0 +1,158 @@
+import math
+import random
+import threading
+import time
+from collections import Counter
+from flask import g, jsonify, render_template, request
+from flask_login import current_user
+
+CLASES = {
+    'main.solicitar_turno': 'registro',
+    'main.modificar_turno': 'registro',
+    'main.actualizar_turno': 'registro',
+    'api.crear_ticket': 'registro',
+    'api.crear_tickets_masivo': 'registro',
+    'main.descargar_comprobante': 'comprobante',
+    'api.resultado_trabajo': 'comprobante',
+}
+EXENTOS = ('static', 'main.stream_eventos', 'main.metricas_prometheus')
+
+class ControlAdmision:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._en_curso = Counter()
+        self._cubetas = {}
+        self.rechazos = Counter()
+        self.activo = True
+        self.capacidad = 32
+        self.reserva_admin = 8
+        self.limites = {}
+        self.tasa = 0.5
+        self.rafaga = 10
+        self.reintento = 2.0
+        self.max_clientes = 10000
+        self.proxies = 0
+    
+    def init_app(self, app):
+        self.activo = app.config['ADMISION_ACTIVA']
+        self.capacidad = app.config['ADMISION_CAPACIDAD']
+        self.reserva_admin = math.ceil(self.capacidad * app.config['ADMISION_RESERVA_ADMIN'])
+        self.limites = {
+            'registro': app.config['ADMISION_LIMITE_REGISTRO'],
+            'comprobante': app.config['ADMISION_LIMITE_COMPROBANTE']
+        }
+        self.tasa = app.config['ADMISION_TASA']
+        self.rafaga = app.config['ADMISION_RAFAGA']
+        self.reintento = app.config['ADMISION_REINTENTO']
+        self.max_clientes = app.config['ADMISION_MAX_CLIENTES']
+        self.proxies = app.config['ADMISION_PROXIES']
+        
+        if self.activo:
+            app.before_request(self._admitir)
+            app.teardown_request(self._liberar)
+    
+    def limitar(self, clase):
+        if not self.activo or (current_user.is_authenticated and current_user.es_admin):
+            return None
+        
+        with self._lock:
+            espera = self._consumir((clase, self._cliente()), time.monotonic())
+            if espera:
+                self.rechazos[(clase, 'cliente')] += 1
+        
+        return self._rechazar(espera) if espera else None
+    
+    def estadisticas(self):
+        with self._lock:
+            return dict(self._en_curso), dict(self.rechazos)
+    
+    def _admitir(self):
+        if request.endpoint is None or request.endpoint in EXENTOS:
+            return None
+        
+        es_admin = current_user.is_authenticated and current_user.es_admin
+        clase = 'admin' if es_admin else CLASES.get(request.endpoint, 'general')
+        with self._lock:
+            rechazo = self._evaluar(clase, es_admin, time.monotonic())
+            if rechazo is None:
+                self._en_curso[clase] += 1
+            else:
+                self.rechazos[(clase, rechazo[0])] += 1
+        
+        if rechazo:
+            return self._rechazar(rechazo[1])
+        g.clase_admision = clase
+        return None
+    
+    def _evaluar(self, clase, es_admin, ahora):
+        publicos = sum(cantidad for nombre, cantidad in self._en_curso.items() if nombre != 'admin')
+        if es_admin:
+            excedido = publicos + self._en_curso['admin'] >= self.capacidad
+        else:
+            excedido = publicos >= self.capacidad - self.reserva_admin
+        if excedido:
+            return 'capacidad', self.reintento * random.uniform(1, 2)
+        if self._en_curso[clase] >= self.limites.get(clase, self.capacidad):
+            return 'clase', self.reintento * random.uniform(1, 2)
+        
+        if clase in self.limites:
+            espera = self._consumir((clase, self._cliente()), ahora)
+            if espera:
+                return 'cliente', espera
+        return None
+    
+    def _liberar(self, error=None):
+        clase = g.pop('clase_admision', None)
+        if clase is None:
+            return
+        with self._lock:
+            self._en_curso[clase] -= 1
+    
+    def _cliente(self):
+        if self.proxies:
+            ruta = request.access_route
+            return ruta[-self.proxies] if len(ruta) >= self.proxies else ruta[0]
+        return request.remote_addr
+    
+    def _consumir(self, clave, ahora):
+        tokens, ultimo = self._cubetas.get(clave, (self.rafaga, ahora))
+        tokens = min(self.rafaga, tokens + (ahora - ultimo) * self.tasa)
+        if tokens < 1:
+            self._cubetas[clave] = (tokens, ahora)
+            return (1 - tokens) / self.tasa
+        
+        self._cubetas[clave] = (tokens - 1, ahora)
+        if len(self._cubetas) > self.max_clientes:
+            self._podar(ahora)
+        return 0
+    
+    def _podar(self, ahora):
+        llenas = [
+            clave for clave, (tokens, ultimo) in self._cubetas.items()
+            if tokens + (ahora - ultimo) * self.tasa >= self.rafaga
+        ]
+        for clave in llenas:
+            del self._cubetas[clave]
+        
+        exceso = len(self._cubetas) - self.max_clientes // 2
+        if exceso > 0:
+            for clave, _ in sorted(self._cubetas.items(), key=lambda item: item[1][1])[:exceso]:
+                del self._cubetas[clave]
+    
+    def _rechazar(self, espera):
+        reintento = max(1, math.ceil(espera))
+        encabezados = {'Retry-After': str(reintento)}
+        
+        if request.path.startswith('/api/') or request.accept_mimetypes.best == 'application/json':
+            return jsonify({
+                'error': 'Demasiadas solicitudes, intente de nuevo más tarde',
+                'reintentar_en': reintento
+            }), 429, encabezados
+        
+        return render_template(
+            'public/sala_espera.html',
+            reintento=reintento,
+            formulario=request.form if request.method == 'POST' else None
+        ), 429, encabezados
+
+control_admision = ControlAdmision()
\ No newline at end of file
@@ -0,0 +1,155 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from app.models import db, Ticket, TicketArchivado
+from app.utils.catalogo import catalogo_municipios
+
+PERCENTILES = (50, 90, 95, 99)
+SEGUNDOS_HORA = 3600
+
+class AnaliticaTurnos:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instantanea = None
+        self._generada = float('-inf')
+        self.ttl = 300.0
+        self.ventana_dias = 14
+        self.lote = 50000
+        self.desfase_horas = 0
+    
+    def init_app(self, app):
+        self.ttl = app.config['ANALITICA_TTL']
+        self.ventana_dias = app.config['ANALITICA_VENTANA_DIAS']
+        self.lote = app.config['ANALITICA_LOTE']
+        self.desfase_horas = app.config['ANALITICA_DESFASE_HORAS']
+    
+    def instantanea(self):
+        if self._instantanea is not None and time.monotonic() - self._generada < self.ttl:
+            return self._instantanea
+        
+        if not self._lock.acquire(blocking=self._instantanea is None):
+            return self._instantanea
+        try:
+            if self._instantanea is None or time.monotonic() - self._generada >= self.ttl:
+                self._instantanea = self.calcular()
+                self._generada = time.monotonic()
+            return self._instantanea
+        finally:
+            self._lock.release()
+    
+    def invalidar(self):
+        with self._lock:
+            self._generada = float('-inf')
+    
+    def calcular(self, ahora=None):
+        import numpy as np
+        
+        inicio_calculo = time.perf_counter()
+        ahora = ahora or datetime.utcnow()
+        inicio = ahora - timedelta(days=self.ventana_dias)
+        datos = self.cargar(inicio)
+        
+        t_ahora = np.datetime64(ahora, 's').astype(np.int64)
+        t_inicio = np.datetime64(inicio, 's').astype(np.int64)
+        bordes = np.arange(t_inicio, t_ahora + 1, SEGUNDOS_HORA)
+        
+        orden = np.argsort(datos['municipio_id'], kind='stable')
+        municipios, cortes = np.unique(datos['municipio_id'][orden], return_index=True)
+        grupos = np.split(orden, cortes[1:]) if len(orden) else []
+        
+        return {
+            'generado': ahora.replace(microsecond=0).isoformat(),
+            'ventana_dias': self.ventana_dias,
+            'backlog_inicio': inicio.replace(microsecond=0).isoformat(),
+            'backlog_paso_minutos': SEGUNDOS_HORA // 60,
+            'filas': int(len(orden)),
+            'municipios': [
+                self._municipio(int(municipio_id), datos, indices, t_inicio, bordes)
+                for municipio_id, indices in zip(municipios, grupos)
+            ],
+            'duracion_ms': round((time.perf_counter() - inicio_calculo) * 1000, 1)
+        }
+    
+    def cargar(self, inicio):
+        import numpy as np
+        
+        partes = {'municipio_id': [], 'resuelto': [], 'creacion': [], 'resolucion': []}
+        for modelo in (Ticket, TicketArchivado):
+            creacion = self._segundos(modelo.fecha_creacion)
+            resultado = db.session.execute(
+                db.select(
+                    modelo.municipio_id,
+                    db.case((modelo.estatus == 'Resuelto', 1), else_=0),
+                    creacion,
+                    db.func.coalesce(self._segundos(modelo.fecha_actualizacion), creacion)
+                )
+                .where(db.or_(
+                    modelo.estatus == 'Pendiente',
+                    modelo.fecha_creacion >= inicio,
+                    modelo.fecha_actualizacion >= inicio
+                ))
+                .execution_options(yield_per=self.lote)
+            )
+            for filas in resultado.partitions():
+                municipio_id, resuelto, creacion, resolucion = zip(*filas)
+                resuelto = np.array(resuelto, dtype=bool)
+                partes['municipio_id'].append(np.array(municipio_id, dtype=np.int32))
+                partes['resuelto'].append(resuelto)
+                partes['creacion'].append(np.array(creacion, dtype=np.int64))
+                partes['resolucion'].append(np.where(resuelto, np.array(resolucion, dtype=np.int64), np.iinfo(np.int64).max))
+        
+        tipos = {'municipio_id': np.int32, 'resuelto': bool, 'creacion': np.int64, 'resolucion': np.int64}
+        return {
+            clave: np.concatenate(arreglos) if arreglos else np.empty(0, dtype=tipos[clave])
+            for clave, arreglos in partes.items()
+        }
+    
+    @staticmethod
+    def _segundos(columna):
+        if db.engine.dialect.name == 'sqlite':
+            return db.cast(db.func.strftime('%s', columna), db.Integer)
+        return db.func.timestampdiff(db.text('SECOND'), '1970-01-01', columna)
+    
+    def _municipio(self, municipio_id, datos, indices, t_inicio, bordes):
+        import numpy as np
+        
+        resuelto = datos['resuelto'][indices]
+        creacion = datos['creacion'][indices]
+        resolucion = datos['resolucion'][indices]
+        
+        en_ventana = resuelto & (resolucion >= t_inicio)
+        esperas = (resolucion[en_ventana] - creacion[en_ventana]) / 60.0
+        esperas = esperas[esperas >= 0]
+        
+        llegadas = creacion[creacion >= t_inicio]
+        horas = (llegadas // SEGUNDOS_HORA + self.desfase_horas) % 24
+        dias = max((bordes[-1] - t_inicio) / 86400.0, 1 / 24)
+        
+        creados = np.searchsorted(np.sort(creacion), bordes, side='right')
+        cerrados = np.searchsorted(np.sort(resolucion), bordes, side='right')
+        
+        municipio = catalogo_municipios.obtener(municipio_id)
+        return {
+            'municipio_id': municipio_id,
+            'nombre': municipio.nombre if municipio else None,
+            'llegadas': int(len(llegadas)),
+            'resueltos': int(len(esperas)),
+            'pendientes': int((~resuelto).sum()),
+            'espera_minutos': self._percentiles(esperas),
+            'llegadas_por_hora': np.round(np.bincount(horas, minlength=24) / dias, 2).tolist(),
+            'backlog': (creados - cerrados).tolist()
+        }
+    
+    @staticmethod
+    def _percentiles(valores):
+        import numpy as np
+        
+        if not len(valores):
+            return dict({f'p{p}': None for p in PERCENTILES}, promedio=None)
+        resultado = np.percentile(valores, PERCENTILES)
+        return dict(
+            {f'p{p}': round(float(v), 1) for p, v in zip(PERCENTILES, resultado)},
+            promedio=round(float(valores.mean()), 1)
+        )
+
+analitica_turnos = AnaliticaTurnos()
\ No newline at end of file
@@ -0,0 +1,66 @@
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from app.models import db, Ticket, TicketArchivado
+from app.utils.estadisticas import Estadisticas
+from app.utils.eventos import Eventos
+
+class Archivador:
+    @staticmethod
+    def candidatos(dias, lote):
+        limite = datetime.utcnow() - timedelta(days=dias)
+        ultimo_id = db.session.query(db.func.max(Ticket.id)).scalar() or 0
+        return db.session.query(Ticket.id, Ticket.municipio_id)\
+            .filter(Ticket.estatus == 'Resuelto', Ticket.fecha_creacion < limite, Ticket.id < ultimo_id)\
+            .order_by(Ticket.fecha_creacion)\
+            .limit(lote)
+    
+    @staticmethod
+    def archivar(dias, lote=1000, pausa=0.0, max_lotes=None):
+        total = 0
+        lotes = 0
+        columnas = [columna.name for columna in Ticket.__table__.columns]
+        
+        while max_lotes is None or lotes < max_lotes:
+            filas = Archivador.candidatos(dias, lote).with_for_update(skip_locked=True).all()
+            if not filas:
+                break
+            
+            ids = [fila.id for fila in filas]
+            seleccion = db.select(
+                *[Ticket.__table__.c[columna] for columna in columnas],
+                db.literal(datetime.utcnow(), db.DateTime).label('fecha_archivo')
+            ).where(Ticket.id.in_(ids))
+            
+            try:
+                db.session.execute(
+                    TicketArchivado.__table__.insert().from_select(columnas + ['fecha_archivo'], seleccion)
+                )
+                db.session.execute(Ticket.__table__.delete().where(Ticket.id.in_(ids)))
+                
+                por_municipio = Counter(fila.municipio_id for fila in filas)
+                Estadisticas.registrar_archivados(por_municipio)
+                Eventos.registrar_archivados(por_municipio)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error archivando tickets: {e}")
+                raise
+            
+            total += len(ids)
+            lotes += 1
+            if len(filas) < lote:
+                break
+            if pausa:
+                time.sleep(pausa)
+        
+        return total
+    
+    @staticmethod
+    def buscar_por_curp(curp, numero_turno=None, municipio_id=None):
+        query = TicketArchivado.query.filter(TicketArchivado.curp == curp)
+        if numero_turno is not None:
+            query = query.filter(TicketArchivado.numero_turno == numero_turno)
+        if municipio_id is not None:
+            query = query.filter(TicketArchivado.municipio_id == municipio_id)
+        return query.order_by(TicketArchivado.fecha_creacion.desc())
\ No newline at end of file
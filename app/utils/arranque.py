@@ -0,0 +1,94 @@
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+from io import BytesIO
+
+MODULOS_PESADOS = (
+    'qrcode',
+    'PIL.Image',
+    'reportlab.pdfgen.canvas',
+    'reportlab.lib.utils',
+    'numpy',
+    'matplotlib.figure',
+    'matplotlib.backends.backend_agg',
+)
+
+SCRIPT_PERFIL = """
+import json, sys, time
+inicio = time.perf_counter()
+import app
+importado = time.perf_counter()
+aplicacion = app.create_app()
+creado = time.perf_counter()
+calentado = creado
+if '--calentar' in sys.argv:
+    from app.utils.arranque import calentar
+    calentar(aplicacion)
+    calentado = time.perf_counter()
+print(json.dumps({'importar': importado - inicio, 'create_app': creado - importado, 'calentar': calentado - creado}))
+"""
+
+def calentar(app):
+    tiempos = []
+    for modulo in MODULOS_PESADOS:
+        inicio = time.perf_counter()
+        try:
+            importlib.import_module(modulo)
+        except ImportError as e:
+            print(f"Error precargando {modulo}: {e}")
+            continue
+        tiempos.append((modulo, time.perf_counter() - inicio))
+    
+    for nombre, paso in (('qrcode.png', _calentar_qr), ('matplotlib.font_manager', _calentar_fuentes)):
+        inicio = time.perf_counter()
+        try:
+            paso()
+        except ImportError as e:
+            print(f"Error precargando {nombre}: {e}")
+            continue
+        tiempos.append((nombre, time.perf_counter() - inicio))
+    
+    return tiempos
+
+def _calentar_qr():
+    import qrcode
+    qrcode.make('precarga').save(BytesIO())
+
+def _calentar_fuentes():
+    from matplotlib import font_manager
+    font_manager.findfont('DejaVu Sans')
+
+def perfilar(calentar_modulos=False):
+    argumentos = [sys.executable, '-X', 'importtime', '-c', SCRIPT_PERFIL]
+    if calentar_modulos:
+        argumentos.append('--calentar')
+    
+    resultado = subprocess.run(
+        argumentos,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        capture_output=True,
+        text=True
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(resultado.stderr.strip().splitlines()[-1] if resultado.stderr.strip() else 'error desconocido')
+    
+    modulos = []
+    pila = []
+    for linea in reversed(resultado.stderr.splitlines()):
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        profundidad = (len(nombre) - len(nombre.lstrip()) - 1) // 2
+        del pila[profundidad:]
+        modulos.append({
+            'nombre': nombre.strip(),
+            'padre': pila[-1] if pila else None,
+            'propio': int(propio) / 1000,
+            'acumulado': int(acumulado) / 1000
+        })
+        pila.append(nombre.strip())
+    
+    return json.loads(resultado.stdout.strip().splitlines()[-1]), modulos
\ No newline at end of file
@@ -0,0 +1,41 @@
+from flask import current_app
+from sqlalchemy import or_, case
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import joinedload
+from app.models import db, Ticket, TicketArchivado
+from app.utils.consultas import ConsultasTicket
+
+class BuscadorTickets:
+    COLUMNAS = ('curp', 'nombre', 'apellido_paterno', 'apellido_materno', 'email')
+    
+    @staticmethod
+    def buscar(termino, limite=None, incluir_archivo=False):
+        termino = termino.strip()
+        limite = limite or current_app.config['BUSQUEDA_LIMITE']
+        columnas = [getattr(Ticket, columna) for columna in BuscadorTickets.COLUMNAS]
+        frase = termino.replace('"', '')
+        
+        prefijo = case(
+            (Ticket.curp == termino.upper(), 3),
+            (Ticket.curp.startswith(termino.upper(), autoescape=True), 2),
+            (or_(*[columna.startswith(termino, autoescape=True) for columna in columnas[1:]]), 1),
+            else_=0
+        )
+        
+        if db.engine.dialect.name == 'mysql' and len(frase) >= 2:
+            relevancia = match(*columnas, against=f'"{frase}"').in_boolean_mode()
+            query = ConsultasTicket.con_municipio().filter(relevancia > 0)
+            orden = [prefijo.desc(), relevancia.desc()]
+        else:
+            query = ConsultasTicket.con_municipio().filter(or_(
+                *[columna.contains(termino, autoescape=True) for columna in columnas]
+            ))
+            orden = [prefijo.desc()]
+        
+        tickets = query.order_by(*orden, Ticket.fecha_creacion.desc()).limit(limite).all()
+        if incluir_archivo and len(tickets) < limite:
+            tickets += TicketArchivado.query.options(joinedload(TicketArchivado.municipio))\
+                .filter(TicketArchivado.curp.startswith(termino.upper(), autoescape=True))\
+                .order_by(TicketArchivado.curp, TicketArchivado.numero_turno.desc())\
+                .limit(limite - len(tickets)).all()
+        return tickets
\ No newline at end of file
@@ -0,0 +1,116 @@
+import hashlib
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+class CacheComprobantes:
+    def __init__(self):
+        self._entradas = OrderedDict()
+        self._por_ticket = {}
+        self._lock = threading.Lock()
+        self.max_entradas = 256
+        self.directorio = None
+        self.hits_memoria = 0
+        self.hits_disco = 0
+        self.misses = 0
+    
+    def init_app(self, app):
+        self.max_entradas = app.config['COMPROBANTES_CACHE_ENTRADAS']
+        self.directorio = app.config['COMPROBANTES_CACHE_DIR']
+        if self.directorio:
+            os.makedirs(self.directorio, exist_ok=True)
+    
+    def obtener(self, ticket, generar):
+        clave = self.clave(ticket)
+        
+        with self._lock:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.hits_memoria += 1
+                return self._entradas[clave]
+        
+        contenido = self._leer_disco(clave)
+        if contenido is not None:
+            with self._lock:
+                self.hits_disco += 1
+        else:
+            contenido = generar(ticket).getvalue()
+            self._escribir_disco(clave, contenido)
+            with self._lock:
+                self.misses += 1
+        
+        self._guardar_memoria(clave, contenido)
+        return contenido
+    
+    def invalidar(self, ticket_id):
+        with self._lock:
+            for clave in self._por_ticket.pop(str(ticket_id), ()):
+                self._entradas.pop(clave, None)
+        
+        if self.directorio:
+            shutil.rmtree(os.path.join(self.directorio, str(ticket_id)), ignore_errors=True)
+    
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'entradas': len(self._entradas),
+                'hits_memoria': self.hits_memoria,
+                'hits_disco': self.hits_disco,
+                'misses': self.misses
+            }
+    
+    def clave(self, ticket):
+        contenido = (
+            ticket.fecha_actualizacion, ticket.curp, ticket.nombre, ticket.apellido_paterno, ticket.apellido_materno,
+            ticket.municipio_id, ticket.municipio.nombre, ticket.numero_turno, ticket.fecha_creacion, ticket.estatus
+        )
+        huella = hashlib.sha256(
+            '|'.join(map(str, (ticket.id, *contenido))).encode()
+        ).hexdigest()[:32]
+        return f"{ticket.id}-{huella}"
+    
+    def _guardar_memoria(self, clave, contenido):
+        ticket_id = clave.split('-', 1)[0]
+        with self._lock:
+            self._entradas[clave] = contenido
+            self._entradas.move_to_end(clave)
+            self._por_ticket.setdefault(ticket_id, set()).add(clave)
+            while len(self._entradas) > self.max_entradas:
+                descartada, _ = self._entradas.popitem(last=False)
+                self._olvidar(descartada)
+    
+    def _olvidar(self, clave):
+        ticket_id = clave.split('-', 1)[0]
+        claves = self._por_ticket.get(ticket_id)
+        if claves is not None:
+            claves.discard(clave)
+            if not claves:
+                del self._por_ticket[ticket_id]
+    
+    def _ruta(self, clave):
+        ticket_id, huella = clave.split('-', 1)
+        return os.path.join(self.directorio, ticket_id, f"{huella}.pdf")
+    
+    def _leer_disco(self, clave):
+        if not self.directorio:
+            return None
+        try:
+            with open(self._ruta(clave), 'rb') as archivo:
+                return archivo.read()
+        except OSError:
+            return None
+    
+    def _escribir_disco(self, clave, contenido):
+        if not self.directorio:
+            return
+        temporal = f"{self._ruta(clave)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(temporal), exist_ok=True)
+            with open(temporal, 'wb') as archivo:
+                archivo.write(contenido)
+            os.replace(temporal, self._ruta(clave))
+        except OSError as e:
+            print(f"Error guardando comprobante en disco: {e}")
+
+cache_comprobantes = CacheComprobantes()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import namedtuple
+from flask_login import UserMixin
+from sqlalchemy import event, inspect
+from app.models import db, Usuario
+from app.utils.versiones import al_confirmar, incrementar_version, leer_version
+
+class UsuarioSesion(UserMixin, namedtuple('UsuarioSesion', ['id', 'username', 'email', 'es_admin', 'activo'])):
+    __slots__ = ()
+    
+    @property
+    def is_active(self):
+        return self.activo
+
+class CacheUsuarios:
+    CLAVE_VERSION = 'usuarios'
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entradas = {}
+        self._version = None
+        self._verificado = float('-inf')
+        self._generacion = 0
+        self.ttl = 60
+        self.intervalo = 5.0
+        self.hits = 0
+        self.misses = 0
+    
+    def init_app(self, app):
+        self.ttl = app.config['USUARIOS_CACHE_TTL']
+        self.intervalo = app.config['USUARIOS_INTERVALO_VERIFICACION']
+        
+        if not event.contains(Usuario, 'after_update', self._usuario_modificado):
+            event.listen(Usuario, 'after_update', self._usuario_modificado)
+            event.listen(Usuario, 'after_delete', self._usuario_modificado)
+    
+    def obtener(self, usuario_id):
+        ahora = time.monotonic()
+        self._verificar_version(ahora)
+        
+        with self._lock:
+            entrada = self._entradas.get(usuario_id)
+            if entrada and entrada[1] > ahora:
+                self.hits += 1
+                return entrada[0]
+            self.misses += 1
+            generacion = self._generacion
+        
+        usuario = db.session.get(Usuario, usuario_id)
+        if usuario is None or not usuario.activo:
+            self.evictar(usuario_id)
+            return None
+        
+        sesion = UsuarioSesion(usuario.id, usuario.username, usuario.email, usuario.es_admin, usuario.activo)
+        with self._lock:
+            if generacion == self._generacion:
+                self._entradas[usuario_id] = (sesion, ahora + self.ttl)
+        return sesion
+    
+    def evictar(self, usuario_id):
+        with self._lock:
+            self._entradas.pop(usuario_id, None)
+            self._generacion += 1
+    
+    def estadisticas(self):
+        with self._lock:
+            return {'entradas': len(self._entradas), 'hits': self.hits, 'misses': self.misses}
+    
+    def _verificar_version(self, ahora):
+        if ahora - self._verificado < self.intervalo:
+            return
+        
+        version = leer_version(self.CLAVE_VERSION)
+        with self._lock:
+            if version != self._version:
+                self._entradas.clear()
+                self._generacion += 1
+                self._version = version
+            self._verificado = ahora
+    
+    def _usuario_modificado(self, mapper, conexion, usuario):
+        incrementar_version(conexion, self.CLAVE_VERSION)
+        usuario_id = usuario.id
+        al_confirmar(lambda: self.evictar(usuario_id), inspect(usuario).session)
+
+cache_usuarios = CacheUsuarios()
\ No newline at end of file
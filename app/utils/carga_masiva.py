@@ -0,0 +1,175 @@
+import csv
+import io
+import json
+from datetime import datetime
+from flask import current_app, request
+from app.models import db, Ticket
+from app.utils.catalogo import catalogo_municipios
+from app.utils.estadisticas import Estadisticas
+from app.utils.eventos import Eventos
+from app.utils.turno_manager import TurnoManager
+
+CAMPOS_REQUERIDOS = ('curp', 'nombre', 'apellido_paterno', 'apellido_materno', 'telefono', 'email', 'municipio_id')
+LONGITUDES = {
+    campo: Ticket.__table__.c[campo].type.length
+    for campo in CAMPOS_REQUERIDOS if campo != 'municipio_id'
+}
+
+class CargaMasiva:
+    def __init__(self, tamano_lote, max_filas):
+        self.tamano_lote = tamano_lote
+        self.max_filas = max_filas
+        self.truncado = False
+        self.turno_manager = TurnoManager()
+        self.municipios_activos = {municipio.id for municipio in catalogo_municipios.activos()}
+        self.vistos = set()
+        self.resultados = []
+    
+    @staticmethod
+    def leer_ndjson(flujo):
+        for linea in io.TextIOWrapper(flujo, encoding='utf-8'):
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                yield json.loads(linea)
+            except ValueError:
+                yield None
+    
+    @staticmethod
+    def leer_csv(flujo):
+        yield from csv.DictReader(io.TextIOWrapper(flujo, encoding='utf-8'))
+    
+    @staticmethod
+    def autorizado(usuario):
+        token = current_app.config['BULK_TOKEN']
+        if token and request.headers.get('Authorization') == f"Bearer {token}":
+            return True
+        return usuario.is_authenticated and usuario.es_admin
+    
+    def procesar(self, filas):
+        lote = []
+        for numero, fila in enumerate(filas, start=1):
+            if numero > self.max_filas:
+                self.truncado = True
+                self._error(numero, f"Se alcanzó el máximo de {self.max_filas} filas por carga; no se procesaron las siguientes")
+                break
+            lote.append((numero, fila))
+            if len(lote) == self.tamano_lote:
+                self._procesar_lote(lote)
+                lote = []
+        if lote:
+            self._procesar_lote(lote)
+        
+        self.resultados.sort(key=lambda resultado: resultado['fila'])
+        creados = sum(1 for resultado in self.resultados if resultado['estado'] == 'creado')
+        return {
+            'total': len(self.resultados),
+            'creados': creados,
+            'errores': len(self.resultados) - creados,
+            'truncado': self.truncado,
+            'resultados': self.resultados
+        }
+    
+    def _procesar_lote(self, lote):
+        validas = []
+        for numero, fila in lote:
+            error = self._validar(fila)
+            if error:
+                self._error(numero, error)
+            else:
+                validas.append((numero, self._normalizar(fila)))
+        
+        existentes = self._existentes([fila for _, fila in validas])
+        nuevas = []
+        for numero, fila in validas:
+            clave = (fila['municipio_id'], fila['curp'])
+            if clave in existentes:
+                self._error(numero, 'Ya existe un turno para esta CURP en el municipio')
+            elif clave in self.vistos:
+                self._error(numero, 'CURP duplicada para el mismo municipio dentro de la carga')
+            else:
+                self.vistos.add(clave)
+                nuevas.append((numero, fila))
+        
+        if not nuevas:
+            return
+        
+        try:
+            por_municipio = {}
+            for numero, fila in nuevas:
+                por_municipio.setdefault(fila['municipio_id'], []).append(fila)
+            
+            for municipio_id, filas in por_municipio.items():
+                primero = self.turno_manager.reservar_turnos(municipio_id, len(filas))
+                for desplazamiento, fila in enumerate(filas):
+                    fila['numero_turno'] = primero + desplazamiento
+            
+            db.session.execute(Ticket.__table__.insert(), [fila for _, fila in nuevas])
+            Estadisticas.registrar_altas([fila for _, fila in nuevas])
+            Eventos.registrar_altas([fila for _, fila in nuevas])
+            db.session.commit()
+            
+        except Exception:
+            db.session.rollback()
+            # El error del motor incluye el INSERT completo con los datos personales del lote
+            current_app.logger.exception(f"Error guardando un lote de {len(nuevas)} tickets de la carga masiva")
+            for numero, fila in nuevas:
+                self.vistos.discard((fila['municipio_id'], fila['curp']))
+                self._error(numero, 'No se pudo guardar el lote de esta fila; vuelve a enviarla')
+            return
+        
+        for numero, fila in nuevas:
+            self.resultados.append({
+                'fila': numero,
+                'estado': 'creado',
+                'municipio_id': fila['municipio_id'],
+                'numero_turno': fila['numero_turno']
+            })
+    
+    def _validar(self, fila):
+        if not isinstance(fila, dict):
+            return 'Fila con formato inválido'
+        
+        faltantes = [campo for campo in CAMPOS_REQUERIDOS if not str(fila.get(campo) or '').strip()]
+        if faltantes:
+            return f"Campos requeridos faltantes: {', '.join(faltantes)}"
+        
+        largos = [campo for campo, longitud in LONGITUDES.items() if len(str(fila[campo]).strip()) > longitud]
+        if largos:
+            return f"Campos demasiado largos: {', '.join(f'{campo} (máximo {LONGITUDES[campo]})' for campo in largos)}"
+        
+        try:
+            municipio_id = int(fila['municipio_id'])
+        except (TypeError, ValueError):
+            return 'municipio_id inválido'
+        if municipio_id not in self.municipios_activos:
+            return 'El municipio no existe o no está activo'
+        
+        return None
+    
+    def _normalizar(self, fila):
+        ahora = datetime.utcnow()
+        normalizada = {campo: str(fila[campo]).strip() for campo in CAMPOS_REQUERIDOS}
+        normalizada['municipio_id'] = int(normalizada['municipio_id'])
+        normalizada['estatus'] = 'Pendiente'
+        normalizada['fecha_creacion'] = ahora
+        normalizada['fecha_actualizacion'] = ahora
+        return normalizada
+    
+    def _existentes(self, filas):
+        if not filas:
+            return set()
+        
+        # Solo se consulta tickets: un turno archivado ya fue resuelto y, igual que en el
+        # alta individual (el índice único cubre solo tickets), la CURP puede pedir uno nuevo
+        curps = {fila['curp'] for fila in filas}
+        municipios = {fila['municipio_id'] for fila in filas}
+        return set(
+            db.session.query(Ticket.municipio_id, Ticket.curp)
+            .filter(Ticket.curp.in_(curps), Ticket.municipio_id.in_(municipios))
+            .all()
+        )
+    
+    def _error(self, numero, mensaje):
+        self.resultados.append({'fila': numero, 'estado': 'error', 'error': mensaje})
\ No newline at end of file
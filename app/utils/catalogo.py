@@ -0,0 +1,63 @@
+import threading
+import time
+from collections import namedtuple
+from app.models import db, Municipio
+from app.utils.versiones import al_confirmar, incrementar_version, leer_version
+
+MunicipioCatalogo = namedtuple('MunicipioCatalogo', ['id', 'nombre', 'codigo', 'activo'])
+
+class CatalogoMunicipios:
+    CLAVE_VERSION = 'municipios'
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._municipios = ()
+        self._verificado = float('-inf')
+        self._generacion = 0
+        self.intervalo = 5.0
+    
+    def init_app(self, app):
+        self.intervalo = app.config['CATALOGO_INTERVALO_VERIFICACION']
+    
+    def activos(self):
+        return [municipio for municipio in self._vigentes() if municipio.activo]
+    
+    def obtener(self, municipio_id):
+        for municipio in self._vigentes():
+            if str(municipio.id) == str(municipio_id):
+                return municipio
+        return None
+    
+    def invalidar(self):
+        incrementar_version(db.session, self.CLAVE_VERSION)
+        al_confirmar(self._olvidar)
+    
+    def _olvidar(self):
+        with self._lock:
+            self._version = None
+            self._verificado = float('-inf')
+            self._generacion += 1
+    
+    def _vigentes(self):
+        ahora = time.monotonic()
+        if ahora - self._verificado < self.intervalo:
+            return self._municipios
+        
+        generacion = self._generacion
+        version = leer_version(self.CLAVE_VERSION)
+        with self._lock:
+            if generacion != self._generacion:
+                return self._municipios
+            if version != self._version:
+                self._municipios = tuple(
+                    MunicipioCatalogo(m.id, m.nombre, m.codigo, m.activo)
+                    for m in db.session.query(
+                        Municipio.id, Municipio.nombre, Municipio.codigo, Municipio.activo
+                    ).order_by(Municipio.id)
+                )
+                self._version = version
+            self._verificado = ahora
+            return self._municipios
+
+catalogo_municipios = CatalogoMunicipios()
\ No newline at end of file
@@ -0,0 +1,50 @@
+import gzip
+import zlib
+from flask import request
+
+TIPOS_COMPRIMIBLES = ('application/json', 'application/x-ndjson', 'text/csv', 'text/plain')
+
+class Compresion:
+    def __init__(self):
+        self.minimo = 2048
+        self.nivel = 6
+    
+    def init_app(self, app):
+        self.minimo = app.config['COMPRESION_MINIMO']
+        self.nivel = app.config['COMPRESION_NIVEL']
+        app.after_request(self._comprimir)
+    
+    def _comprimir(self, respuesta):
+        if (respuesta.status_code != 200
+                or respuesta.mimetype not in TIPOS_COMPRIMIBLES
+                or 'Content-Encoding' in respuesta.headers
+                or not request.accept_encodings['gzip']):
+            return respuesta
+        
+        respuesta.vary.add('Accept-Encoding')
+        if respuesta.is_streamed:
+            respuesta.response = self._comprimir_flujo(respuesta.response)
+            respuesta.headers.pop('Content-Length', None)
+        else:
+            datos = respuesta.get_data()
+            if len(datos) < self.minimo:
+                return respuesta
+            respuesta.set_data(gzip.compress(datos, self.nivel))
+        
+        respuesta.headers['Content-Encoding'] = 'gzip'
+        return respuesta
+    
+    def _comprimir_flujo(self, partes):
+        compresor = zlib.compressobj(self.nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        try:
+            for parte in partes:
+                if isinstance(parte, str):
+                    parte = parte.encode()
+                # Cada parte sale completa al cliente en lugar de esperar a llenar el búfer de zlib
+                yield compresor.compress(parte) + compresor.flush(zlib.Z_SYNC_FLUSH)
+            yield compresor.flush()
+        finally:
+            if hasattr(partes, 'close'):
+                partes.close()
+
+compresion = Compresion()
\ No newline at end of file
@@ -0,0 +1,52 @@
+from sqlalchemy.orm import joinedload
+from app.models import db, Ticket, TicketArchivado, Municipio
+
+CAMPOS_API = ('id', 'curp', 'nombre_completo', 'municipio', 'numero_turno', 'estatus', 'fecha_creacion')
+
+class ConsultasTicket:
+    @staticmethod
+    def con_municipio():
+        return Ticket.query.options(joinedload(Ticket.municipio))
+    
+    @staticmethod
+    def obtener_con_municipio(ticket_id, incluir_archivo=False):
+        if not incluir_archivo:
+            return ConsultasTicket.con_municipio().get_or_404(ticket_id)
+        
+        ticket = ConsultasTicket.con_municipio().filter_by(id=ticket_id).first()
+        if ticket is None:
+            ticket = TicketArchivado.query.options(joinedload(TicketArchivado.municipio)).get_or_404(ticket_id)
+        return ticket
+    
+    @staticmethod
+    def filas_api(municipio_id=None, estatus=None, after_id=None, campos=CAMPOS_API):
+        query = db.session.query(
+            Ticket.id,
+            *[ConsultasTicket._columna_api(campo) for campo in campos if campo != 'id']
+        )
+        if 'municipio' in campos:
+            query = query.join(Municipio, Municipio.id == Ticket.municipio_id)
+        
+        if municipio_id:
+            query = query.filter(Ticket.municipio_id == municipio_id)
+        if estatus:
+            query = query.filter(Ticket.estatus == estatus)
+        if after_id:
+            query = query.filter(Ticket.id > after_id)
+        
+        return query
+    
+    @staticmethod
+    def serializar_fila_api(fila, campos=CAMPOS_API):
+        datos = fila._asdict()
+        if 'id' not in campos:
+            del datos['id']
+        return datos
+    
+    @staticmethod
+    def _columna_api(campo):
+        if campo == 'nombre_completo':
+            return (Ticket.nombre + ' ' + Ticket.apellido_paterno + ' ' + Ticket.apellido_materno).label(campo)
+        if campo == 'municipio':
+            return Municipio.nombre.label(campo)
+        return getattr(Ticket, campo)
\ No newline at end of file
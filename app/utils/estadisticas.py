@@ -0,0 +1,244 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import mysql, sqlite
+from app.models import db, Ticket, TicketArchivado, Municipio, EstadisticaMunicipio, EstadisticaDiaria, EstadisticaArchivo
+
+COLUMNA_ESTATUS = {'Pendiente': 'pendientes', 'Resuelto': 'resueltos'}
+
+class Estadisticas:
+    @staticmethod
+    def registrar():
+        if not event.contains(db.session, 'before_flush', Estadisticas._acumular_cambios):
+            event.listen(db.session, 'before_flush', Estadisticas._acumular_cambios)
+    
+    @staticmethod
+    def resumen(municipio_id=None, incluir_archivo=False):
+        archivados = db.select(db.func.coalesce(db.func.sum(EstadisticaArchivo.resueltos), 0))
+        if municipio_id:
+            archivados = archivados.where(EstadisticaArchivo.municipio_id == municipio_id)
+        
+        query = db.session.query(
+            db.func.coalesce(db.func.sum(EstadisticaMunicipio.pendientes), 0),
+            db.func.coalesce(db.func.sum(EstadisticaMunicipio.resueltos), 0),
+            archivados.scalar_subquery() if incluir_archivo else db.literal(0)
+        )
+        if municipio_id:
+            query = query.filter(EstadisticaMunicipio.municipio_id == municipio_id)
+        
+        pendientes, resueltos, archivados = query.one()
+        resueltos += archivados
+        return {
+            'total': int(pendientes + resueltos),
+            'pendientes': int(pendientes),
+            'resueltos': int(resueltos)
+        }
+    
+    @staticmethod
+    def por_municipio(incluir_archivo=False):
+        resueltos = EstadisticaMunicipio.resueltos
+        if incluir_archivo:
+            resueltos = resueltos + db.func.coalesce(EstadisticaArchivo.resueltos, 0)
+        total = EstadisticaMunicipio.pendientes + resueltos
+        
+        query = db.session.query(
+            Municipio.id,
+            Municipio.nombre,
+            total.label('total_tickets'),
+            EstadisticaMunicipio.pendientes,
+            resueltos.label('resueltos')
+        ).join(EstadisticaMunicipio, Municipio.id == EstadisticaMunicipio.municipio_id)
+        if incluir_archivo:
+            query = query.outerjoin(EstadisticaArchivo, Municipio.id == EstadisticaArchivo.municipio_id)
+        
+        return query.filter(total > 0).order_by(Municipio.id).all()
+    
+    @staticmethod
+    def totales_por_municipio():
+        return {
+            municipio_id: pendientes + resueltos + archivados
+            for municipio_id, pendientes, resueltos, archivados in db.session.query(
+                EstadisticaMunicipio.municipio_id,
+                EstadisticaMunicipio.pendientes,
+                EstadisticaMunicipio.resueltos,
+                db.func.coalesce(EstadisticaArchivo.resueltos, 0)
+            ).outerjoin(EstadisticaArchivo, EstadisticaMunicipio.municipio_id == EstadisticaArchivo.municipio_id)
+        }
+    
+    @staticmethod
+    def por_dia(dias=7):
+        fecha_limite = (datetime.utcnow() - timedelta(days=dias)).date()
+        return db.session.query(
+            EstadisticaDiaria.fecha,
+            db.func.sum(EstadisticaDiaria.creados).label('cantidad')
+        ).filter(EstadisticaDiaria.fecha >= fecha_limite)\
+         .group_by(EstadisticaDiaria.fecha)\
+         .having(db.func.sum(EstadisticaDiaria.creados) > 0)\
+         .order_by(EstadisticaDiaria.fecha)\
+         .all()
+    
+    @staticmethod
+    def verificar(reconstruir=False):
+        esperados = Estadisticas._calcular_desde_tickets()
+        actuales = Counter()
+        for fila in EstadisticaMunicipio.query.all():
+            actuales[('municipio', fila.municipio_id, 'pendientes')] = fila.pendientes
+            actuales[('municipio', fila.municipio_id, 'resueltos')] = fila.resueltos
+        for fila in EstadisticaDiaria.query.all():
+            actuales[('dia', fila.municipio_id, fila.fecha)] = fila.creados
+        for fila in EstadisticaArchivo.query.all():
+            actuales[('archivo', fila.municipio_id, 'resueltos')] = fila.resueltos
+        
+        diferencias = [
+            (clave, actuales[clave], esperados[clave])
+            for clave in sorted(set(esperados) | set(actuales), key=str)
+            if actuales[clave] != esperados[clave]
+        ]
+        
+        if reconstruir and diferencias:
+            EstadisticaDiaria.query.delete()
+            EstadisticaMunicipio.query.delete()
+            EstadisticaArchivo.query.delete()
+            Estadisticas._aplicar(db.session.connection(), esperados)
+            db.session.commit()
+        
+        return diferencias
+    
+    @staticmethod
+    def registrar_altas(filas):
+        deltas = Counter()
+        for fila in filas:
+            fecha_creacion = fila.get('fecha_creacion') or datetime.utcnow()
+            valores = (int(fila['municipio_id']), fila.get('estatus') or 'Pendiente', fecha_creacion.date())
+            Estadisticas._sumar(deltas, valores, 1)
+        
+        if deltas:
+            Estadisticas._aplicar(db.session.connection(), deltas)
+    
+    @staticmethod
+    def registrar_archivados(por_municipio):
+        deltas = Counter()
+        for municipio_id, cantidad in por_municipio.items():
+            deltas[('municipio', municipio_id, 'resueltos')] -= cantidad
+            deltas[('archivo', municipio_id, 'resueltos')] += cantidad
+        
+        if deltas:
+            Estadisticas._aplicar(db.session.connection(), deltas)
+    
+    @staticmethod
+    def _calcular_desde_tickets():
+        esperados = Counter()
+        por_estatus = db.session.query(
+            Ticket.municipio_id, Ticket.estatus, db.func.count(Ticket.id)
+        ).group_by(Ticket.municipio_id, Ticket.estatus).all()
+        for municipio_id, estatus, cantidad in por_estatus:
+            esperados[('municipio', municipio_id, COLUMNA_ESTATUS[estatus])] += cantidad
+        
+        archivados = db.session.query(
+            TicketArchivado.municipio_id, db.func.count(TicketArchivado.id)
+        ).group_by(TicketArchivado.municipio_id).all()
+        for municipio_id, cantidad in archivados:
+            esperados[('archivo', municipio_id, 'resueltos')] += cantidad
+        
+        for modelo in (Ticket, TicketArchivado):
+            fecha = db.func.date(modelo.fecha_creacion)
+            por_fecha = db.session.query(
+                modelo.municipio_id, fecha, db.func.count(modelo.id)
+            ).group_by(modelo.municipio_id, fecha).all()
+            for municipio_id, dia, cantidad in por_fecha:
+                if isinstance(dia, str):
+                    dia = datetime.strptime(dia, '%Y-%m-%d').date()
+                esperados[('dia', municipio_id, dia)] += cantidad
+        
+        return esperados
+    
+    @staticmethod
+    def _acumular_cambios(session, flush_context, instances):
+        deltas = Counter()
+        
+        for ticket in session.new:
+            if isinstance(ticket, Ticket):
+                Estadisticas._sumar(deltas, Estadisticas._valores_actuales(ticket), 1)
+        
+        for ticket in session.deleted:
+            if isinstance(ticket, Ticket):
+                Estadisticas._sumar(deltas, Estadisticas._valores_originales(ticket), -1)
+        
+        for ticket in session.dirty:
+            if isinstance(ticket, Ticket) and session.is_modified(ticket):
+                originales = Estadisticas._valores_originales(ticket)
+                actuales = Estadisticas._valores_actuales(ticket)
+                if originales != actuales:
+                    Estadisticas._sumar(deltas, originales, -1)
+                    Estadisticas._sumar(deltas, actuales, 1)
+        
+        deltas = Counter({clave: valor for clave, valor in deltas.items() if valor})
+        if deltas:
+            Estadisticas._aplicar(session.connection(), deltas)
+    
+    @staticmethod
+    def _valores_actuales(ticket):
+        fecha_creacion = ticket.fecha_creacion or datetime.utcnow()
+        return (int(ticket.municipio_id), ticket.estatus or 'Pendiente', fecha_creacion.date())
+    
+    @staticmethod
+    def _valores_originales(ticket):
+        estado = inspect(ticket)
+        
+        def original(atributo):
+            historial = estado.attrs[atributo].history
+            if historial.deleted:
+                return historial.deleted[0]
+            if historial.unchanged:
+                return historial.unchanged[0]
+            return getattr(ticket, atributo)
+        
+        fecha_creacion = original('fecha_creacion') or datetime.utcnow()
+        return (int(original('municipio_id')), original('estatus') or 'Pendiente', fecha_creacion.date())
+    
+    @staticmethod
+    def _sumar(deltas, valores, signo):
+        municipio_id, estatus, fecha = valores
+        deltas[('municipio', municipio_id, COLUMNA_ESTATUS[estatus])] += signo
+        deltas[('dia', municipio_id, fecha)] += signo
+    
+    @staticmethod
+    def _aplicar(conexion, deltas):
+        por_municipio = {}
+        for (tipo, municipio_id, detalle), valor in deltas.items():
+            if tipo == 'municipio':
+                por_municipio.setdefault(municipio_id, {'pendientes': 0, 'resueltos': 0})[detalle] += valor
+            elif tipo == 'archivo':
+                Estadisticas._upsert(
+                    conexion, EstadisticaArchivo.__table__,
+                    {'municipio_id': municipio_id},
+                    {'resueltos': valor}
+                )
+            else:
+                Estadisticas._upsert(
+                    conexion, EstadisticaDiaria.__table__,
+                    {'fecha': detalle, 'municipio_id': municipio_id},
+                    {'creados': valor}
+                )
+        
+        for municipio_id, incrementos in por_municipio.items():
+            Estadisticas._upsert(
+                conexion, EstadisticaMunicipio.__table__,
+                {'municipio_id': municipio_id},
+                incrementos
+            )
+    
+    @staticmethod
+    def _upsert(conexion, tabla, claves, incrementos):
+        if conexion.dialect.name == 'mysql':
+            sentencia = mysql.insert(tabla).values(**claves, **incrementos)
+            sentencia = sentencia.on_duplicate_key_update({
+                columna: tabla.c[columna] + sentencia.inserted[columna] for columna in incrementos
+            })
+        else:
+            sentencia = sqlite.insert(tabla).values(**claves, **incrementos)
+            sentencia = sentencia.on_conflict_do_update(
+                index_elements=list(claves),
+                set_={columna: tabla.c[columna] + sentencia.excluded[columna] for columna in incrementos}
+            )
+        conexion.execute(sentencia)
\ No newline at end of file
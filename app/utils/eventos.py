@@ -0,0 +1,349 @@
+import json
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect
+from app.models import db, Ticket, Evento
+from app.utils.catalogo import catalogo_municipios
+from app.utils.estadisticas import COLUMNA_ESTATUS
+from app.utils.versiones import incrementar_version
+
+TIPOS_CON_TICKET = ('ticket_creado', 'ticket_actualizado')
+
+class Eventos:
+    CLAVE_VERSION = 'tickets'
+    
+    @staticmethod
+    def registrar():
+        if not event.contains(db.session, 'after_flush', Eventos._registrar_cambios):
+            event.listen(db.session, 'after_flush', Eventos._registrar_cambios)
+            event.listen(db.session, 'before_commit', Eventos._incrementar_version)
+            event.listen(db.session, 'after_rollback', Eventos._descartar_version)
+    
+    @staticmethod
+    def registrar_altas(filas):
+        por_municipio = Counter(int(fila['municipio_id']) for fila in filas)
+        if por_municipio:
+            db.session.info['tickets_modificados'] = True
+            db.session.execute(Evento.__table__.insert(), [
+                Eventos._fila('tickets_masivos', None, municipio_id, {'cantidad': cantidad, 'estatus': 'Pendiente'})
+                for municipio_id, cantidad in por_municipio.items()
+            ])
+    
+    @staticmethod
+    def registrar_archivados(por_municipio):
+        if por_municipio:
+            db.session.info['tickets_modificados'] = True
+            db.session.execute(Evento.__table__.insert(), [
+                Eventos._fila('tickets_archivados', None, municipio_id, {'cantidad': cantidad, 'estatus': 'Resuelto'})
+                for municipio_id, cantidad in por_municipio.items()
+            ])
+    
+    @staticmethod
+    def _registrar_cambios(session, flush_context):
+        filas = []
+        
+        for ticket in session.new:
+            if isinstance(ticket, Ticket):
+                filas.append(Eventos._fila('ticket_creado', ticket.id, ticket.municipio_id, {
+                    'estatus': ticket.estatus or 'Pendiente',
+                    'numero_turno': ticket.numero_turno
+                }))
+        
+        for ticket in session.deleted:
+            if isinstance(ticket, Ticket):
+                filas.append(Eventos._fila('ticket_eliminado', ticket.id, Eventos._original(ticket, 'municipio_id'), {
+                    'estatus': Eventos._original(ticket, 'estatus'),
+                    'numero_turno': Eventos._original(ticket, 'numero_turno')
+                }))
+        
+        for ticket in session.dirty:
+            if isinstance(ticket, Ticket) and session.is_modified(ticket):
+                datos = {'estatus': ticket.estatus, 'numero_turno': ticket.numero_turno}
+                estatus_anterior = Eventos._original(ticket, 'estatus')
+                municipio_anterior = int(Eventos._original(ticket, 'municipio_id'))
+                if estatus_anterior != ticket.estatus:
+                    datos['estatus_anterior'] = estatus_anterior
+                if municipio_anterior != int(ticket.municipio_id):
+                    datos['municipio_anterior'] = municipio_anterior
+                    datos['numero_turno_anterior'] = Eventos._original(ticket, 'numero_turno')
+                
+                tipo = 'estatus_cambiado' if set(datos) == {'estatus', 'numero_turno', 'estatus_anterior'} else 'ticket_actualizado'
+                filas.append(Eventos._fila(tipo, ticket.id, ticket.municipio_id, datos))
+        
+        if filas:
+            session.connection().execute(Evento.__table__.insert(), filas)
+            session.info['tickets_modificados'] = True
+    
+    @staticmethod
+    def _incrementar_version(session):
+        # Los ids de eventos pueden confirmarse fuera de orden; la versión solo cambia al confirmar.
+        # Se incrementa al final de la transacción para que su bloqueo sea el último y el más breve.
+        session.flush()
+        if session.info.pop('tickets_modificados', False):
+            incrementar_version(session.connection(), Eventos.CLAVE_VERSION)
+    
+    @staticmethod
+    def _descartar_version(session):
+        session.info.pop('tickets_modificados', None)
+    
+    @staticmethod
+    def _original(ticket, atributo):
+        historial = inspect(ticket).attrs[atributo].history
+        if historial.deleted:
+            return historial.deleted[0]
+        if historial.unchanged:
+            return historial.unchanged[0]
+        return getattr(ticket, atributo)
+    
+    @staticmethod
+    def _fila(tipo, ticket_id, municipio_id, datos):
+        return {
+            'tipo': tipo,
+            'ticket_id': ticket_id,
+            'municipio_id': int(municipio_id),
+            'datos': json.dumps(datos),
+            'fecha': datetime.utcnow()
+        }
+
+class DespachadorEventos:
+    def __init__(self):
+        self.app = None
+        self._lock = threading.Lock()
+        self._condicion = threading.Condition()
+        self._hilo = None
+        self._eventos = deque(maxlen=1000)
+        self._secuencia = 0
+        self._ultimo_id = 0
+        self._descartado = 0
+        self._marca = 0
+        self._pendientes = set()
+        self._huecos = {}
+        self._clientes = 0
+        self._purgado = float('-inf')
+        self._oyentes = []
+    
+    def init_app(self, app):
+        self.app = app
+        self.intervalo = app.config['EVENTOS_INTERVALO']
+        self.latido = app.config['EVENTOS_LATIDO']
+        self.max_clientes = app.config['EVENTOS_MAX_CLIENTES']
+        self.duracion = app.config['EVENTOS_DURACION']
+        self.reintento = app.config['EVENTOS_REINTENTO']
+        self.reintento_saturado = app.config['EVENTOS_REINTENTO_SATURADO']
+        self.espera_huecos = app.config['EVENTOS_ESPERA_HUECOS']
+        self.retencion = timedelta(hours=app.config['EVENTOS_RETENCION_HORAS'])
+        self._eventos = deque(maxlen=app.config['EVENTOS_BUFFER'])
+    
+    def agregar_oyente(self, oyente):
+        if oyente not in self._oyentes:
+            self._oyentes.append(oyente)
+    
+    def suscribir(self, ultimo_id=None):
+        with self._lock:
+            if self._clientes >= self.max_clientes:
+                return None
+            self._clientes += 1
+        
+        try:
+            self.iniciar()
+            flujo = self._transmitir(ultimo_id)
+            # Arranca el generador para que close() libere el lugar aunque nunca se lea
+            next(flujo)
+            return flujo
+        except Exception:
+            self._liberar()
+            raise
+    
+    def _liberar(self):
+        with self._lock:
+            self._clientes -= 1
+    
+    def iniciar(self):
+        if self._hilo:
+            return
+        
+        with self._lock:
+            if self._hilo:
+                return
+            with self.app.app_context():
+                self._marca = db.session.query(db.func.coalesce(db.func.max(Evento.id), 0)).scalar()
+            self._ultimo_id = self._descartado = self._marca
+            self._hilo = threading.Thread(target=self._ciclo, name='despachador-eventos', daemon=True)
+            self._hilo.start()
+    
+    def esperar(self, cursor, timeout):
+        with self._condicion:
+            self._condicion.wait_for(lambda: self._secuencia > cursor, timeout)
+            if self._eventos and self._eventos[0][0] > cursor + 1:
+                return None, self._secuencia
+            return [evento for secuencia, evento in self._eventos if secuencia > cursor], self._secuencia
+    
+    def _posicion(self, ultimo_id):
+        with self._condicion:
+            if ultimo_id is None:
+                return self._secuencia, self._ultimo_id, []
+            if ultimo_id < self._descartado:
+                return self._secuencia, self._ultimo_id, None
+            return self._secuencia, self._ultimo_id, [evento for _, evento in self._eventos if evento['id'] > ultimo_id]
+    
+    def estadisticas(self):
+        return {'clientes': self._clientes, 'ultimo_id': self._ultimo_id, 'en_memoria': len(self._eventos)}
+    
+    def _transmitir(self, ultimo_id):
+        try:
+            cursor, vigente, eventos = self._posicion(ultimo_id)
+            limite = time.monotonic() + self.duracion
+            yield
+            
+            # La conexión se cierra al vencer la duración y el navegador se reconecta con
+            # Last-Event-ID; así ningún hilo del servidor queda ocupado indefinidamente
+            yield f"retry: {self.reintento * 1000}\n" + (f"id: {vigente}\n\n" if ultimo_id is None else "\n")
+            while True:
+                if eventos is None:
+                    yield f"id: {self._ultimo_id}\nevent: recargar\ndata: {{}}\n\n"
+                for evento in eventos or []:
+                    encabezado = f"id: {evento['id']}\n" if evento['tipo'] != 'contadores' else ''
+                    yield f"{encabezado}event: {evento['tipo']}\ndata: {json.dumps(evento)}\n\n"
+                
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    return
+                eventos, cursor = self.esperar(cursor, min(self.latido, restante))
+                if eventos == []:
+                    yield ": latido\n\n"
+        finally:
+            self._liberar()
+    
+    def _ciclo(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    self._sondear()
+                    self._purgar()
+            except Exception as e:
+                print(f"Error en el despachador de eventos: {e}")
+            time.sleep(self.intervalo)
+    
+    def _sondear(self):
+        filas = Evento.query.filter(Evento.id > self._marca).order_by(Evento.id).limit(500).all()
+        nuevas = [fila for fila in filas if fila.id not in self._pendientes]
+        self._avanzar_marca([fila.id for fila in nuevas])
+        if not nuevas:
+            return
+        
+        for oyente in self._oyentes:
+            try:
+                oyente(nuevas)
+            except Exception as e:
+                print(f"Error notificando eventos: {e}")
+        
+        eventos = self._serializar(nuevas)
+        with self._condicion:
+            for evento in eventos:
+                if len(self._eventos) == self._eventos.maxlen:
+                    self._descartado = max(self._descartado, self._eventos[0][1]['id'])
+                self._secuencia += 1
+                self._eventos.append((self._secuencia, evento))
+            self._ultimo_id = max(self._ultimo_id, *(evento['id'] for evento in eventos))
+            self._condicion.notify_all()
+    
+    def _avanzar_marca(self, ids):
+        ahora = time.monotonic()
+        self._pendientes.update(ids)
+        for evento_id in sorted(self._pendientes):
+            if evento_id != self._marca + 1:
+                inicio_hueco = self._huecos.setdefault(self._marca + 1, ahora)
+                if ahora - inicio_hueco < self.espera_huecos:
+                    break
+                self._huecos.pop(self._marca + 1)
+            self._marca = evento_id
+        self._pendientes = {evento_id for evento_id in self._pendientes if evento_id > self._marca}
+    
+    def _serializar(self, filas):
+        ids_tickets = {fila.ticket_id for fila in filas if fila.tipo in TIPOS_CON_TICKET}
+        tickets = {}
+        if ids_tickets:
+            tickets = {
+                ticket.id: ticket for ticket in db.session.query(
+                    Ticket.id, Ticket.curp, Ticket.nombre, Ticket.apellido_paterno, Ticket.apellido_materno,
+                    Ticket.email, Ticket.telefono, Ticket.municipio_id, Ticket.numero_turno, Ticket.estatus,
+                    Ticket.fecha_creacion
+                ).filter(Ticket.id.in_(ids_tickets))
+            }
+        
+        eventos = []
+        contadores = {}
+        for fila in filas:
+            datos = json.loads(fila.datos)
+            evento = {
+                'id': fila.id,
+                'tipo': fila.tipo,
+                'ticket_id': fila.ticket_id,
+                'municipio_id': fila.municipio_id,
+                'municipio': self._nombre_municipio(fila.municipio_id),
+                **datos
+            }
+            ticket = tickets.get(fila.ticket_id)
+            if fila.tipo in TIPOS_CON_TICKET and ticket:
+                evento['ticket'] = {
+                    **ticket._asdict(),
+                    'municipio': self._nombre_municipio(ticket.municipio_id),
+                    'fecha_creacion': ticket.fecha_creacion.isoformat()
+                }
+            eventos.append(evento)
+            self._acumular_contadores(contadores, fila, datos)
+        
+        contadores = {
+            municipio_id: dict(deltas) for municipio_id, deltas in contadores.items()
+            if any(deltas.values())
+        }
+        if contadores:
+            eventos.append({'id': max(fila.id for fila in filas), 'tipo': 'contadores', 'municipios': contadores})
+        return eventos
+    
+    def _acumular_contadores(self, contadores, fila, datos):
+        estatus = datos.get('estatus')
+        if fila.tipo == 'ticket_creado':
+            cambios = [(fila.municipio_id, estatus, 1)]
+        elif fila.tipo == 'tickets_masivos':
+            cambios = [(fila.municipio_id, estatus, datos['cantidad'])]
+        elif fila.tipo == 'ticket_eliminado':
+            cambios = [(fila.municipio_id, estatus, -1)]
+        elif fila.tipo == 'tickets_archivados':
+            cambios = []
+        else:
+            cambios = [
+                (datos.get('municipio_anterior', fila.municipio_id), datos.get('estatus_anterior', estatus), -1),
+                (fila.municipio_id, estatus, 1)
+            ]
+        
+        for municipio_id, estatus, cantidad in cambios:
+            if estatus in COLUMNA_ESTATUS:
+                contadores.setdefault(str(municipio_id), Counter())[COLUMNA_ESTATUS[estatus]] += cantidad
+    
+    def _nombre_municipio(self, municipio_id):
+        municipio = catalogo_municipios.obtener(municipio_id)
+        return municipio.nombre if municipio else None
+    
+    def _purgar(self):
+        ahora = time.monotonic()
+        if ahora - self._purgado < 600:
+            return
+        self._purgado = ahora
+        
+        limite = datetime.utcnow() - self.retencion
+        ultimo_id = db.session.query(db.func.max(Evento.id)).scalar() or 0
+        while True:
+            ids = [
+                evento_id for (evento_id,) in db.session.query(Evento.id)
+                .filter(Evento.fecha < limite, Evento.id < ultimo_id)
+                .limit(5000)
+            ]
+            if not ids:
+                break
+            Evento.query.filter(Evento.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+
+despachador_eventos = DespachadorEventos()
\ No newline at end of file
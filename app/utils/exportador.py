@@ -0,0 +1,145 @@
+import atexit
+import io
+import multiprocessing
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from tempfile import SpooledTemporaryFile
+from types import SimpleNamespace
+from app.models import Ticket
+from app.utils.consultas import ConsultasTicket
+from app.utils.pdf_generator import PDFGenerator
+
+FORMATOS = ('pdf', 'zip')
+TAMANO_FRAGMENTO = 64 * 1024
+
+class DatosComprobante:
+    def __init__(self, ticket):
+        self.id = ticket.id
+        self.curp = ticket.curp
+        self.nombre = ticket.nombre
+        self.apellido_paterno = ticket.apellido_paterno
+        self.apellido_materno = ticket.apellido_materno
+        self.municipio_id = ticket.municipio_id
+        self.municipio = SimpleNamespace(nombre=ticket.municipio.nombre)
+        self.numero_turno = ticket.numero_turno
+        self.fecha_creacion = ticket.fecha_creacion
+        self.estatus = ticket.estatus
+    
+    generar_qr_base64 = Ticket.generar_qr_base64
+
+def _renderizar_pdf(datos):
+    return PDFGenerator.generar_comprobante(datos).getvalue()
+
+def _renderizar_qr(datos):
+    return datos.generar_qr_base64()
+
+class _FlujoSalida(io.RawIOBase):
+    def __init__(self):
+        self._partes = []
+    
+    def writable(self):
+        return True
+    
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        return len(datos)
+    
+    def drenar(self):
+        datos = b''.join(self._partes)
+        self._partes = []
+        return datos
+
+class ExportadorComprobantes:
+    _pool = None
+    
+    @staticmethod
+    def parsear_fecha(valor):
+        return datetime.strptime(valor, '%Y-%m-%d') if valor else None
+    
+    @staticmethod
+    def consultar(municipio_id=None, estatus=None, desde=None, hasta=None):
+        query = ConsultasTicket.con_municipio()
+        
+        if municipio_id:
+            query = query.filter(Ticket.municipio_id == municipio_id)
+        if estatus:
+            query = query.filter(Ticket.estatus == estatus)
+        if desde:
+            query = query.filter(Ticket.fecha_creacion >= desde)
+        if hasta:
+            query = query.filter(Ticket.fecha_creacion < hasta + timedelta(days=1))
+        
+        return query.order_by(Ticket.municipio_id, Ticket.numero_turno)
+    
+    @staticmethod
+    def requiere_trabajo(query, formato, maximo_pdf):
+        if formato != 'pdf':
+            return False
+        return query.order_by(None).limit(maximo_pdf + 1).count() > maximo_pdf
+    
+    @staticmethod
+    def exportar(query, formato, procesos, tamano_lote=100):
+        lotes = ExportadorComprobantes._lotes(query, tamano_lote)
+        pool = ExportadorComprobantes._obtener_pool(procesos)
+        mapear = pool.map if pool else map
+        
+        if formato == 'zip':
+            return ExportadorComprobantes._exportar_zip(lotes, mapear)
+        return ExportadorComprobantes._exportar_pdf(lotes, mapear)
+    
+    @staticmethod
+    def _lotes(query, tamano_lote):
+        lote = []
+        for ticket in query.yield_per(tamano_lote):
+            lote.append(DatosComprobante(ticket))
+            if len(lote) == tamano_lote:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+    
+    @staticmethod
+    def _exportar_zip(lotes, mapear):
+        salida = _FlujoSalida()
+        with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_DEFLATED) as archivo_zip:
+            for lote in lotes:
+                for datos, pdf in zip(lote, mapear(_renderizar_pdf, lote)):
+                    nombre = f"comprobante_{datos.municipio_id}_{datos.numero_turno}.pdf"
+                    archivo_zip.writestr(nombre, pdf)
+                    yield salida.drenar()
+        yield salida.drenar()
+    
+    @staticmethod
+    def _exportar_pdf(lotes, mapear):
+        # ReportLab conserva todas las páginas hasta save(): nada sale antes de terminar y la memoria
+        # crece con el número de comprobantes. Por eso la ruta manda a la cola los PDF de más de
+        # EXPORTACION_MAX_PDF; el ZIP sí se entrega por partes.
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
+        
+        with SpooledTemporaryFile(max_size=8 * 1024 * 1024) as temporal:
+            c = canvas.Canvas(temporal, pagesize=letter)
+            for lote in lotes:
+                for datos, qr_data in zip(lote, mapear(_renderizar_qr, lote)):
+                    PDFGenerator.dibujar_comprobante(c, datos, qr_data)
+            c.save()
+            
+            temporal.seek(0)
+            while True:
+                fragmento = temporal.read(TAMANO_FRAGMENTO)
+                if not fragmento:
+                    break
+                yield fragmento
+    
+    @staticmethod
+    def _obtener_pool(procesos):
+        if procesos <= 0:
+            return None
+        if ExportadorComprobantes._pool is None:
+            ExportadorComprobantes._pool = ProcessPoolExecutor(
+                max_workers=procesos,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            atexit.register(ExportadorComprobantes._pool.shutdown, wait=False, cancel_futures=True)
+        return ExportadorComprobantes._pool
\ No newline at end of file
@@ -0,0 +1,173 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from app.utils.metricas import metricas
+
+COLORES = {
+    'primario': '#007bff',
+    'exito': '#28a745',
+    'advertencia': '#ffc107'
+}
+FORMATOS = {'svg': 'image/svg+xml', 'png': 'image/png'}
+
+class GraficasDashboard:
+    GRAFICAS = ('estatus', 'actividad', 'municipios', 'municipios_detalle')
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._renders = {}
+        self._pendientes = {}
+        self._ejecutor = None
+        self.timeout = 10.0
+        self.hits = 0
+        self.misses = 0
+    
+    def init_app(self, app):
+        self.timeout = app.config['GRAFICAS_TIMEOUT']
+    
+    def datos(self, resumen, municipios, por_dia):
+        return {
+            'estatus': {'pendientes': resumen['pendientes'], 'resueltos': resumen['resueltos']},
+            'actividad': {
+                'fechas': [fila.fecha.strftime('%d/%m') for fila in por_dia],
+                'cantidades': [int(fila.cantidad) for fila in por_dia]
+            },
+            'municipios': {
+                'nombres': [fila.nombre for fila in municipios],
+                'totales': [int(fila.total_tickets) for fila in municipios]
+            },
+            'municipios_detalle': {
+                'nombres': [fila.nombre for fila in municipios],
+                'pendientes': [int(fila.pendientes) for fila in municipios],
+                'resueltos': [int(fila.resueltos) for fila in municipios]
+            }
+        }
+    
+    def obtener(self, nombre, formato, version, cargar):
+        with self._lock:
+            render = self._renders.get((nombre, formato))
+            if render and render[0] == version:
+                self.hits += 1
+                return render[1]
+            pendiente = self._pendientes.get((nombre, formato, version))
+        
+        if pendiente is None:
+            pendiente = self.renderizar(nombre, formato, version, cargar()[nombre])
+        return pendiente.result(timeout=self.timeout)
+    
+    def preparar(self, version, datos, formato):
+        for nombre in self.GRAFICAS:
+            self.renderizar(nombre, formato, version, datos[nombre])
+    
+    def renderizar(self, nombre, formato, version, datos):
+        clave = (nombre, formato, version)
+        with self._lock:
+            render = self._renders.get((nombre, formato))
+            if render and render[0] == version:
+                listo = Future()
+                listo.set_result(render[1])
+                return listo
+            pendiente = self._pendientes.get(clave)
+            if pendiente is None:
+                self.misses += 1
+                if self._ejecutor is None:
+                    self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='graficas')
+                pendiente = self._ejecutor.submit(self._dibujar, nombre, formato, datos)
+                self._pendientes[clave] = pendiente
+                pendiente.add_done_callback(lambda futuro: self._guardar(clave, futuro))
+        return pendiente
+    
+    def estadisticas(self):
+        with self._lock:
+            return {'entradas': len(self._renders), 'hits': self.hits, 'misses': self.misses}
+    
+    def _guardar(self, clave, futuro):
+        nombre, formato, version = clave
+        with self._lock:
+            self._pendientes.pop(clave, None)
+            if futuro.exception() is not None:
+                print(f"Error generando gráfica {nombre}: {futuro.exception()}")
+                return
+            actual = self._renders.get((nombre, formato))
+            if actual is None or actual[0] <= version:
+                self._renders[(nombre, formato)] = (version, futuro.result())
+    
+    @metricas.medir('grafica')
+    def _dibujar(self, nombre, formato, datos):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        
+        figura = Figure(figsize=(6.4, 3.6), dpi=100, layout='tight')
+        FigureCanvasAgg(figura)
+        eje = figura.add_subplot()
+        getattr(self, f"_dibujar_{nombre}")(eje, datos)
+        
+        buffer = BytesIO()
+        figura.savefig(buffer, format=formato, metadata={'Date': None} if formato == 'svg' else None)
+        return buffer.getvalue()
+    
+    @staticmethod
+    def _dibujar_estatus(eje, datos):
+        valores = [datos['pendientes'], datos['resueltos']]
+        if not sum(valores):
+            GraficasDashboard._sin_datos(eje)
+            return
+        eje.pie(
+            valores,
+            labels=['Pendientes', 'Resueltos'],
+            colors=[COLORES['advertencia'], COLORES['exito']],
+            autopct=lambda porcentaje: f"{porcentaje:.1f}%",
+            pctdistance=0.78,
+            startangle=90,
+            counterclock=False,
+            wedgeprops={'width': 0.45, 'edgecolor': 'white', 'linewidth': 2}
+        )
+        eje.set_aspect('equal')
+    
+    @staticmethod
+    def _dibujar_actividad(eje, datos):
+        if not datos['fechas']:
+            GraficasDashboard._sin_datos(eje)
+            return
+        posiciones = range(len(datos['fechas']))
+        eje.plot(posiciones, datos['cantidades'], color=COLORES['primario'], marker='o', linewidth=2)
+        eje.fill_between(posiciones, datos['cantidades'], color=COLORES['primario'], alpha=0.12)
+        eje.set_xticks(list(posiciones), datos['fechas'])
+        GraficasDashboard._eje_conteo(eje)
+    
+    @staticmethod
+    def _dibujar_municipios(eje, datos):
+        if not datos['nombres']:
+            GraficasDashboard._sin_datos(eje)
+            return
+        eje.bar(datos['nombres'], datos['totales'], color=COLORES['primario'])
+        GraficasDashboard._eje_conteo(eje, rotar=True)
+    
+    @staticmethod
+    def _dibujar_municipios_detalle(eje, datos):
+        if not datos['nombres']:
+            GraficasDashboard._sin_datos(eje)
+            return
+        eje.bar(datos['nombres'], datos['pendientes'], color=COLORES['advertencia'], label='Pendientes')
+        eje.bar(datos['nombres'], datos['resueltos'], bottom=datos['pendientes'], color=COLORES['exito'], label='Resueltos')
+        eje.legend(loc='upper right', frameon=False)
+        GraficasDashboard._eje_conteo(eje, rotar=True)
+    
+    @staticmethod
+    def _eje_conteo(eje, rotar=False):
+        from matplotlib.ticker import MaxNLocator
+        
+        eje.set_ylim(bottom=0)
+        eje.yaxis.set_major_locator(MaxNLocator(integer=True))
+        eje.grid(axis='y', alpha=0.3)
+        eje.spines[['top', 'right']].set_visible(False)
+        if rotar:
+            for etiqueta in eje.get_xticklabels():
+                etiqueta.set(rotation=30, horizontalalignment='right', rotation_mode='anchor')
+    
+    @staticmethod
+    def _sin_datos(eje):
+        eje.text(0.5, 0.5, 'Sin datos', ha='center', va='center', color='#6c757d', transform=eje.transAxes)
+        eje.set_axis_off()
+
+graficas_dashboard = GraficasDashboard()
\ No newline at end of file
@@ -0,0 +1,215 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from functools import wraps
+from flask import g, has_request_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CUBETAS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_SQL_POR_SOLICITUD = 200
+
+class Histograma:
+    def __init__(self):
+        self.cubetas = [0] * len(CUBETAS)
+        self.suma = 0.0
+        self.cuenta = 0
+    
+    def observar(self, valor):
+        indice = bisect_left(CUBETAS, valor)
+        if indice < len(CUBETAS):
+            self.cubetas[indice] += 1
+        self.suma += valor
+        self.cuenta += 1
+    
+    def lineas(self, nombre, etiquetas):
+        acumulado = 0
+        for limite, cantidad in zip(CUBETAS, self.cubetas):
+            acumulado += cantidad
+            yield f"{nombre}_bucket{_etiquetas({**etiquetas, 'le': repr(limite)})} {acumulado}"
+        yield f"{nombre}_bucket{_etiquetas({**etiquetas, 'le': '+Inf'})} {self.cuenta}"
+        yield f"{nombre}_sum{_etiquetas(etiquetas)} {self.suma}"
+        yield f"{nombre}_count{_etiquetas(etiquetas)} {self.cuenta}"
+
+def _etiquetas(etiquetas):
+    if not etiquetas:
+        return ''
+    pares = []
+    for clave, valor in etiquetas.items():
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pares.append(f'{clave}="{valor}"')
+    return '{' + ','.join(pares) + '}'
+
+def _endpoint():
+    if has_request_context():
+        return request.endpoint or 'sin_ruta'
+    return 'sin_solicitud'
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencias = {}
+        self._solicitudes = Counter()
+        self._lentas = Counter()
+        self._sql_consultas = Counter()
+        self._sql_segundos = Counter()
+        self._operaciones = {}
+        self.umbral_lento = 1.0
+        self.token = None
+    
+    def init_app(self, app):
+        self.umbral_lento = app.config['METRICAS_UMBRAL_LENTO']
+        self.token = app.config['METRICAS_TOKEN']
+        
+        app.before_request(self._iniciar_solicitud)
+        app.after_request(self._terminar_solicitud)
+        before_render_template.connect(self._iniciar_plantilla, app)
+        template_rendered.connect(self._terminar_plantilla, app)
+        
+        if not event.contains(Engine, 'before_cursor_execute', self._iniciar_consulta):
+            event.listen(Engine, 'before_cursor_execute', self._iniciar_consulta)
+            event.listen(Engine, 'after_cursor_execute', self._terminar_consulta)
+    
+    def medir(self, operacion):
+        def decorador(funcion):
+            @wraps(funcion)
+            def envoltura(*args, **kwargs):
+                inicio = time.perf_counter()
+                try:
+                    return funcion(*args, **kwargs)
+                finally:
+                    self.observar(operacion, time.perf_counter() - inicio)
+            return envoltura
+        return decorador
+    
+    def observar(self, operacion, segundos):
+        with self._lock:
+            self._operaciones.setdefault(operacion, Histograma()).observar(segundos)
+    
+    def autorizado(self, usuario):
+        if self.token and request.headers.get('Authorization') == f"Bearer {self.token}":
+            return True
+        return usuario.is_authenticated and usuario.es_admin
+    
+    def exportar(self):
+        from app.utils.admision import control_admision
+        from app.utils.cache_comprobantes import cache_comprobantes
+        from app.utils.cache_usuarios import cache_usuarios
+        from app.utils.eventos import despachador_eventos
+        from app.utils.graficas import graficas_dashboard
+        from app.utils.replicas import enrutador_replicas
+        
+        lineas = []
+        
+        def metrica(nombre, tipo, ayuda):
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+        
+        with self._lock:
+            metrica('turnos_http_duracion_segundos', 'histogram', 'Latencia de las solicitudes por endpoint')
+            for (endpoint, metodo), histograma in sorted(self._latencias.items()):
+                lineas.extend(histograma.lineas('turnos_http_duracion_segundos', {'endpoint': endpoint, 'metodo': metodo}))
+            
+            metrica('turnos_http_solicitudes_total', 'counter', 'Solicitudes atendidas por endpoint y estatus')
+            for (endpoint, metodo, estado), cantidad in sorted(self._solicitudes.items()):
+                lineas.append(f"turnos_http_solicitudes_total{_etiquetas({'endpoint': endpoint, 'metodo': metodo, 'estado': estado})} {cantidad}")
+            
+            metrica('turnos_http_solicitudes_lentas_total', 'counter', 'Solicitudes por encima del umbral de lentitud')
+            for endpoint, cantidad in sorted(self._lentas.items()):
+                lineas.append(f"turnos_http_solicitudes_lentas_total{_etiquetas({'endpoint': endpoint})} {cantidad}")
+            
+            metrica('turnos_sql_consultas_total', 'counter', 'Sentencias SQL ejecutadas por endpoint')
+            for endpoint, cantidad in sorted(self._sql_consultas.items()):
+                lineas.append(f"turnos_sql_consultas_total{_etiquetas({'endpoint': endpoint})} {cantidad}")
+            
+            metrica('turnos_sql_duracion_segundos_total', 'counter', 'Tiempo acumulado en SQL por endpoint')
+            for endpoint, segundos in sorted(self._sql_segundos.items()):
+                lineas.append(f"turnos_sql_duracion_segundos_total{_etiquetas({'endpoint': endpoint})} {segundos}")
+            
+            metrica('turnos_render_duracion_segundos', 'histogram', 'Tiempo de generación de PDF, QR y plantillas')
+            for operacion, histograma in sorted(self._operaciones.items()):
+                lineas.extend(histograma.lineas('turnos_render_duracion_segundos', {'operacion': operacion}))
+        
+        en_curso, rechazos = control_admision.estadisticas()
+        metrica('turnos_admision_en_curso', 'gauge', 'Solicitudes admitidas en curso por clase')
+        for clase, cantidad in sorted(en_curso.items()):
+            lineas.append(f"turnos_admision_en_curso{_etiquetas({'clase': clase})} {cantidad}")
+        metrica('turnos_admision_rechazos_total', 'counter', 'Solicitudes rechazadas con 429 por clase y motivo')
+        for (clase, motivo), cantidad in sorted(rechazos.items()):
+            lineas.append(f"turnos_admision_rechazos_total{_etiquetas({'clase': clase, 'motivo': motivo})} {cantidad}")
+        
+        metrica('turnos_cache_comprobantes', 'gauge', 'Entradas y aciertos del cache de comprobantes')
+        for clave, valor in cache_comprobantes.estadisticas().items():
+            lineas.append(f"turnos_cache_comprobantes{_etiquetas({'tipo': clave})} {valor}")
+        
+        metrica('turnos_cache_graficas', 'gauge', 'Entradas y aciertos del cache de gráficas del dashboard')
+        for clave, valor in graficas_dashboard.estadisticas().items():
+            lineas.append(f"turnos_cache_graficas{_etiquetas({'tipo': clave})} {valor}")
+        
+        metrica('turnos_cache_usuarios', 'gauge', 'Entradas y aciertos del cache de usuarios')
+        for clave, valor in cache_usuarios.estadisticas().items():
+            lineas.append(f"turnos_cache_usuarios{_etiquetas({'tipo': clave})} {valor}")
+        
+        metrica('turnos_replica_disponible', 'gauge', 'Disponibilidad de las réplicas de lectura')
+        for replica in enrutador_replicas.estado():
+            lineas.append(f"turnos_replica_disponible{_etiquetas({'replica': replica['replica']})} {int(replica['disponible'])}")
+        
+        metrica('turnos_eventos', 'gauge', 'Clientes conectados al stream de eventos y eventos en memoria')
+        for clave, valor in despachador_eventos.estadisticas().items():
+            lineas.append(f"turnos_eventos{_etiquetas({'tipo': clave})} {valor}")
+        
+        return '\n'.join(lineas) + '\n'
+    
+    def _iniciar_solicitud(self):
+        g.metricas_inicio = time.perf_counter()
+        g.metricas_sql = []
+    
+    def _terminar_solicitud(self, respuesta):
+        inicio = g.pop('metricas_inicio', None)
+        if inicio is None:
+            return respuesta
+        
+        duracion = time.perf_counter() - inicio
+        endpoint = _endpoint()
+        with self._lock:
+            self._latencias.setdefault((endpoint, request.method), Histograma()).observar(duracion)
+            self._solicitudes[(endpoint, request.method, respuesta.status_code)] += 1
+            if duracion >= self.umbral_lento:
+                self._lentas[endpoint] += 1
+        
+        if duracion >= self.umbral_lento:
+            consultas = g.get('metricas_sql', [])
+            print(f"Solicitud lenta: {request.method} {request.full_path} {duracion:.3f}s, "
+                  f"{len(consultas)} consultas SQL ({sum(segundos for _, segundos in consultas):.3f}s)")
+            for sentencia, segundos in consultas:
+                print(f"   {segundos * 1000:8.1f} ms  {' '.join(sentencia.split())[:300]}")
+        return respuesta
+    
+    def _iniciar_plantilla(self, app, template, context, **extra):
+        g.metricas_plantilla = time.perf_counter()
+    
+    def _terminar_plantilla(self, app, template, context, **extra):
+        inicio = g.pop('metricas_plantilla', None)
+        if inicio is not None:
+            self.observar('plantilla', time.perf_counter() - inicio)
+    
+    def _iniciar_consulta(self, conexion, cursor, sentencia, parametros, contexto, executemany):
+        conexion.info.setdefault('metricas_inicio', []).append(time.perf_counter())
+    
+    def _terminar_consulta(self, conexion, cursor, sentencia, parametros, contexto, executemany):
+        pila = conexion.info.get('metricas_inicio')
+        if not pila:
+            return
+        duracion = time.perf_counter() - pila.pop()
+        endpoint = _endpoint()
+        with self._lock:
+            self._sql_consultas[endpoint] += 1
+            self._sql_segundos[endpoint] += duracion
+        
+        if has_request_context():
+            consultas = g.get('metricas_sql')
+            if consultas is not None and len(consultas) < MAX_SQL_POR_SOLICITUD:
+                consultas.append((sentencia, duracion))
+
+metricas = Metricas()
\ No newline at end of file
@@ -1,15 +1,28 @@
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
 import base64
 from io import BytesIO
 from datetime import datetime
+from app.utils.metricas import metricas
 
 class PDFGenerator:
     @staticmethod
+    @metricas.medir('pdf')
     def generar_comprobante(ticket):
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
+        
         buffer = BytesIO()
         c = canvas.Canvas(buffer, pagesize=letter)
+        PDFGenerator.dibujar_comprobante(c, ticket)
+        c.save()
+        
+        buffer.seek(0)
+        return buffer
+    
+    @staticmethod
+    def dibujar_comprobante(c, ticket, qr_data=None):
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.utils import ImageReader
+        
         width, height = letter
         
         c.setFont("Helvetica-Bold", 16)
@@ -30,12 +43,8 @@ class PDFGenerator:
         y -= 25
         c.drawString(100, y, f"Estatus: {ticket.estatus}")
         
-        qr_data = ticket.generar_qr_base64()
+        qr_data = qr_data or ticket.generar_qr_base64()
         qr_image = ImageReader(BytesIO(base64.b64decode(qr_data)))
         c.drawImage(qr_image, 400, height - 300, width=100, height=100)
         
-        c.showPage()
-        c.save()
-        
-        buffer.seek(0)
-        return buffer
\ No newline at end of file
+        c.showPage()
\ No newline at end of file
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from app.models import db, Ticket
+from app.utils.consultas import ConsultasTicket
+from app.utils.exportador import ExportadorComprobantes
+from app.utils.archivo import Archivador
+
+TABLAS_VIGILADAS = ('tickets', 'tickets_archivo')
+
+class PlanesConsulta:
+    @staticmethod
+    def consultas():
+        hoy = datetime.utcnow().date()
+        return [
+            ('modificar_turno', ConsultasTicket.con_municipio().filter_by(curp='XAXX010101HAGSXX00', numero_turno=1), False),
+            ('curp_municipio', Ticket.query.filter_by(municipio_id=1, curp='XAXX010101HAGSXX00'), False),
+            ('posiciones_pendientes', db.session.query(Ticket.numero_turno).filter(Ticket.municipio_id == 1, Ticket.estatus == 'Pendiente'), False),
+            ('inicializar_contador', db.session.query(db.func.max(Ticket.numero_turno)).filter(Ticket.municipio_id == 1), False),
+            ('api_municipio_estatus', ConsultasTicket.filas_api(1, 'Pendiente', 1).order_by(Ticket.id), False),
+            ('api_keyset', ConsultasTicket.filas_api(None, None, 1).order_by(Ticket.id), False),
+            ('exportar_municipio', ExportadorComprobantes.consultar(municipio_id=1, desde=hoy - timedelta(days=7), hasta=hoy), False),
+            ('exportar_estatus', ExportadorComprobantes.consultar(estatus='Resuelto', desde=hoy - timedelta(days=7), hasta=hoy), False),
+            ('archivar_candidatos', Archivador.candidatos(90, 1000), False),
+            ('archivo_curp_turno', Archivador.buscar_por_curp('XAXX010101HAGSXX00', 1), False),
+            ('admin_recientes', ConsultasTicket.con_municipio().order_by(Ticket.fecha_creacion.desc()), True),
+        ]
+    
+    @staticmethod
+    def verificar():
+        resultados = []
+        conexion = db.session.connection()
+        for nombre, query, escaneo_permitido in PlanesConsulta.consultas():
+            lineas, escaneos = PlanesConsulta._explicar(conexion, query.statement)
+            resultados.append((nombre, lineas, bool(escaneos) and not escaneo_permitido))
+        return resultados
+    
+    @staticmethod
+    def _explicar(conexion, sentencia):
+        compilada = sentencia.compile(dialect=conexion.dialect)
+        if compilada.positional:
+            parametros = tuple(compilada.params[nombre] for nombre in compilada.positiontup)
+        else:
+            parametros = compilada.params
+        
+        if conexion.dialect.name == 'sqlite':
+            filas = conexion.exec_driver_sql(f"EXPLAIN QUERY PLAN {compilada}", parametros).all()
+            lineas = [fila[3] for fila in filas]
+            escaneos = [
+                linea for linea in lineas
+                if linea.startswith('SCAN ') and linea.split()[1] in TABLAS_VIGILADAS and ' USING ' not in linea
+            ]
+            return lineas, escaneos
+        
+        filas = conexion.exec_driver_sql(f"EXPLAIN {compilada}", parametros).mappings().all()
+        lineas = [f"{fila['table']}: type={fila['type']} key={fila['key']} rows={fila['rows']}" for fila in filas]
+        escaneos = [fila for fila in filas if fila['type'] == 'ALL' and fila['table'] in TABLAS_VIGILADAS]
+        return lineas, escaneos
\ No newline at end of file
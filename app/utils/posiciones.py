@@ -0,0 +1,266 @@
+import json
+import threading
+import time
+from flask import current_app
+from app.models import db, Ticket, Municipio
+from app.utils.eventos import despachador_eventos
+
+CAPACIDAD_INICIAL = 1024
+
+class ArbolFenwick:
+    def __init__(self, marcas):
+        self.capacidad = len(marcas) - 1
+        self.arbol = list(marcas)
+        for indice in range(1, self.capacidad + 1):
+            padre = indice + (indice & -indice)
+            if padre <= self.capacidad:
+                self.arbol[padre] += self.arbol[indice]
+    
+    def sumar(self, indice, delta):
+        while indice <= self.capacidad:
+            self.arbol[indice] += delta
+            indice += indice & -indice
+    
+    def prefijo(self, indice):
+        total = 0
+        indice = min(indice, self.capacidad)
+        while indice > 0:
+            total += self.arbol[indice]
+            indice -= indice & -indice
+        return total
+    
+    def buscar(self, k):
+        indice = 0
+        paso = 1 << self.capacidad.bit_length()
+        while paso:
+            siguiente = indice + paso
+            if siguiente <= self.capacidad and self.arbol[siguiente] < k:
+                indice = siguiente
+                k -= self.arbol[siguiente]
+            paso >>= 1
+        return indice + 1
+
+class ColaMunicipio:
+    def __init__(self, turnos_pendientes, ultimo_turno):
+        capacidad = CAPACIDAD_INICIAL
+        while capacidad < ultimo_turno:
+            capacidad *= 2
+        
+        self.marcas = bytearray(capacidad + 1)
+        for turno in turnos_pendientes:
+            self.marcas[turno] = 1
+        self.arbol = ArbolFenwick(self.marcas)
+        self.pendientes = sum(self.marcas)
+        self.ultimo_turno = ultimo_turno
+    
+    def marcar(self, turno, pendiente):
+        if not turno or turno < 1:
+            return
+        if turno >= len(self.marcas):
+            self._crecer(turno)
+        
+        self.ultimo_turno = max(self.ultimo_turno, turno)
+        valor = 1 if pendiente else 0
+        if self.marcas[turno] == valor:
+            return
+        self.marcas[turno] = valor
+        self.arbol.sumar(turno, 1 if valor else -1)
+        self.pendientes += 1 if valor else -1
+    
+    def pendiente(self, turno):
+        return 0 < turno < len(self.marcas) and bool(self.marcas[turno])
+    
+    def adelante(self, turno):
+        return self.arbol.prefijo(turno - 1)
+    
+    def atendiendo(self):
+        if not self.pendientes:
+            return None
+        return self.arbol.buscar(1)
+    
+    def diferencias(self, otra):
+        limite = max(len(self.marcas), len(otra.marcas))
+        return [
+            turno for turno in range(1, limite)
+            if self.pendiente(turno) != otra.pendiente(turno)
+        ]
+    
+    def _crecer(self, turno):
+        capacidad = len(self.marcas) - 1
+        while capacidad < turno:
+            capacidad *= 2
+        self.marcas.extend(bytes(capacidad + 1 - len(self.marcas)))
+        self.arbol = ArbolFenwick(self.marcas)
+
+class IndicePosiciones:
+    def __init__(self):
+        self.app = None
+        self._lock = threading.Lock()
+        self._reconstruccion = threading.Lock()
+        self._hilo = None
+        self._colas = {}
+        self._construyendo = {}
+        self.intervalo = 300.0
+    
+    def init_app(self, app):
+        self.app = app
+        self.intervalo = app.config['POSICIONES_INTERVALO_VERIFICACION']
+        despachador_eventos.agregar_oyente(self._aplicar)
+        
+        @app.before_request
+        def iniciar_posiciones():
+            self.iniciar()
+    
+    def iniciar(self):
+        if self._hilo:
+            return
+        
+        with self._reconstruccion:
+            if self._hilo:
+                return
+            despachador_eventos.iniciar()
+            with self.app.app_context():
+                self._reconstruir(self._municipios())
+            self._hilo = threading.Thread(target=self._ciclo, name='verificador-posiciones', daemon=True)
+            self._hilo.start()
+    
+    def posicion(self, municipio_id, numero_turno):
+        cola = self._cola(municipio_id)
+        with self._lock:
+            if numero_turno < 1 or numero_turno > cola.ultimo_turno:
+                return None
+            pendiente = cola.pendiente(numero_turno)
+            adelante = cola.adelante(numero_turno) if pendiente else None
+            return {
+                'municipio_id': municipio_id,
+                'numero_turno': numero_turno,
+                'pendiente': pendiente,
+                'adelante': adelante,
+                'posicion': adelante + 1 if pendiente else None,
+                'atendiendo': cola.atendiendo(),
+                'pendientes': cola.pendientes,
+                'ultimo_turno': cola.ultimo_turno
+            }
+    
+    def resumen(self, municipio_id):
+        cola = self._cola(municipio_id)
+        with self._lock:
+            return {
+                'municipio_id': municipio_id,
+                'atendiendo': cola.atendiendo(),
+                'pendientes': cola.pendientes,
+                'ultimo_turno': cola.ultimo_turno
+            }
+    
+    def verificar(self, municipio_id):
+        cola = self._construir([municipio_id])[municipio_id]
+        pendientes, primero, ultimo = db.session.query(
+            db.func.count(Ticket.id),
+            db.func.min(Ticket.numero_turno),
+            db.func.max(Ticket.numero_turno)
+        ).filter(Ticket.municipio_id == municipio_id, Ticket.estatus == 'Pendiente').one()
+        
+        esperado = {'pendientes': pendientes, 'atendiendo': primero, 'adelante_del_ultimo': max(pendientes - 1, 0)}
+        actual = {
+            'pendientes': cola.pendientes,
+            'atendiendo': cola.atendiendo(),
+            'adelante_del_ultimo': cola.adelante(ultimo) if ultimo else 0
+        }
+        return [(clave, actual[clave], esperado[clave]) for clave in esperado if actual[clave] != esperado[clave]]
+    
+    def _cola(self, municipio_id):
+        cola = self._colas.get(municipio_id)
+        if cola is not None:
+            return cola
+        
+        # Solo municipios dados de alta después del arranque llegan aquí
+        with self._reconstruccion:
+            if municipio_id not in self._colas:
+                self._reconstruir([municipio_id])
+            return self._colas[municipio_id]
+    
+    def _ciclo(self):
+        while True:
+            time.sleep(self.intervalo)
+            try:
+                with self.app.app_context():
+                    with self._reconstruccion:
+                        self._reconstruir(self._municipios())
+            except Exception as e:
+                print(f"Error verificando posiciones: {e}")
+    
+    def _reconstruir(self, municipios, avisar=True):
+        with self._lock:
+            for municipio_id in municipios:
+                self._construyendo[municipio_id] = []
+        try:
+            nuevas = self._construir(municipios)
+        except Exception:
+            with self._lock:
+                for municipio_id in municipios:
+                    self._construyendo.pop(municipio_id, None)
+            raise
+        
+        with self._lock:
+            for municipio_id, nueva in nuevas.items():
+                cambios = self._construyendo.pop(municipio_id, [])
+                cola = self._colas.get(municipio_id)
+                if avisar and cola is not None and not cambios:
+                    diferencias = cola.diferencias(nueva)
+                    if diferencias:
+                        current_app.logger.warning(
+                            f"Posiciones del municipio {municipio_id} diferían de la base en {len(diferencias)} turnos; reconstruidas"
+                        )
+                for turno, pendiente in cambios:
+                    nueva.marcar(turno, pendiente)
+                self._colas[municipio_id] = nueva
+    
+    def _municipios(self):
+        return [municipio_id for (municipio_id,) in db.session.query(Municipio.id)]
+    
+    def _construir(self, municipios):
+        pendientes = {municipio_id: [] for municipio_id in municipios}
+        for municipio_id, turno in db.session.query(Ticket.municipio_id, Ticket.numero_turno)\
+                .filter(Ticket.municipio_id.in_(municipios), Ticket.estatus == 'Pendiente'):
+            pendientes[municipio_id].append(turno)
+        ultimos = dict(
+            db.session.query(Ticket.municipio_id, db.func.max(Ticket.numero_turno))
+            .filter(Ticket.municipio_id.in_(municipios))
+            .group_by(Ticket.municipio_id)
+            .all()
+        )
+        return {
+            municipio_id: ColaMunicipio(turnos, ultimos.get(municipio_id) or 0)
+            for municipio_id, turnos in pendientes.items()
+        }
+    
+    def _aplicar(self, filas):
+        masivos = set()
+        with self._lock:
+            for fila in filas:
+                datos = json.loads(fila.datos)
+                if fila.tipo == 'tickets_masivos':
+                    masivos.add(fila.municipio_id)
+                    continue
+                if fila.tipo == 'tickets_archivados':
+                    continue
+                
+                cambios = []
+                if 'municipio_anterior' in datos:
+                    cambios.append((datos['municipio_anterior'], datos.get('numero_turno_anterior'), False))
+                pendiente = fila.tipo != 'ticket_eliminado' and datos.get('estatus') == 'Pendiente'
+                cambios.append((fila.municipio_id, datos.get('numero_turno'), pendiente))
+                
+                for municipio_id, turno, pendiente in cambios:
+                    if municipio_id in self._construyendo:
+                        self._construyendo[municipio_id].append((turno, pendiente))
+                    if municipio_id in self._colas:
+                        self._colas[municipio_id].marcar(turno, pendiente)
+        
+        # Las altas masivas no traen los turnos; se releen en el hilo del despachador
+        masivos &= set(self._colas)
+        if masivos:
+            with self._reconstruccion:
+                self._reconstruir(sorted(masivos), avisar=False)
+
+indice_posiciones = IndicePosiciones()
\ No newline at end of file
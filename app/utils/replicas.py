@@ -0,0 +1,125 @@
+import itertools
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql import Select
+
+class EnrutadorReplicas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._turno = itertools.count()
+        self.motores = []
+        self._caidas = {}
+        self.retraso_maximo = 5.0
+        self.intervalo = 10.0
+    
+    def init_app(self, app):
+        self.retraso_maximo = app.config['REPLICAS_RETRASO_MAXIMO']
+        self.intervalo = app.config['REPLICAS_INTERVALO_VERIFICACION']
+        self.motores = [create_engine(url, pool_pre_ping=True) for url in app.config['DATABASE_REPLICA_URLS']]
+        
+        for indice, motor in enumerate(self.motores):
+            event.listen(motor, 'handle_error', self._al_fallar(indice))
+        
+        from app.models import db
+        if not event.contains(db.session, 'after_commit', self._al_confirmar):
+            event.listen(db.session, 'after_commit', self._al_confirmar)
+    
+    def motor_lectura(self):
+        if not self.motores or not has_request_context() or not g.get('solo_lectura') or g.get('escribio'):
+            return None
+        
+        ultima_escritura = session.get('ultima_escritura')
+        if ultima_escritura and time.time() - ultima_escritura < self.retraso_maximo:
+            return None
+        
+        if 'replica' not in g:
+            g.replica = self._elegir()
+        return self.motores[g.replica] if g.replica is not None else None
+    
+    def registrar_escritura(self):
+        if has_request_context():
+            g.escribio = True
+    
+    def marcar_caida(self, indice):
+        with self._lock:
+            self._caidas[indice] = time.monotonic()
+    
+    def estado(self):
+        ahora = time.monotonic()
+        return [
+            {'replica': indice, 'url': motor.url.render_as_string(hide_password=True),
+             'disponible': ahora - self._caidas.get(indice, -self.intervalo) >= self.intervalo}
+            for indice, motor in enumerate(self.motores)
+        ]
+    
+    def _elegir(self):
+        inicio = next(self._turno)
+        for desplazamiento in range(len(self.motores)):
+            indice = (inicio + desplazamiento) % len(self.motores)
+            if self._disponible(indice):
+                return indice
+        return None
+    
+    def _disponible(self, indice):
+        caida = self._caidas.get(indice)
+        if caida is None:
+            return True
+        if time.monotonic() - caida < self.intervalo:
+            return False
+        
+        try:
+            with self.motores[indice].connect() as conexion:
+                conexion.exec_driver_sql('SELECT 1')
+        except DBAPIError as e:
+            print(f"Error réplica {indice} sigue sin responder: {e}")
+            self.marcar_caida(indice)
+            return False
+        
+        with self._lock:
+            self._caidas.pop(indice, None)
+        return True
+    
+    def _al_fallar(self, indice):
+        def manejar(contexto):
+            if contexto.is_disconnect:
+                self.marcar_caida(indice)
+        return manejar
+    
+    def _al_confirmar(self, sesion):
+        if self.motores and has_request_context() and g.get('escribio'):
+            session['ultima_escritura'] = time.time()
+
+enrutador_replicas = EnrutadorReplicas()
+
+class SesionEnrutada(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if isinstance(clause, Select) and clause._for_update_arg is None and not self._flushing:
+                motor = enrutador_replicas.motor_lectura()
+                if motor is not None:
+                    return motor
+            else:
+                enrutador_replicas.registrar_escritura()
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def solo_lectura(vista):
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        g.solo_lectura = True
+        try:
+            return vista(*args, **kwargs)
+        except DBAPIError as e:
+            replica = g.pop('replica', None)
+            if replica is None:
+                raise
+            print(f"Error en réplica {replica}, reintentando en primaria: {e}")
+            enrutador_replicas.marcar_caida(replica)
+            current_app.extensions['sqlalchemy'].session.rollback()
+            g.solo_lectura = False
+            return vista(*args, **kwargs)
+    return envoltura
\ No newline at end of file
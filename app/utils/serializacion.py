@@ -0,0 +1,39 @@
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class ProveedorJSON(DefaultJSONProvider):
+    ensure_ascii = False
+    
+    @staticmethod
+    def default(objeto):
+        if isinstance(objeto, date):
+            return objeto.isoformat()
+        return DefaultJSONProvider.default(objeto)
+    
+    def dumps(self, objeto, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(objeto, **kwargs)
+        try:
+            return orjson.dumps(objeto, default=self.default, option=orjson.OPT_SORT_KEYS).decode()
+        except TypeError:
+            return super().dumps(objeto)
+    
+    def loads(self, texto, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(texto, **kwargs)
+        return orjson.loads(texto)
+    
+    def response(self, *args, **kwargs):
+        if orjson is None or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        datos = self._prepare_response_obj(args, kwargs)
+        try:
+            cuerpo = orjson.dumps(datos, default=self.default, option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(cuerpo, mimetype=self.mimetype)
\ No newline at end of file
@@ -0,0 +1,270 @@
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from app.models import db, Trabajo
+
+TAREAS = {}
+TAREAS_ADMIN = set()
+ESTADOS_TERMINADOS = ('Completado', 'Fallido')
+
+def tarea(nombre, solo_admin=False):
+    def registrar(funcion):
+        TAREAS[nombre] = funcion
+        if solo_admin:
+            TAREAS_ADMIN.add(nombre)
+        return funcion
+    return registrar
+
+class ColaTrabajos:
+    def __init__(self):
+        self.app = None
+        self._hilos = []
+        self._lock = threading.Lock()
+        self._aviso = threading.Event()
+        self._purgado = float('-inf')
+    
+    def init_app(self, app):
+        self.app = app
+        self.directorio = app.config['TRABAJOS_DIR'] or os.path.join(app.instance_path, 'trabajos')
+        
+        @app.before_request
+        def iniciar_trabajadores():
+            self.iniciar()
+    
+    def iniciar(self):
+        if self._hilos or self.app.config['TRABAJOS_WORKERS'] <= 0:
+            return
+        
+        with self._lock:
+            if self._hilos:
+                return
+            os.makedirs(self.directorio, exist_ok=True)
+            for numero in range(self.app.config['TRABAJOS_WORKERS']):
+                hilo = threading.Thread(target=self._ciclo, name=f"trabajador-{numero}", daemon=True)
+                hilo.start()
+                self._hilos.append(hilo)
+    
+    def encolar(self, tipo, parametros, max_intentos=None, usuario_id=None):
+        if tipo not in TAREAS:
+            raise ValueError(f"Tarea desconocida: {tipo}")
+        
+        trabajo = Trabajo(
+            id=uuid.uuid4().hex,
+            tipo=tipo,
+            parametros=json.dumps(parametros),
+            max_intentos=max_intentos or self.app.config['TRABAJOS_MAX_INTENTOS'],
+            usuario_id=usuario_id
+        )
+        db.session.add(trabajo)
+        db.session.commit()
+        
+        self.iniciar()
+        self._aviso.set()
+        return trabajo
+    
+    def ejecutar_pendientes(self):
+        ejecutados = 0
+        while self._ejecutar_siguiente():
+            ejecutados += 1
+        return ejecutados
+    
+    def purgar(self, horas=None):
+        horas = self.app.config['TRABAJOS_RETENCION_HORAS'] if horas is None else horas
+        limite = datetime.utcnow() - timedelta(hours=horas)
+        eliminados = 0
+        
+        while True:
+            trabajos = db.session.query(Trabajo.id, Trabajo.resultado).filter(
+                Trabajo.estado.in_(ESTADOS_TERMINADOS),
+                Trabajo.fecha_actualizacion < limite
+            ).limit(500).all()
+            if not trabajos:
+                return eliminados
+            
+            for trabajo in trabajos:
+                if trabajo.resultado:
+                    _eliminar_archivo(json.loads(trabajo.resultado).get('archivo'))
+            Trabajo.query.filter(Trabajo.id.in_([trabajo.id for trabajo in trabajos])).delete(synchronize_session=False)
+            db.session.commit()
+            eliminados += len(trabajos)
+    
+    @staticmethod
+    def autorizado(trabajo, usuario):
+        if usuario.is_authenticated and usuario.es_admin:
+            return True
+        if trabajo.usuario_id is not None:
+            return usuario.is_authenticated and usuario.id == trabajo.usuario_id
+        return trabajo.tipo not in TAREAS_ADMIN
+    
+    def _ciclo(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    hubo_trabajo = self._ejecutar_siguiente()
+                    if not hubo_trabajo:
+                        self._purgar_periodicamente()
+            except Exception as e:
+                print(f"Error en la cola de trabajos: {e}")
+                hubo_trabajo = False
+            
+            if not hubo_trabajo:
+                self._aviso.wait(self.app.config['TRABAJOS_INTERVALO'])
+                self._aviso.clear()
+    
+    def _ejecutar_siguiente(self):
+        trabajo = self._reclamar()
+        if trabajo is None:
+            return False
+        
+        trabajo_id, tipo, intento, max_intentos = trabajo.id, trabajo.tipo, trabajo.intentos, trabajo.max_intentos
+        detener = threading.Event()
+        latido = threading.Thread(
+            target=self._latir, args=(trabajo_id, intento, detener), name=f"latido-{trabajo_id[:8]}", daemon=True
+        )
+        latido.start()
+        
+        try:
+            resultado = TAREAS[tipo](json.loads(trabajo.parametros), self.directorio)
+            cambios = {Trabajo.estado: 'Completado', Trabajo.resultado: json.dumps(resultado), Trabajo.error: None}
+        except Exception:
+            db.session.rollback()
+            resultado = None
+            cambios = {Trabajo.error: traceback.format_exc(limit=5)}
+            if intento < max_intentos:
+                cambios[Trabajo.estado] = 'Pendiente'
+                cambios[Trabajo.disponible_desde] = datetime.utcnow() + timedelta(seconds=2 ** intento)
+            else:
+                cambios[Trabajo.estado] = 'Fallido'
+        finally:
+            detener.set()
+            latido.join()
+        
+        if not self._arrendado(trabajo_id, intento).update(cambios, synchronize_session=False):
+            print(f"Error terminando el trabajo {trabajo_id}: otro trabajador lo reclamó")
+            if resultado:
+                _eliminar_archivo(resultado.get('archivo'))
+        db.session.commit()
+        return True
+    
+    def _latir(self, trabajo_id, intento, detener):
+        while not detener.wait(self.app.config['TRABAJOS_LATIDO']):
+            try:
+                with self.app.app_context():
+                    self._arrendado(trabajo_id, intento).update(
+                        {Trabajo.latido: datetime.utcnow()}, synchronize_session=False
+                    )
+                    db.session.commit()
+            except Exception as e:
+                print(f"Error renovando el trabajo {trabajo_id}: {e}")
+    
+    @staticmethod
+    def _arrendado(trabajo_id, intento):
+        return db.session.query(Trabajo).filter(
+            Trabajo.id == trabajo_id,
+            Trabajo.estado == 'En proceso',
+            Trabajo.intentos == intento
+        )
+    
+    def _purgar_periodicamente(self):
+        ahora = time.monotonic()
+        with self._lock:
+            if ahora - self._purgado < 600:
+                return
+            self._purgado = ahora
+        self.purgar()
+    
+    def _reclamar(self):
+        ahora = datetime.utcnow()
+        vencido = ahora - timedelta(seconds=self.app.config['TRABAJOS_TIMEOUT'])
+        disponibles = db.or_(
+            db.and_(Trabajo.estado == 'Pendiente', Trabajo.disponible_desde <= ahora),
+            db.and_(Trabajo.estado == 'En proceso', db.func.coalesce(Trabajo.latido, Trabajo.fecha_actualizacion) < vencido)
+        )
+        
+        for (trabajo_id,) in db.session.query(Trabajo.id).filter(disponibles)\
+                .order_by(Trabajo.fecha_creacion).limit(5).all():
+            reclamado = db.session.query(Trabajo).filter(Trabajo.id == trabajo_id, disponibles).update({
+                Trabajo.estado: 'En proceso',
+                Trabajo.intentos: Trabajo.intentos + 1,
+                Trabajo.latido: ahora
+            }, synchronize_session=False)
+            db.session.commit()
+            
+            if reclamado:
+                return db.session.get(Trabajo, trabajo_id)
+        
+        return None
+    
+    @staticmethod
+    def serializar(trabajo, url_resultado=None):
+        return {
+            'id': trabajo.id,
+            'tipo': trabajo.tipo,
+            'estado': trabajo.estado,
+            'intentos': trabajo.intentos,
+            'error': trabajo.error if trabajo.estado == 'Fallido' else None,
+            'resultado': url_resultado if trabajo.estado == 'Completado' else None,
+            'fecha_creacion': trabajo.fecha_creacion.isoformat(),
+            'fecha_actualizacion': trabajo.fecha_actualizacion.isoformat()
+        }
+
+cola_trabajos = ColaTrabajos()
+
+def _guardar(directorio, trabajo_nombre, contenido):
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, f"{uuid.uuid4().hex}-{trabajo_nombre}")
+    with open(ruta, 'wb') as archivo:
+        for fragmento in contenido:
+            archivo.write(fragmento)
+    return ruta
+
+def _eliminar_archivo(ruta):
+    if not ruta:
+        return
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Error eliminando el archivo del trabajo {ruta}: {e}")
+
+@tarea('comprobante')
+def generar_comprobante(parametros, directorio):
+    from app.utils.cache_comprobantes import cache_comprobantes
+    from app.utils.consultas import ConsultasTicket
+    from app.utils.pdf_generator import PDFGenerator
+    
+    ticket = ConsultasTicket.obtener_con_municipio(parametros['ticket_id'], incluir_archivo=True)
+    nombre = f"comprobante_turno_{ticket.numero_turno}.pdf"
+    pdf = cache_comprobantes.obtener(ticket, PDFGenerator.generar_comprobante)
+    
+    return {
+        'archivo': _guardar(directorio, nombre, [pdf]),
+        'nombre': nombre,
+        'mimetype': 'application/pdf'
+    }
+
+@tarea('exportar_comprobantes', solo_admin=True)
+def exportar_comprobantes(parametros, directorio):
+    from flask import current_app
+    from app.utils.exportador import ExportadorComprobantes
+    
+    query = ExportadorComprobantes.consultar(
+        municipio_id=parametros.get('municipio_id'),
+        estatus=parametros.get('estatus'),
+        desde=ExportadorComprobantes.parsear_fecha(parametros.get('desde')),
+        hasta=ExportadorComprobantes.parsear_fecha(parametros.get('hasta'))
+    )
+    formato = parametros.get('formato', 'pdf')
+    nombre = f"comprobantes.{formato}"
+    contenido = ExportadorComprobantes.exportar(query, formato, current_app.config['EXPORTACION_PROCESOS'])
+    
+    return {
+        'archivo': _guardar(directorio, nombre, contenido),
+        'nombre': nombre,
+        'mimetype': 'application/zip' if formato == 'zip' else 'application/pdf'
+    }
\ No newline at end of file
@@ -1,3 +1,8 @@
+import sqlite3
+
+# ER_DUP_ENTRY de MySQL y SQLITE_CONSTRAINT_UNIQUE
+CODIGOS_DUPLICADO = {1062, getattr(sqlite3, 'SQLITE_CONSTRAINT_UNIQUE', 2067)}
+
 class TurnoManager:
     _instance = None
     
@@ -9,33 +14,73 @@ class TurnoManager:
     
     def __init__(self):
         if not self._initialized:
-            from app.models import db, Ticket, Municipio
+            from app.models import db, Ticket, TicketArchivado, Municipio, ContadorTurno
             self.db = db
             self.Ticket = Ticket
+            self.TicketArchivado = TicketArchivado
             self.Municipio = Municipio
+            self.contadores = ContadorTurno.__table__
             self._initialized = True
     
     def obtener_siguiente_turno(self, municipio_id):
+        return self.reservar_turnos(municipio_id, 1)
+    
+    def reservar_turnos(self, municipio_id, cantidad):
         try:
-            ultimo_ticket = self.Ticket.query.filter_by(
-                municipio_id=municipio_id
-            ).order_by(self.Ticket.numero_turno.desc()).first()
+            municipio_id = int(municipio_id)
+            if not self._incrementar_contador(municipio_id, cantidad):
+                self._inicializar_contador(municipio_id)
+                self._incrementar_contador(municipio_id, cantidad)
             
-            if ultimo_ticket:
-                return ultimo_ticket.numero_turno + 1
-            else:
-                return 1
+            ultimo_turno = self.db.session.execute(
+                self.db.select(self.contadores.c.ultimo_turno)
+                .where(self.contadores.c.municipio_id == municipio_id)
+            ).scalar_one()
+            return ultimo_turno - cantidad + 1
                 
         except Exception as e:
             print(f"Error obteniendo siguiente turno: {e}")
-            return 1
+            raise
     
-    def validar_turno_existente(self, municipio_id, curp):
-        try:
-            return self.Ticket.query.filter_by(
-                municipio_id=municipio_id, 
-                curp=curp
-            ).first()
-        except Exception as e:
-            print(f"Error validando turno existente: {e}")
-            return None
\ No newline at end of file
+    def _incrementar_contador(self, municipio_id, cantidad):
+        resultado = self.db.session.execute(
+            self.contadores.update()
+            .where(self.contadores.c.municipio_id == municipio_id)
+            .values(ultimo_turno=self.contadores.c.ultimo_turno + cantidad)
+        )
+        return resultado.rowcount > 0
+    
+    def _inicializar_contador(self, municipio_id):
+        ultimo_turno = max(
+            self.db.session.query(self.db.func.coalesce(self.db.func.max(modelo.numero_turno), 0))
+            .filter(modelo.municipio_id == municipio_id).scalar()
+            for modelo in (self.Ticket, self.TicketArchivado)
+        )
+        
+        self.db.session.execute(
+            self.contadores.insert()
+            .prefix_with('IGNORE', dialect='mysql')
+            .prefix_with('OR IGNORE', dialect='sqlite')
+            .values(municipio_id=municipio_id, ultimo_turno=ultimo_turno)
+        )
+    
+    def es_curp_duplicada(self, error, municipio_id, curp):
+        original = getattr(error, 'orig', error)
+        codigo = self._codigo_error(original)
+        if codigo is not None and codigo not in CODIGOS_DUPLICADO:
+            return False
+        if isinstance(original, sqlite3.IntegrityError) and codigo is None:
+            if 'UNIQUE' not in str(original):
+                return False
+        
+        # El mensaje del motor puede venir traducido; la fila existente es la prueba
+        return self.db.session.query(
+            self.Ticket.query.filter_by(municipio_id=int(municipio_id), curp=curp).exists()
+        ).scalar()
+    
+    @staticmethod
+    def _codigo_error(original):
+        codigo = getattr(original, 'errno', None) or getattr(original, 'sqlite_errorcode', None)
+        if codigo is None and original.args and isinstance(original.args[0], int):
+            codigo = original.args[0]
+        return codigo
@@ -0,0 +1,34 @@
+from datetime import timezone
+from flask import current_app, request
+from app.models import db, Version
+from app.utils.eventos import Eventos
+
+class Validadores:
+    @staticmethod
+    def version_datos(*claves):
+        valores = db.session.query(*[
+            db.select(Version.valor).where(Version.clave == clave).scalar_subquery()
+            for clave in (Eventos.CLAVE_VERSION, *claves)
+        ]).one()
+        return '-'.join(str(valor or 0) for valor in valores)
+    
+    @staticmethod
+    def no_modificado(etag, ultima_modificacion=None):
+        if request.if_none_match:
+            coincide = request.if_none_match.contains_weak(etag)
+        elif ultima_modificacion and request.if_modified_since:
+            coincide = ultima_modificacion.replace(microsecond=0, tzinfo=timezone.utc) <= request.if_modified_since
+        else:
+            coincide = False
+        
+        if not coincide:
+            return None
+        return Validadores.marcar(current_app.response_class(status=304), etag, ultima_modificacion)
+    
+    @staticmethod
+    def marcar(respuesta, etag, ultima_modificacion=None):
+        respuesta.set_etag(etag, weak=True)
+        if ultima_modificacion:
+            respuesta.last_modified = ultima_modificacion
+        respuesta.cache_control.no_cache = True
+        return respuesta
\ No newline at end of file
@@ -0,0 +1,35 @@
+from sqlalchemy import event
+from app.models import db, Version
+
+def registrar():
+    if not event.contains(db.session, 'after_commit', _ejecutar_al_confirmar):
+        event.listen(db.session, 'after_commit', _ejecutar_al_confirmar)
+        event.listen(db.session, 'after_rollback', _descartar_al_confirmar)
+
+def al_confirmar(funcion, sesion=None):
+    (sesion or db.session).info.setdefault('al_confirmar', []).append(funcion)
+
+def incrementar_version(conexion, clave):
+    versiones = Version.__table__
+    resultado = conexion.execute(
+        versiones.update()
+        .where(versiones.c.clave == clave)
+        .values(valor=versiones.c.valor + 1)
+    )
+    if resultado.rowcount == 0:
+        conexion.execute(
+            versiones.insert()
+            .prefix_with('IGNORE', dialect='mysql')
+            .prefix_with('OR IGNORE', dialect='sqlite')
+            .values(clave=clave, valor=1)
+        )
+
+def leer_version(clave):
+    return db.session.query(Version.valor).filter_by(clave=clave).scalar() or 0
+
+def _ejecutar_al_confirmar(sesion):
+    for funcion in sesion.info.pop('al_confirmar', []):
+        funcion()
+
+def _descartar_al_confirmar(sesion):
+    sesion.info.pop('al_confirmar', None)
\ No newline at end of file
@@ -0,0 +1,3 @@
+from benchmarks.carga import main
+
+main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from statistics import quantiles
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FILAS_REFERENCIA = 1_000_000
+
+def analitica_orm(inicio):
+    from app.models import Ticket
+    
+    esperas = defaultdict(list)
+    for ticket in Ticket.query.filter(Ticket.fecha_creacion >= inicio).yield_per(5000):
+        if ticket.estatus == 'Resuelto' and ticket.fecha_actualizacion:
+            esperas[ticket.municipio_id].append((ticket.fecha_actualizacion - ticket.fecha_creacion).total_seconds() / 60)
+    return {
+        municipio_id: quantiles(valores, n=100)[49] if len(valores) > 1 else None
+        for municipio_id, valores in esperas.items()
+    }
+
+def medir(funcion):
+    from app.models import db
+    
+    db.session.expunge_all()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return time.perf_counter() - inicio, resultado
+
+def main():
+    parser = argparse.ArgumentParser(description='Mide la carga en arreglos y el cálculo de la analítica de atención')
+    parser.add_argument('--filas', type=int, default=200_000)
+    parser.add_argument('--db', help='Archivo SQLite a usar; se ignora si DATABASE_URL está definido')
+    parser.add_argument('--sin-orm', action='store_true', help='Omite la línea base con objetos ORM')
+    args = parser.parse_args()
+    
+    if not os.environ.get('DATABASE_URL'):
+        ruta = args.db or os.path.join(tempfile.mkdtemp(), 'analitica.db')
+        os.environ['DATABASE_URL'] = f"sqlite:///{ruta}"
+    os.environ.setdefault('TRABAJOS_WORKERS', '0')
+    
+    from datetime import datetime, timedelta
+    from app import create_app
+    from app.models import db
+    from app.utils.analitica import analitica_turnos
+    from benchmarks.datos import preparar_base, sembrar_tickets
+    
+    app = create_app()
+    with app.app_context():
+        print(f"🔌 Base de datos: {db.engine.url.render_as_string(hide_password=True)}")
+        preparar_base()
+        sembrar_tickets(args.filas, lote=20000)
+        
+        inicio = datetime.utcnow() - timedelta(days=analitica_turnos.ventana_dias)
+        escala = FILAS_REFERENCIA / args.filas
+        
+        segundos, datos = medir(lambda: analitica_turnos.cargar(inicio))
+        filas = len(datos['municipio_id'])
+        arreglos = sum(arreglo.nbytes for arreglo in datos.values())
+        print(f"\n📊 Carga en arreglos: {filas} filas, {segundos:.2f} s "
+              f"({segundos * escala:.1f} s/1M), arreglos {arreglos / 1e6:.1f} MB ({arreglos / max(filas, 1):.0f} B/fila)")
+        
+        segundos, instantanea = medir(analitica_turnos.calcular)
+        print(f"📊 Instantánea completa: {segundos:.2f} s ({segundos * escala:.1f} s/1M), "
+              f"{len(instantanea['municipios'])} municipios")
+        
+        if not args.sin_orm:
+            segundos, _ = medir(lambda: analitica_orm(inicio))
+            print(f"📊 Línea base ORM (solo p50): {segundos:.2f} s ({segundos * escala:.1f} s/1M)")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from statistics import median
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import or_
+
+def busqueda_original(termino):
+    from app.models import Ticket
+    
+    return Ticket.query.filter(
+        or_(
+            Ticket.curp.contains(termino),
+            Ticket.nombre.contains(termino),
+            Ticket.apellido_paterno.contains(termino)
+        )
+    ).order_by(Ticket.fecha_creacion.desc()).all()
+
+def medir(funcion, termino, repeticiones):
+    from app.models import db
+    
+    tiempos = []
+    for _ in range(repeticiones):
+        db.session.expunge_all()
+        inicio = time.perf_counter()
+        resultados = funcion(termino)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return median(tiempos), len(resultados)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara la búsqueda original contra BuscadorTickets')
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--db', help='Archivo SQLite a usar; se ignora si DATABASE_URL está definido. '
+                                     'Para medir el índice FULLTEXT apunta DATABASE_URL a una base MySQL de pruebas')
+    args = parser.parse_args()
+    
+    if not os.environ.get('DATABASE_URL'):
+        ruta = args.db or os.path.join(tempfile.gettempdir(), 'benchmark_busqueda.db')
+        os.environ['DATABASE_URL'] = f"sqlite:///{ruta}"
+    os.environ.setdefault('TRABAJOS_WORKERS', '0')
+    os.environ.setdefault('ADMISION_ACTIVA', '0')
+    
+    from app import create_app
+    from app.models import db, Ticket
+    from app.utils.buscador import BuscadorTickets
+    from benchmarks.datos import preparar_base, sembrar_tickets
+    
+    app = create_app()
+    with app.app_context():
+        print(f"🔌 Base de datos: {db.engine.url.render_as_string(hide_password=True)}")
+        preparar_base()
+        sembrar_tickets(args.filas)
+        
+        muestra = Ticket.query.order_by(Ticket.id.desc()).first()
+        terminos = [muestra.curp, muestra.curp[:6], muestra.curp[4:10], 'GARC', 'ANDEZ', muestra.email[:8]]
+        
+        print(f"\n📊 {'término':<20} {'original (ms)':>14} {'filas':>8} {'buscador (ms)':>14} {'filas':>6}")
+        for termino in terminos:
+            original, filas_original = medir(busqueda_original, termino, args.repeticiones)
+            nuevo, filas_nuevo = medir(BuscadorTickets.buscar, termino, args.repeticiones)
+            print(f"   {termino:<20} {original:>14.1f} {filas_original:>8} {nuevo:>14.1f} {filas_nuevo:>6}")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
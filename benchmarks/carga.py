@@ -0,0 +1,215 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ESCALAS = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+def percentil(ordenados, porcentaje):
+    if not ordenados:
+        return 0.0
+    indice = max(0, min(len(ordenados) - 1, int(round(porcentaje / 100 * len(ordenados))) - 1))
+    return ordenados[indice]
+
+class ContadorConsultas:
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self._local = threading.local()
+        event.listen(engine, 'before_cursor_execute', self._contar)
+    
+    def _contar(self, *args):
+        self._local.consultas = getattr(self._local, 'consultas', 0) + 1
+    
+    def reiniciar(self):
+        self._local.consultas = 0
+    
+    def leer(self):
+        return getattr(self._local, 'consultas', 0)
+
+class Cliente:
+    def __init__(self, app, numero, semilla, corrida, max_id, municipios):
+        self.http = app.test_client()
+        self.rng = random.Random(semilla + numero)
+        self.numero = numero
+        self.corrida = corrida
+        self.max_id = max_id
+        self.municipios = municipios
+        self.solicitudes = 0
+    
+    def iniciar_sesion(self):
+        from benchmarks.datos import USUARIO_ADMIN
+        self.http.post('/auth/login', data={'username': USUARIO_ADMIN[0], 'password': USUARIO_ADMIN[1]})
+    
+    def solicitar_turno(self):
+        self.solicitudes += 1
+        respuesta = self.http.post('/solicitar-turno', data={
+            'curp': f"B{self.corrida:05d}{self.numero:03d}{self.solicitudes:07d}XX",
+            'nombre': 'CARGA',
+            'apellido_paterno': 'PRUEBA',
+            'apellido_materno': 'BENCHMARK',
+            'telefono': '4490000000',
+            'email': 'carga@benchmark.local',
+            'municipio_id': self.rng.choice(self.municipios)
+        })
+        return '/comprobante/' in respuesta.headers.get('Location', '')
+    
+    def comprobante(self):
+        return self.http.get(f"/comprobante/{self.rng.randint(1, self.max_id)}").status_code == 200
+    
+    def dashboard(self):
+        return self.http.get('/dashboard').status_code == 200
+    
+    def admin_tickets(self):
+        termino = self.rng.choice(['GARC', 'ANDEZ', 'MARIA', 'LOPEZ'])
+        return self.http.get(f"/admin/tickets?q={termino}").status_code == 200
+    
+    def api_tickets(self):
+        desde = max(0, self.rng.randint(1, self.max_id) - 500)
+        municipio_id = self.rng.choice(self.municipios)
+        return self.http.get(f"/api/tickets?municipio_id={municipio_id}&after_id={desde}").status_code == 200
+    
+    def api_estadisticas(self):
+        return self.http.get('/api/estadisticas').status_code == 200
+
+ESCENARIOS = ['solicitar_turno', 'comprobante', 'dashboard', 'admin_tickets', 'api_tickets', 'api_estadisticas']
+
+def ejecutar_escenario(clientes, escenario, duracion, contador):
+    muestras = []
+    errores = [0]
+    lock = threading.Lock()
+    fin = time.perf_counter() + duracion
+    
+    def trabajar(cliente):
+        locales = []
+        fallos = 0
+        while time.perf_counter() < fin:
+            contador.reiniciar()
+            inicio = time.perf_counter()
+            try:
+                correcto = getattr(cliente, escenario)()
+            except Exception:
+                correcto = False
+            locales.append(((time.perf_counter() - inicio) * 1000, contador.leer()))
+            fallos += 0 if correcto else 1
+        with lock:
+            muestras.extend(locales)
+            errores[0] += fallos
+    
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=trabajar, args=(cliente,)) for cliente in clientes]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    transcurrido = time.perf_counter() - inicio
+    
+    latencias = sorted(latencia for latencia, _ in muestras)
+    return {
+        'solicitudes': len(muestras),
+        'errores': errores[0],
+        'throughput': len(muestras) / transcurrido if transcurrido else 0.0,
+        'p50_ms': percentil(latencias, 50),
+        'p95_ms': percentil(latencias, 95),
+        'p99_ms': percentil(latencias, 99),
+        'consultas_por_solicitud': sum(consultas for _, consultas in muestras) / len(muestras) if muestras else 0.0
+    }
+
+def comparar(actual, base, tolerancia):
+    regresiones = []
+    for escenario, medicion in actual['escenarios'].items():
+        anterior = base.get('escenarios', {}).get(escenario)
+        if not anterior:
+            continue
+        if anterior['p95_ms'] and medicion['p95_ms'] > anterior['p95_ms'] * (1 + tolerancia):
+            regresiones.append(f"{escenario}: p95 {anterior['p95_ms']:.1f} → {medicion['p95_ms']:.1f} ms")
+        if anterior['throughput'] and medicion['throughput'] < anterior['throughput'] * (1 - tolerancia):
+            regresiones.append(f"{escenario}: throughput {anterior['throughput']:.1f} → {medicion['throughput']:.1f} req/s")
+        if medicion['consultas_por_solicitud'] > anterior['consultas_por_solicitud'] + 0.5:
+            regresiones.append(
+                f"{escenario}: consultas {anterior['consultas_por_solicitud']:.1f} → {medicion['consultas_por_solicitud']:.1f}"
+            )
+    return regresiones
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de carga y latencia de los endpoints principales')
+    parser.add_argument('--escala', choices=sorted(ESCALAS), default='10k')
+    parser.add_argument('--clientes', type=int, default=8)
+    parser.add_argument('--duracion', type=float, default=10.0, help='Segundos por escenario')
+    parser.add_argument('--escenarios', nargs='*', choices=ESCENARIOS, default=ESCENARIOS)
+    parser.add_argument('--db', help='Archivo SQLite a usar; se ignora si DATABASE_URL está definido')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', help='Guarda los resultados en este archivo JSON')
+    parser.add_argument('--comparar', help='Archivo JSON base contra el que se buscan regresiones')
+    parser.add_argument('--tolerancia', type=float, default=0.2)
+    args = parser.parse_args()
+    
+    if not os.environ.get('DATABASE_URL'):
+        ruta = args.db or os.path.join(tempfile.gettempdir(), f"benchmark_tickets_{args.escala}.db")
+        os.environ['DATABASE_URL'] = f"sqlite:///{ruta}"
+    os.environ.setdefault('TRABAJOS_WORKERS', '0')
+    os.environ.setdefault('ADMISION_ACTIVA', '0')
+    
+    from app import create_app
+    from app.models import db, Municipio, Ticket
+    from benchmarks.datos import preparar_base, sembrar_tickets
+    
+    app = create_app()
+    with app.app_context():
+        print(f"🔌 Base de datos: {db.engine.url.render_as_string(hide_password=True)}")
+        preparar_base()
+        sembrar_tickets(ESCALAS[args.escala], semilla=args.semilla)
+        max_id = db.session.query(db.func.max(Ticket.id)).scalar()
+        municipios = [municipio_id for (municipio_id,) in db.session.query(Municipio.id)]
+        contador = ContadorConsultas(db.engine)
+    
+    corrida = int(time.time()) % 100000
+    clientes = [Cliente(app, numero, args.semilla, corrida, max_id, municipios) for numero in range(args.clientes)]
+    for cliente in clientes:
+        cliente.iniciar_sesion()
+    
+    resultados = {
+        'meta': {
+            'fecha': datetime.utcnow().isoformat(),
+            'escala': args.escala,
+            'clientes': args.clientes,
+            'duracion': args.duracion,
+            'python': platform.python_version(),
+            'plataforma': platform.platform()
+        },
+        'escenarios': {}
+    }
+    
+    print(f"\n📊 {'escenario':<18} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'sql/req':>8}")
+    for escenario in args.escenarios:
+        medicion = ejecutar_escenario(clientes, escenario, args.duracion, contador)
+        resultados['escenarios'][escenario] = medicion
+        print(f"   {escenario:<18} {medicion['solicitudes']:>7} {medicion['errores']:>5} "
+              f"{medicion['throughput']:>8.1f} {medicion['p50_ms']:>8.1f} {medicion['p95_ms']:>8.1f} "
+              f"{medicion['p99_ms']:>8.1f} {medicion['consultas_por_solicitud']:>8.1f}")
+    
+    if args.salida:
+        with open(args.salida, 'w') as archivo:
+            json.dump(resultados, archivo, indent=2)
+        print(f"\n💾 Resultados guardados en {args.salida}")
+    
+    if args.comparar:
+        with open(args.comparar) as archivo:
+            base = json.load(archivo)
+        regresiones = comparar(resultados, base, args.tolerancia)
+        if regresiones:
+            print("\n❌ Regresiones detectadas:")
+            for regresion in regresiones:
+                print(f"   - {regresion}")
+            raise SystemExit(1)
+        print("\n✅ Sin regresiones respecto a la base")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,82 @@
+import random
+import string
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+from app.models import db, Municipio, Ticket, Usuario
+from app.utils.estadisticas import Estadisticas
+from app.utils.turno_manager import TurnoManager
+
+NOMBRES = ['JUAN', 'MARIA', 'JOSE', 'GUADALUPE', 'FRANCISCO', 'ANA', 'LUIS', 'ROSA', 'CARLOS', 'ELENA']
+APELLIDOS = ['GARCIA', 'HERNANDEZ', 'LOPEZ', 'MARTINEZ', 'GONZALEZ', 'RODRIGUEZ', 'PEREZ', 'SANCHEZ', 'RAMIREZ', 'TORRES']
+MUNICIPIOS = [
+    ('Aguascalientes', 'AGS'),
+    ('Jesús María', 'JEM'),
+    ('Calvillo', 'CAL'),
+    ('Asientos', 'ASI'),
+    ('Rincón de Romos', 'RIN')
+]
+USUARIO_ADMIN = ('admin', 'admin123')
+
+def generar_curp(rng):
+    letras = ''.join(rng.choices(string.ascii_uppercase, k=4))
+    fecha = ''.join(rng.choices(string.digits, k=6))
+    resto = ''.join(rng.choices(string.ascii_uppercase, k=5))
+    return f"{letras}{fecha}{rng.choice('HM')}{resto}{rng.choice(string.digits)}{rng.choice(string.digits)}"
+
+def preparar_base():
+    db.create_all()
+    
+    if not Usuario.query.filter_by(username=USUARIO_ADMIN[0]).first():
+        db.session.add(Usuario(
+            username=USUARIO_ADMIN[0],
+            password=generate_password_hash(USUARIO_ADMIN[1]),
+            email='admin@benchmark.local',
+            es_admin=True
+        ))
+    if Municipio.query.count() == 0:
+        db.session.add_all([Municipio(nombre=nombre, codigo=codigo) for nombre, codigo in MUNICIPIOS])
+    db.session.commit()
+
+def sembrar_tickets(total, lote=5000, semilla=42, dias=30):
+    rng = random.Random(semilla)
+    existentes = Ticket.query.count()
+    municipios = [m.id for m in Municipio.query.all()]
+    turno_manager = TurnoManager()
+    ahora = datetime.utcnow()
+    
+    if not municipios:
+        raise SystemExit("❌ No hay municipios; ejecuta init_database.py primero")
+    
+    while existentes < total:
+        cantidad = min(lote, total - existentes)
+        filas = []
+        por_municipio = {}
+        for _ in range(cantidad):
+            municipio_id = rng.choice(municipios)
+            por_municipio[municipio_id] = por_municipio.get(municipio_id, 0) + 1
+        
+        for municipio_id, cantidad_municipio in por_municipio.items():
+            primero = turno_manager.reservar_turnos(municipio_id, cantidad_municipio)
+            for desplazamiento in range(cantidad_municipio):
+                nombre = rng.choice(NOMBRES)
+                apellido_paterno = rng.choice(APELLIDOS)
+                fecha_creacion = ahora - timedelta(seconds=rng.randint(0, dias * 86400))
+                filas.append({
+                    'curp': generar_curp(rng),
+                    'nombre': nombre,
+                    'apellido_paterno': apellido_paterno,
+                    'apellido_materno': rng.choice(APELLIDOS),
+                    'telefono': ''.join(rng.choices(string.digits, k=10)),
+                    'email': f"{nombre.lower()}.{apellido_paterno.lower()}{rng.randint(1, 9999)}@correo.mx",
+                    'municipio_id': municipio_id,
+                    'numero_turno': primero + desplazamiento,
+                    'estatus': rng.choice(['Pendiente', 'Resuelto']),
+                    'fecha_creacion': fecha_creacion,
+                    'fecha_actualizacion': fecha_creacion
+                })
+        
+        db.session.execute(Ticket.__table__.insert(), filas)
+        Estadisticas.registrar_altas(filas)
+        db.session.commit()
+        existentes += cantidad
+        print(f"   🌱 {existentes} tickets sembrados")
\ No newline at end of file
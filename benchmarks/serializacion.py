@@ -0,0 +1,111 @@
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from statistics import median
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FILAS_REFERENCIA = 10_000
+CAMPOS_REDUCIDOS = ('id', 'numero_turno', 'estatus')
+
+def serializar_original():
+    from app.models import db, Municipio, Ticket
+    
+    filas = db.session.query(
+        Ticket.id,
+        Ticket.curp,
+        Ticket.nombre,
+        Ticket.apellido_paterno,
+        Ticket.apellido_materno,
+        Municipio.nombre.label('municipio'),
+        Ticket.numero_turno,
+        Ticket.estatus,
+        Ticket.fecha_creacion
+    ).join(Municipio, Municipio.id == Ticket.municipio_id)
+    
+    datos = [{
+        'id': fila.id,
+        'curp': fila.curp,
+        'nombre_completo': f"{fila.nombre} {fila.apellido_paterno} {fila.apellido_materno}",
+        'municipio': fila.municipio,
+        'numero_turno': fila.numero_turno,
+        'estatus': fila.estatus,
+        'fecha_creacion': fila.fecha_creacion.isoformat()
+    } for fila in filas]
+    return json.dumps(datos, sort_keys=True).encode()
+
+def serializar_nuevo(campos, rapido):
+    from flask import current_app
+    from app.utils.consultas import ConsultasTicket
+    from app.utils.serializacion import ProveedorJSON
+    
+    datos = [ConsultasTicket.serializar_fila_api(fila, campos) for fila in ConsultasTicket.filas_api(campos=campos)]
+    if rapido:
+        return current_app.json.dumps(datos).encode()
+    return json.dumps(datos, default=ProveedorJSON.default, ensure_ascii=False, sort_keys=True).encode()
+
+def medir(funcion, repeticiones):
+    from app.models import db
+    
+    tiempos = []
+    for _ in range(repeticiones):
+        db.session.expunge_all()
+        inicio = time.process_time()
+        cuerpo = funcion()
+        tiempos.append(time.process_time() - inicio)
+    return median(tiempos), cuerpo
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara bytes y CPU de la serialización de /api/tickets')
+    parser.add_argument('--filas', type=int, default=FILAS_REFERENCIA)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--db', help='Archivo SQLite a usar; se ignora si DATABASE_URL está definido')
+    args = parser.parse_args()
+    
+    if not os.environ.get('DATABASE_URL'):
+        ruta = args.db or os.path.join(tempfile.mkdtemp(), 'serializacion.db')
+        os.environ['DATABASE_URL'] = f"sqlite:///{ruta}"
+    os.environ.setdefault('TRABAJOS_WORKERS', '0')
+    
+    from app import create_app
+    from app.models import db
+    from app.utils.consultas import CAMPOS_API
+    from app.utils import serializacion
+    from benchmarks.datos import preparar_base, sembrar_tickets
+    
+    app = create_app()
+    with app.app_context():
+        print(f"🔌 Base de datos: {db.engine.url.render_as_string(hide_password=True)}")
+        preparar_base()
+        sembrar_tickets(args.filas)
+        
+        variantes = [
+            ('original (stdlib, 7 campos)', serializar_original),
+            ('nuevo stdlib, 7 campos', lambda: serializar_nuevo(CAMPOS_API, False)),
+            ('nuevo stdlib, 3 campos', lambda: serializar_nuevo(CAMPOS_REDUCIDOS, False)),
+        ]
+        if serializacion.orjson:
+            variantes += [
+                ('nuevo orjson, 7 campos', lambda: serializar_nuevo(CAMPOS_API, True)),
+                ('nuevo orjson, 3 campos', lambda: serializar_nuevo(CAMPOS_REDUCIDOS, True)),
+            ]
+        else:
+            print("⚠️  orjson no está instalado; solo se mide el respaldo stdlib")
+        
+        escala = FILAS_REFERENCIA / args.filas
+        nivel = app.config['COMPRESION_NIVEL']
+        print(f"\n📊 {'variante':<30} {'CPU ms/10k':>11} {'bytes/10k':>11} {'gzip/10k':>10} {'gzip CPU ms':>12}")
+        for nombre, funcion in variantes:
+            segundos, cuerpo = medir(funcion, args.repeticiones)
+            inicio = time.process_time()
+            comprimido = gzip.compress(cuerpo, nivel)
+            segundos_gzip = time.process_time() - inicio
+            print(f"   {nombre:<30} {segundos * 1000 * escala:>11.1f} {len(cuerpo) * escala:>11.0f} "
+                  f"{len(comprimido) * escala:>10.0f} {segundos_gzip * 1000 * escala:>12.1f}")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -4,7 +4,76 @@ from datetime import timedelta
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'clave-super-secreta-para-flask-2024'
     
-    SQLALCHEMY_DATABASE_URI = 'mysql+mysqlconnector://root:@localhost/ticket_system'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'mysql+mysqlconnector://root:@localhost/ticket_system'
+    
+    DATABASE_REPLICA_URLS = [url.strip() for url in (os.environ.get('DATABASE_REPLICA_URLS') or '').split(',') if url.strip()]
+    REPLICAS_RETRASO_MAXIMO = float(os.environ.get('REPLICAS_RETRASO_MAXIMO') or 5)
+    REPLICAS_INTERVALO_VERIFICACION = float(os.environ.get('REPLICAS_INTERVALO_VERIFICACION') or 10)
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    PERMANENT_SESSION_LIFETIME = timedelta(minutes=30)
\ No newline at end of file
+    PERMANENT_SESSION_LIFETIME = timedelta(minutes=30)
+    
+    API_STREAM_CHUNK = int(os.environ.get('API_STREAM_CHUNK') or 1000)
+    BUSQUEDA_LIMITE = int(os.environ.get('BUSQUEDA_LIMITE') or 100)
+    ADMIN_TICKETS_POR_PAGINA = int(os.environ.get('ADMIN_TICKETS_POR_PAGINA') or 100)
+    BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE') or 500)
+    BULK_MAX_FILAS = int(os.environ.get('BULK_MAX_FILAS') or 10000)
+    BULK_MAX_BYTES = int(os.environ.get('BULK_MAX_BYTES') or 5 * 1024 * 1024)
+    BULK_TOKEN = os.environ.get('BULK_TOKEN')
+    COMPRESION_MINIMO = int(os.environ.get('COMPRESION_MINIMO') or 2048)
+    COMPRESION_NIVEL = int(os.environ.get('COMPRESION_NIVEL') or 6)
+    
+    CATALOGO_INTERVALO_VERIFICACION = float(os.environ.get('CATALOGO_INTERVALO_VERIFICACION') or 5)
+    USUARIOS_CACHE_TTL = float(os.environ.get('USUARIOS_CACHE_TTL') or 60)
+    USUARIOS_INTERVALO_VERIFICACION = float(os.environ.get('USUARIOS_INTERVALO_VERIFICACION') or 5)
+    
+    METRICAS_UMBRAL_LENTO = float(os.environ.get('METRICAS_UMBRAL_LENTO') or 1.0)
+    METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN')
+    
+    COMPROBANTES_CACHE_ENTRADAS = int(os.environ.get('COMPROBANTES_CACHE_ENTRADAS') or 256)
+    COMPROBANTES_CACHE_DIR = os.environ.get('COMPROBANTES_CACHE_DIR')
+    EXPORTACION_PROCESOS = int(os.environ.get('EXPORTACION_PROCESOS') or min(os.cpu_count() or 1, 4))
+    EXPORTACION_MAX_PDF = int(os.environ.get('EXPORTACION_MAX_PDF') or 500)
+    
+    EVENTOS_INTERVALO = float(os.environ.get('EVENTOS_INTERVALO') or 0.5)
+    EVENTOS_LATIDO = float(os.environ.get('EVENTOS_LATIDO') or 15)
+    EVENTOS_MAX_CLIENTES = int(os.environ.get('EVENTOS_MAX_CLIENTES') or 20)
+    EVENTOS_DURACION = float(os.environ.get('EVENTOS_DURACION') or 60)
+    EVENTOS_REINTENTO = int(os.environ.get('EVENTOS_REINTENTO') or 5)
+    EVENTOS_REINTENTO_SATURADO = int(os.environ.get('EVENTOS_REINTENTO_SATURADO') or 30)
+    EVENTOS_BUFFER = int(os.environ.get('EVENTOS_BUFFER') or 1000)
+    EVENTOS_ESPERA_HUECOS = float(os.environ.get('EVENTOS_ESPERA_HUECOS') or 5)
+    EVENTOS_RETENCION_HORAS = float(os.environ.get('EVENTOS_RETENCION_HORAS') or 24)
+    POSICIONES_INTERVALO_VERIFICACION = float(os.environ.get('POSICIONES_INTERVALO_VERIFICACION') or 300)
+    
+    ARCHIVO_DIAS = int(os.environ.get('ARCHIVO_DIAS') or 90)
+    ARCHIVO_LOTE = int(os.environ.get('ARCHIVO_LOTE') or 1000)
+    ARCHIVO_PAUSA = float(os.environ.get('ARCHIVO_PAUSA') or 0)
+    
+    ANALITICA_TTL = float(os.environ.get('ANALITICA_TTL') or 300)
+    ANALITICA_VENTANA_DIAS = int(os.environ.get('ANALITICA_VENTANA_DIAS') or 14)
+    ANALITICA_LOTE = int(os.environ.get('ANALITICA_LOTE') or 50000)
+    ANALITICA_DESFASE_HORAS = int(os.environ.get('ANALITICA_DESFASE_HORAS') or -6)
+    
+    GRAFICAS_FORMATO = os.environ.get('GRAFICAS_FORMATO') or 'svg'
+    GRAFICAS_TIMEOUT = float(os.environ.get('GRAFICAS_TIMEOUT') or 10)
+    PRECARGAR_MODULOS = os.environ.get('PRECARGAR_MODULOS') == '1'
+    
+    ADMISION_ACTIVA = (os.environ.get('ADMISION_ACTIVA') or '1') == '1'
+    ADMISION_CAPACIDAD = int(os.environ.get('ADMISION_CAPACIDAD') or 32)
+    ADMISION_RESERVA_ADMIN = float(os.environ.get('ADMISION_RESERVA_ADMIN') or 0.25)
+    ADMISION_LIMITE_REGISTRO = int(os.environ.get('ADMISION_LIMITE_REGISTRO') or 8)
+    ADMISION_LIMITE_COMPROBANTE = int(os.environ.get('ADMISION_LIMITE_COMPROBANTE') or 6)
+    ADMISION_TASA = float(os.environ.get('ADMISION_TASA') or 0.5)
+    ADMISION_RAFAGA = int(os.environ.get('ADMISION_RAFAGA') or 10)
+    ADMISION_REINTENTO = float(os.environ.get('ADMISION_REINTENTO') or 2)
+    ADMISION_MAX_CLIENTES = int(os.environ.get('ADMISION_MAX_CLIENTES') or 10000)
+    ADMISION_PROXIES = int(os.environ.get('ADMISION_PROXIES') or 0)
+    
+    TRABAJOS_WORKERS = int(os.environ.get('TRABAJOS_WORKERS') or 2)
+    TRABAJOS_DIR = os.environ.get('TRABAJOS_DIR')
+    TRABAJOS_INTERVALO = float(os.environ.get('TRABAJOS_INTERVALO') or 1.0)
+    TRABAJOS_TIMEOUT = int(os.environ.get('TRABAJOS_TIMEOUT') or 120)
+    TRABAJOS_LATIDO = float(os.environ.get('TRABAJOS_LATIDO') or 30)
+    TRABAJOS_RETENCION_HORAS = float(os.environ.get('TRABAJOS_RETENCION_HORAS') or 24)
+    TRABAJOS_MAX_INTENTOS = int(os.environ.get('TRABAJOS_MAX_INTENTOS') or 3)
\ No newline at end of file
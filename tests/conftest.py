@@ -0,0 +1,96 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('TRABAJOS_WORKERS', '0')
+os.environ.setdefault('ADMISION_ACTIVA', '0')
+os.environ.setdefault('EXPORTACION_PROCESOS', '0')
+
+import pytest
+from werkzeug.security import generate_password_hash
+from config import Config
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'turnos.db'}")
+    monkeypatch.setattr(Config, 'TRABAJOS_DIR', str(tmp_path / 'trabajos'))
+    
+    from app import create_app
+    from app.models import db, Municipio, Usuario
+    
+    for singleton in _singletons_con_estado():
+        singleton.__init__()
+    
+    aplicacion = create_app()
+    aplicacion.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    with aplicacion.app_context():
+        db.create_all()
+        db.session.add_all([
+            Usuario(username='admin', password=generate_password_hash('admin123'), email='admin@turnos.mx', es_admin=True),
+            Municipio(nombre='Aguascalientes', codigo='AGS'),
+            Municipio(nombre='Calvillo', codigo='CAL')
+        ])
+        db.session.commit()
+    
+    yield aplicacion
+    
+    with aplicacion.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture
+def contar_sentencias(app):
+    import threading
+    from sqlalchemy import event
+    from app.models import db
+    
+    sentencias = []
+    hilo = threading.get_ident()
+    
+    def registrar(conexion, cursor, sentencia, parametros, contexto, executemany):
+        if threading.get_ident() == hilo:
+            sentencias.append(sentencia)
+    
+    with app.app_context():
+        motor = db.engine
+    event.listen(motor, 'before_cursor_execute', registrar)
+    yield sentencias
+    event.remove(motor, 'before_cursor_execute', registrar)
+
+@pytest.fixture
+def cliente(app):
+    return app.test_client()
+
+@pytest.fixture
+def admin(cliente):
+    cliente.post('/auth/login', data={'username': 'admin', 'password': 'admin123'})
+    return cliente
+
+def sembrar_tickets(app, cantidad, municipio_id=1, inicio=1):
+    from app.models import db, Ticket
+    
+    with app.app_context():
+        db.session.add_all([
+            Ticket(
+                curp=f"TEST{numero:014d}", nombre='Ana', apellido_paterno='Ruiz', apellido_materno='Diaz',
+                telefono='4490000000', email=f"ana{numero}@turnos.mx", municipio_id=municipio_id, numero_turno=numero
+            )
+            for numero in range(inicio, inicio + cantidad)
+        ])
+        db.session.commit()
+
+def _singletons_con_estado():
+    from app.utils.admision import control_admision
+    from app.utils.analitica import analitica_turnos
+    from app.utils.cache_comprobantes import cache_comprobantes
+    from app.utils.cache_usuarios import cache_usuarios
+    from app.utils.catalogo import catalogo_municipios
+    from app.utils.eventos import despachador_eventos
+    from app.utils.graficas import graficas_dashboard
+    from app.utils.posiciones import indice_posiciones
+    from app.utils.replicas import enrutador_replicas
+    
+    return (
+        control_admision, analitica_turnos, cache_comprobantes, cache_usuarios, catalogo_municipios,
+        despachador_eventos, graficas_dashboard, indice_posiciones, enrutador_replicas
+    )
\ No newline at end of file
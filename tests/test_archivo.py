@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from conftest import sembrar_tickets
+from app.models import db, Ticket, TicketArchivado
+from app.utils.archivo import Archivador
+from app.utils.buscador import BuscadorTickets
+from app.utils.estadisticas import Estadisticas
+from app.utils.turno_manager import TurnoManager
+
+def _preparar(app):
+    sembrar_tickets(app, 3, municipio_id=2)
+    sembrar_tickets(app, 4, municipio_id=1, inicio=4)
+    
+    antiguedad = {1: 120, 2: 110, 3: 100, 4: 95, 5: 120, 6: 5, 7: 120}
+    with app.app_context():
+        for ticket in Ticket.query.all():
+            ticket.fecha_creacion = datetime.utcnow() - timedelta(days=antiguedad[ticket.id])
+            if ticket.id != 5:
+                ticket.estatus = 'Resuelto'
+        db.session.commit()
+
+def test_archivar_mueve_por_lotes_y_conserva_el_ultimo_id(app):
+    _preparar(app)
+    
+    with app.app_context():
+        assert Archivador.archivar(90, lote=3, max_lotes=1) == 3
+        assert Archivador.archivar(90, lote=3) == 1
+    
+        assert [ticket.id for ticket in Ticket.query.order_by(Ticket.id)] == [5, 6, 7]
+        assert [ticket.id for ticket in TicketArchivado.query.order_by(TicketArchivado.id)] == [1, 2, 3, 4]
+        assert Estadisticas.verificar() == []
+        assert Estadisticas.resumen(incluir_archivo=True) == {'total': 7, 'pendientes': 1, 'resueltos': 6}
+
+def test_archivar_no_reinicia_ids_ni_turnos(app):
+    _preparar(app)
+    with app.app_context():
+        Archivador.archivar(90)
+        assert TurnoManager().obtener_siguiente_turno(2) == 4
+        assert TurnoManager().obtener_siguiente_turno(1) == 8
+        db.session.rollback()
+    
+    sembrar_tickets(app, 1, municipio_id=2, inicio=4)
+    with app.app_context():
+        assert Ticket.query.filter_by(municipio_id=2, numero_turno=4).one().id == 8
+
+def test_busqueda_por_curp_incluye_el_archivo(app, cliente):
+    _preparar(app)
+    with app.app_context():
+        Archivador.archivar(90)
+    
+        assert [ticket.id for ticket in Archivador.buscar_por_curp('TEST00000000000001', 1, 2)] == [1]
+        assert BuscadorTickets.buscar('TEST00000000000001') == []
+        assert [ticket.id for ticket in BuscadorTickets.buscar('TEST00000000000001', incluir_archivo=True)] == [1]
+    
+    respuesta = cliente.post('/modificar-turno', data={'curp': 'TEST00000000000001', 'numero_turno': '1'})
+    assert respuesta.status_code == 302
+    assert respuesta.headers['Location'].endswith('/comprobante/1')
\ No newline at end of file
@@ -0,0 +1,104 @@
+import json
+import logging
+from datetime import datetime, timedelta
+from conftest import sembrar_tickets
+from app.models import db, Ticket
+from app.utils import carga_masiva
+from app.utils.archivo import Archivador
+
+def _fila(curp, **cambios):
+    return {
+        'curp': curp, 'nombre': 'Ana', 'apellido_paterno': 'Ruiz', 'apellido_materno': 'Diaz',
+        'telefono': '4490000000', 'email': 'ana@turnos.mx', 'municipio_id': 1, **cambios
+    }
+
+def _enviar(cliente, filas, **opciones):
+    cuerpo = '\n'.join(fila if isinstance(fila, str) else json.dumps(fila) for fila in filas)
+    return cliente.post('/api/tickets/bulk', data=cuerpo, content_type='application/x-ndjson', **opciones)
+
+def _errores(respuesta):
+    return {resultado['fila']: resultado.get('error') for resultado in respuesta.get_json()['resultados']}
+
+def test_requiere_admin_o_token(app, cliente):
+    assert _enviar(cliente, [_fila('CARG000000HAGSXX01')]).status_code == 401
+    
+    app.config['BULK_TOKEN'] = 'secreto'
+    respuesta = _enviar(cliente, [_fila('CARG000000HAGSXX01')], headers={'Authorization': 'Bearer secreto'})
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['creados'] == 1
+
+def test_curps_duplicadas_en_la_base_y_en_la_carga(app, admin):
+    sembrar_tickets(app, 1)
+    
+    respuesta = _enviar(admin, [
+        _fila('TEST00000000000001'),
+        _fila('CARG000000HAGSXX01'),
+        _fila('CARG000000HAGSXX01'),
+        _fila('CARG000000HAGSXX01', municipio_id=2)
+    ])
+    
+    assert respuesta.get_json()['creados'] == 2
+    assert _errores(respuesta) == {
+        1: 'Ya existe un turno para esta CURP en el municipio',
+        2: None,
+        3: 'CURP duplicada para el mismo municipio dentro de la carga',
+        4: None
+    }
+
+def test_filas_invalidas(admin):
+    respuesta = _enviar(admin, [
+        '{no es json',
+        _fila('CARG000000HAGSXX01', nombre=''),
+        _fila('CARG000000HAGSXX02', municipio_id=99),
+        _fila('CARG000000HAGSXX03XXXX', telefono='4' * 16),
+        _fila('CARG000000HAGSXX04')
+    ])
+    errores = _errores(respuesta)
+    
+    assert respuesta.get_json()['creados'] == 1
+    assert errores[1] == 'Fila con formato inválido'
+    assert errores[2] == 'Campos requeridos faltantes: nombre'
+    assert errores[3] == 'El municipio no existe o no está activo'
+    assert errores[4] == 'Campos demasiado largos: curp (máximo 18), telefono (máximo 15)'
+    assert errores[5] is None
+
+def test_lote_fallido_no_expone_los_datos(app, admin, monkeypatch, caplog):
+    def fallar(filas):
+        raise RuntimeError(f"INSERT INTO tickets VALUES {[fila['curp'] for fila in filas]}")
+    
+    monkeypatch.setattr(carga_masiva.Estadisticas, 'registrar_altas', fallar)
+    with caplog.at_level(logging.ERROR):
+        respuesta = _enviar(admin, [_fila('CARG000000HAGSXX01'), _fila('CARG000000HAGSXX02')])
+    
+    assert respuesta.get_json()['creados'] == 0
+    assert set(_errores(respuesta).values()) == {'No se pudo guardar el lote de esta fila; vuelve a enviarla'}
+    assert 'CARG000000HAGSXX01' not in respuesta.get_data(as_text=True)
+    assert 'carga masiva' in caplog.text
+    with app.app_context():
+        assert Ticket.query.count() == 0
+
+def test_limites_de_filas_y_tamano(app, admin):
+    app.config['BULK_MAX_FILAS'] = 2
+    respuesta = _enviar(admin, [_fila(f"CARG000000HAGSXX0{numero}") for numero in range(1, 4)])
+    
+    assert respuesta.get_json()['creados'] == 2
+    assert respuesta.get_json()['truncado'] is True
+    
+    app.config['BULK_MAX_BYTES'] = 100
+    assert _enviar(admin, [_fila('CARG000000HAGSXX09')]).status_code == 413
+
+
+def test_curp_archivada_puede_volver_a_cargarse(app, admin):
+    sembrar_tickets(app, 2)
+    with app.app_context():
+        ticket = Ticket.query.filter_by(numero_turno=1).one()
+        ticket.estatus = 'Resuelto'
+        ticket.fecha_creacion = datetime.utcnow() - timedelta(days=120)
+        db.session.commit()
+        assert Archivador.archivar(90) == 1
+    
+    respuesta = _enviar(admin, [_fila('TEST00000000000001')])
+    
+    assert respuesta.get_json()['creados'] == 1
+    with app.app_context():
+        assert Ticket.query.filter_by(curp='TEST00000000000001').one().numero_turno == 3
\ No newline at end of file
@@ -0,0 +1,44 @@
+import threading
+from app.models import db, Municipio
+from app.utils.catalogo import catalogo_municipios
+
+def _nombres(app):
+    with app.app_context():
+        return [municipio.nombre for municipio in catalogo_municipios.activos()]
+
+def test_lectura_concurrente_antes_del_commit_no_deja_el_catalogo_viejo(app):
+    assert _nombres(app) == ['Aguascalientes', 'Calvillo']
+    
+    with app.app_context():
+        db.session.add(Municipio(nombre='Asientos', codigo='ASI'))
+        catalogo_municipios.invalidar()
+        db.session.flush()
+        
+        lector = threading.Thread(target=_nombres, args=(app,))
+        catalogo_municipios._verificado = float('-inf')
+        lector.start()
+        lector.join()
+        
+        db.session.commit()
+    
+    assert _nombres(app) == ['Aguascalientes', 'Calvillo', 'Asientos']
+
+def test_rollback_conserva_el_catalogo(app):
+    _nombres(app)
+    version = catalogo_municipios._version
+    
+    with app.app_context():
+        db.session.add(Municipio(nombre='Asientos', codigo='ASI'))
+        catalogo_municipios.invalidar()
+        db.session.rollback()
+    
+    assert catalogo_municipios._version == version
+    assert _nombres(app) == ['Aguascalientes', 'Calvillo']
+
+def test_alta_desde_la_administracion_se_ve_de_inmediato(app, admin):
+    _nombres(app)
+    
+    respuesta = admin.post('/admin/municipios/crear', data={'nombre': 'Asientos', 'codigo': 'asi'})
+    
+    assert respuesta.status_code == 302
+    assert 'Asientos' in _nombres(app)
\ No newline at end of file
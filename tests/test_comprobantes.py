@@ -0,0 +1,77 @@
+import io
+import os
+import zipfile
+from app.models import db, Ticket
+from app.utils.cache_comprobantes import cache_comprobantes
+from conftest import sembrar_tickets
+
+def test_edicion_en_el_mismo_segundo_genera_otro_comprobante(app, cliente, tmp_path):
+    cache_comprobantes.directorio = str(tmp_path / 'comprobantes')
+    sembrar_tickets(app, 1)
+    
+    primera = cliente.get('/comprobante/1')
+    assert primera.status_code == 200
+    
+    with app.app_context():
+        db.session.execute(
+            Ticket.__table__.update().where(Ticket.id == 1)
+            .values(nombre='Beatriz', fecha_actualizacion=Ticket.fecha_actualizacion)
+        )
+        db.session.commit()
+    
+    segunda = cliente.get('/comprobante/1')
+    assert segunda.status_code == 200
+    assert segunda.headers['ETag'] != primera.headers['ETag']
+    assert cache_comprobantes.estadisticas()['misses'] == 2
+    assert len(os.listdir(tmp_path / 'comprobantes' / '1')) == 2
+
+def test_invalidar_elimina_solo_el_ticket(app, cliente, tmp_path):
+    cache_comprobantes.directorio = str(tmp_path / 'comprobantes')
+    sembrar_tickets(app, 2)
+    cliente.get('/comprobante/1')
+    cliente.get('/comprobante/2')
+    
+    cache_comprobantes.invalidar(1)
+    
+    assert not os.path.exists(tmp_path / 'comprobantes' / '1')
+    assert len(os.listdir(tmp_path / 'comprobantes' / '2')) == 1
+    assert cache_comprobantes.estadisticas()['entradas'] == 1
+    
+    cliente.get('/comprobante/1')
+    assert cache_comprobantes.estadisticas()['misses'] == 3
+
+def test_exportacion_sincrona_en_pdf(app, admin):
+    sembrar_tickets(app, 3)
+    
+    respuesta = admin.get('/admin/comprobantes/exportar?formato=pdf')
+    
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == 'application/pdf'
+    assert respuesta.get_data().startswith(b'%PDF')
+
+def test_exportacion_sincrona_en_zip(app, admin):
+    sembrar_tickets(app, 3)
+    
+    respuesta = admin.get('/admin/comprobantes/exportar?formato=zip&municipio_id=1')
+    
+    assert respuesta.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(respuesta.get_data())) as archivo:
+        assert sorted(archivo.namelist()) == [f"comprobante_1_{numero}.pdf" for numero in range(1, 4)]
+        assert archivo.read('comprobante_1_1.pdf').startswith(b'%PDF')
+
+def test_pdf_grande_se_manda_a_la_cola(app, admin):
+    app.config['EXPORTACION_MAX_PDF'] = 2
+    sembrar_tickets(app, 3)
+    
+    respuesta = admin.get('/admin/comprobantes/exportar?formato=pdf')
+    
+    assert respuesta.status_code == 202
+    assert '/api/jobs/' in respuesta.headers['Location']
+
+def test_cli_rechaza_fechas_invalidas(app, tmp_path):
+    resultado = app.test_cli_runner().invoke(args=[
+        'exportar-comprobantes', '--desde', '2024-13-01', '--salida', str(tmp_path / 'salida.pdf')
+    ])
+    
+    assert resultado.exit_code == 2
+    assert '--desde' in resultado.output
\ No newline at end of file
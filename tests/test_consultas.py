@@ -0,0 +1,26 @@
+from conftest import sembrar_tickets
+
+RUTAS = ('/api/tickets', '/api/tickets?format=ndjson', '/admin/tickets', '/comprobante/{ticket}')
+
+def _medir(admin, contar_sentencias, ticket_id):
+    conteos = {}
+    for ruta in RUTAS:
+        url = ruta.format(ticket=ticket_id)
+        contar_sentencias.clear()
+        respuesta = admin.get(url)
+        assert respuesta.status_code == 200, url
+        respuesta.get_data()
+        conteos[ruta] = len(contar_sentencias)
+    return conteos
+
+def test_lecturas_con_municipio_no_crecen_con_los_tickets(app, admin, contar_sentencias):
+    for ruta in RUTAS[:-1]:
+        admin.get(ruta).get_data()
+    
+    sembrar_tickets(app, 1)
+    con_uno = _medir(admin, contar_sentencias, 1)
+    
+    sembrar_tickets(app, 49, municipio_id=2, inicio=2)
+    con_cincuenta = _medir(admin, contar_sentencias, 50)
+    
+    assert con_cincuenta == con_uno
\ No newline at end of file
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+from conftest import sembrar_tickets
+from app.models import db, Ticket
+from app.utils.estadisticas import Estadisticas
+
+def _verificar(app):
+    with app.app_context():
+        return Estadisticas.verificar()
+
+def test_altas_mantienen_los_acumulados(app):
+    sembrar_tickets(app, 3)
+    sembrar_tickets(app, 2, municipio_id=2, inicio=4)
+    
+    assert _verificar(app) == []
+    with app.app_context():
+        assert Estadisticas.resumen() == {'total': 5, 'pendientes': 5, 'resueltos': 0}
+
+def test_cambio_de_estatus_mantiene_los_acumulados(app):
+    sembrar_tickets(app, 3)
+    with app.app_context():
+        Ticket.query.filter_by(numero_turno=2).one().estatus = 'Resuelto'
+        db.session.commit()
+    
+    assert _verificar(app) == []
+    with app.app_context():
+        assert Estadisticas.resumen(1) == {'total': 3, 'pendientes': 2, 'resueltos': 1}
+
+def test_cambio_de_municipio_y_fecha_mantiene_los_acumulados(app):
+    sembrar_tickets(app, 3)
+    with app.app_context():
+        ticket = Ticket.query.filter_by(numero_turno=3).one()
+        ticket.municipio_id = 2
+        ticket.estatus = 'Resuelto'
+        ticket.fecha_creacion = datetime.utcnow() - timedelta(days=2)
+        db.session.commit()
+    
+    assert _verificar(app) == []
+    with app.app_context():
+        assert Estadisticas.resumen(2) == {'total': 1, 'pendientes': 0, 'resueltos': 1}
+
+def test_baja_mantiene_los_acumulados(app):
+    sembrar_tickets(app, 3)
+    with app.app_context():
+        db.session.delete(Ticket.query.filter_by(numero_turno=1).one())
+        db.session.commit()
+    
+    assert _verificar(app) == []
+    with app.app_context():
+        assert Estadisticas.resumen() == {'total': 2, 'pendientes': 2, 'resueltos': 0}
+
+def test_rollback_no_toca_los_acumulados(app):
+    sembrar_tickets(app, 2)
+    with app.app_context():
+        Ticket.query.filter_by(numero_turno=1).one().estatus = 'Resuelto'
+        db.session.flush()
+        db.session.rollback()
+    
+    assert _verificar(app) == []
@@ -0,0 +1,31 @@
+import time
+from app.utils.eventos import despachador_eventos
+
+def test_conexiones_por_encima_del_limite_reciben_503_con_retry(admin):
+    despachador_eventos.max_clientes = 1
+    
+    abierta = admin.get('/admin/stream')
+    assert abierta.status_code == 200
+    
+    rechazada = admin.get('/admin/stream')
+    assert rechazada.status_code == 503
+    assert rechazada.headers['Retry-After'] == str(despachador_eventos.reintento_saturado)
+    assert rechazada.get_data(as_text=True).startswith('retry: ')
+    
+    abierta.close()
+    assert despachador_eventos.estadisticas()['clientes'] == 0
+    segunda = admin.get('/admin/stream')
+    assert segunda.status_code == 200
+    segunda.close()
+
+def test_el_flujo_se_cierra_al_vencer_su_duracion(admin):
+    despachador_eventos.duracion = 0.3
+    despachador_eventos.latido = 0.1
+    
+    inicio = time.monotonic()
+    respuesta = admin.get('/admin/stream')
+    cuerpo = respuesta.get_data(as_text=True)
+    
+    assert time.monotonic() - inicio < 5
+    assert cuerpo.startswith(f"retry: {despachador_eventos.reintento * 1000}\nid: ")
+    assert despachador_eventos.estadisticas()['clientes'] == 0
@@ -0,0 +1,53 @@
+import csv
+import json
+import zlib
+from io import StringIO
+from app.models import db, Ticket
+
+def _ticket(curp, numero_turno):
+    return Ticket(
+        curp=curp, nombre='Ana', apellido_paterno='Ruiz', apellido_materno='Diaz',
+        telefono='4490000000', email='ana@turnos.mx', municipio_id=1, numero_turno=numero_turno
+    )
+
+def test_csv_vacio_incluye_encabezado(cliente):
+    respuesta = cliente.get('/api/tickets?format=csv')
+    
+    assert respuesta.status_code == 200
+    assert respuesta.get_data(as_text=True).strip() == 'id,curp,nombre_completo,municipio,numero_turno,estatus,fecha_creacion'
+
+def test_csv_con_fecha_nula(app, cliente):
+    with app.app_context():
+        db.session.add_all([_ticket('AAAA000000HAGSXX01', 1), _ticket('AAAA000000HAGSXX02', 2)])
+        db.session.commit()
+        db.session.execute(Ticket.__table__.update().where(Ticket.numero_turno == 2).values(fecha_creacion=None))
+        db.session.commit()
+    
+    respuesta = cliente.get('/api/tickets?format=csv&fields=curp,fecha_creacion')
+    filas = list(csv.DictReader(StringIO(respuesta.get_data(as_text=True))))
+    
+    assert respuesta.status_code == 200
+    assert [fila['curp'] for fila in filas] == ['AAAA000000HAGSXX01', 'AAAA000000HAGSXX02']
+    assert filas[0]['fecha_creacion'].startswith('20')
+    assert filas[1]['fecha_creacion'] == ''
+
+def test_ndjson_comprimido_entrega_cada_parte_completa(app, cliente):
+    with app.app_context():
+        db.session.add_all([_ticket(f"AAAA000000HAGSX{numero:03d}", numero) for numero in range(1, 4)])
+        db.session.commit()
+    
+    respuesta = cliente.get('/api/tickets?format=ndjson', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+    assert respuesta.headers['Content-Encoding'] == 'gzip'
+    
+    descompresor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    primera = descompresor.decompress(next(iter(respuesta.response)))
+    respuesta.close()
+    
+    assert primera.endswith(b'\n')
+    assert json.loads(primera)['curp'] == 'AAAA000000HAGSX001'
+
+def test_campos_vacios_son_rechazados(cliente):
+    respuesta = cliente.get('/api/tickets?fields=,')
+    
+    assert respuesta.status_code == 400
+    assert 'campos' in respuesta.get_json()
@@ -0,0 +1,31 @@
+import logging
+import time
+from conftest import sembrar_tickets
+from app.utils.posiciones import indice_posiciones
+
+def test_el_arranque_construye_todos_los_municipios(app, cliente, contar_sentencias):
+    sembrar_tickets(app, 5)
+    cliente.get('/')
+    assert set(indice_posiciones._colas) == {1, 2}
+    
+    contar_sentencias.clear()
+    assert cliente.get('/api/turnos/2').get_json()['pendientes'] == 0
+    assert cliente.get('/api/turnos/1/3/posicion').get_json()['posicion'] == 3
+    assert not [sentencia for sentencia in contar_sentencias if 'tickets' in sentencia]
+
+def test_la_verificacion_periodica_corre_fuera_de_las_peticiones(app, cliente, caplog):
+    sembrar_tickets(app, 5)
+    indice_posiciones.intervalo = 0.1
+    cliente.get('/')
+    
+    with indice_posiciones._lock:
+        indice_posiciones._colas[1].marcar(2, False)
+    assert cliente.get('/api/turnos/1').get_json()['pendientes'] == 4
+    
+    with caplog.at_level(logging.WARNING):
+        limite = time.monotonic() + 5
+        while indice_posiciones._colas[1].pendientes != 5 and time.monotonic() < limite:
+            time.sleep(0.05)
+    
+    assert cliente.get('/api/turnos/1').get_json()['pendientes'] == 5
+    assert 'diferían de la base en 1 turnos' in caplog.text
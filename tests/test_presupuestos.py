@@ -0,0 +1,196 @@
+import json
+import threading
+from urllib.parse import urlparse
+import pytest
+from sqlalchemy import event
+from app.models import db
+from app.utils.cache_usuarios import cache_usuarios
+from app.utils.catalogo import catalogo_municipios
+from app.utils.eventos import Eventos
+from app.utils.versiones import incrementar_version
+
+PRESUPUESTOS = [
+    ('main.index', 'GET', '/', None, False, 200, 1, 0),
+    ('main.solicitar_turno', 'POST', '/solicitar-turno', 'formulario_nuevo', False, 302, 8, 0),
+    ('main.modificar_turno_form', 'GET', '/modificar-turno', None, False, 200, 0, 0),
+    ('main.modificar_turno', 'POST', '/modificar-turno', 'formulario_busqueda', False, 200, 1, 2),
+    ('main.actualizar_turno', 'POST', '/actualizar-turno/{ticket}', 'formulario_nuevo', False, 302, 5, 1),
+    ('main.descargar_comprobante', 'GET', '/comprobante/{ticket}', None, False, 200, 1, 2),
+    ('auth.login', 'GET', '/auth/login', None, False, 200, 0, 0),
+    ('auth.login', 'POST', '/auth/login', 'formulario_login', False, 302, 1, 1),
+    ('main.dashboard', 'GET', '/dashboard', None, True, 200, 4, 0),
+    ('main.grafica_dashboard', 'GET', '/admin/graficas/municipios.svg', None, True, 200, 1, 0),
+    ('main.analitica', 'GET', '/admin/analitica', None, True, 200, 2, 0),
+    ('main.metricas_prometheus', 'GET', '/metrics', None, True, 200, 0, 0),
+    ('main.stream_eventos', 'GET', '/admin/stream', None, True, 200, 1, 0),
+    ('main.administrar_tickets', 'GET', '/admin/tickets?q=GARCIA', None, True, 200, 1, 110),
+    ('main.administrar_tickets', 'GET', '/admin/tickets', None, True, 200, 1, 110),
+    ('main.administrar_tickets', 'GET', '/admin/tickets?pagina=2', None, True, 200, 1, 110),
+    ('main.cambiar_estatus', 'POST', '/admin/tickets/{ticket}/estatus', None, True, 200, 6, 1),
+    ('main.exportar_comprobantes', 'GET', '/admin/comprobantes/exportar?async=1&formato=zip', None, True, 202, 2, 0),
+    ('main.crear_ticket_admin', 'GET', '/admin/tickets/crear', None, True, 200, 0, 0),
+    ('main.crear_ticket_admin', 'POST', '/admin/tickets/crear', 'formulario_nuevo', True, 302, 7, 0),
+    ('main.editar_ticket', 'GET', '/admin/tickets/{ticket}/editar', None, True, 200, 1, 1),
+    ('main.editar_ticket', 'POST', '/admin/tickets/{ticket}/editar', 'formulario_edicion', True, 302, 6, 1),
+    ('main.eliminar_ticket', 'POST', '/admin/tickets/{ticket_eliminar}/eliminar', None, True, 302, 6, 1),
+    ('main.administrar_municipios', 'GET', '/admin/municipios', None, True, 200, 2, 10),
+    ('main.crear_municipio', 'GET', '/admin/municipios/crear', None, True, 200, 0, 0),
+    ('main.crear_municipio', 'POST', '/admin/municipios/crear', 'formulario_municipio', True, 302, 4, 0),
+    ('main.editar_municipio', 'GET', '/admin/municipios/{municipio}/editar', None, True, 200, 1, 1),
+    ('main.editar_municipio', 'POST', '/admin/municipios/{municipio}/editar', 'formulario_municipio_edicion', True, 302, 4, 1),
+    ('main.eliminar_municipio', 'POST', '/admin/municipios/{municipio_vacio}/eliminar', None, True, 200, 5, 1),
+    ('api.obtener_tickets', 'GET', '/api/tickets?municipio_id={municipio}', None, False, 200, 2, 0),
+    ('api.obtener_tickets', 'GET', '/api/tickets?format=ndjson', None, False, 200, 2, 0),
+    ('api.crear_ticket', 'POST', '/api/tickets', 'json_nuevo', False, 201, 8, 0),
+    ('api.crear_tickets_masivo', 'POST', '/api/tickets/bulk', 'ndjson_masivo', True, 200, 10, 0),
+    ('api.estado_trabajo', 'GET', '/api/jobs/{trabajo}', None, False, 200, 1, 1),
+    ('api.resultado_trabajo', 'GET', '/api/jobs/{trabajo}/resultado', None, False, 200, 1, 1),
+    ('api.obtener_estadisticas', 'GET', '/api/estadisticas', None, False, 200, 2, 0),
+    ('api.obtener_analitica', 'GET', '/api/analitica', None, False, 200, 0, 0),
+    ('api.posicion_turno', 'GET', '/api/turnos/{municipio}/{numero_turno}/posicion', None, False, 200, 2, 0),
+    ('api.turno_actual', 'GET', '/api/turnos/{municipio}', None, False, 200, 0, 0),
+    ('auth.logout', 'GET', '/auth/logout', None, True, 302, 0, 0),
+]
+
+REDIRECCIONES = {
+    ('main.solicitar_turno', 'POST'): '/comprobante/',
+    ('main.actualizar_turno', 'POST'): '/comprobante/',
+    ('auth.login', 'POST'): '/dashboard',
+    ('main.crear_ticket_admin', 'POST'): '/admin/tickets',
+    ('main.editar_ticket', 'POST'): '/admin/tickets',
+    ('main.eliminar_ticket', 'POST'): '/admin/tickets',
+    ('main.crear_municipio', 'POST'): '/admin/municipios',
+    ('main.editar_municipio', 'POST'): '/admin/municipios',
+    ('auth.logout', 'GET'): '/auth/login',
+}
+
+class Contador:
+    def __init__(self):
+        self.hilo = threading.get_ident()
+        self.sentencias = []
+        self.filas = 0
+    
+    def reiniciar(self):
+        self.sentencias = []
+        self.filas = 0
+    
+    def sentencia(self, conexion, cursor, sentencia, parametros, contexto, executemany):
+        if threading.get_ident() == self.hilo:
+            self.sentencias.append(sentencia)
+    
+    def fila(self, instancia, contexto):
+        if threading.get_ident() == self.hilo:
+            self.filas += 1
+
+def preparar_contexto():
+    from app.models import Municipio, Ticket
+    from app.utils.trabajos import cola_trabajos
+    
+    tickets = Ticket.query.order_by(Ticket.id).limit(2).all()
+    municipio_vacio = Municipio(nombre='Municipio Vacío', codigo='VAC', activo=True)
+    db.session.add(municipio_vacio)
+    # En una base en uso la fila de versión de tickets ya existe
+    incrementar_version(db.session, Eventos.CLAVE_VERSION)
+    db.session.commit()
+    trabajo = cola_trabajos.encolar('comprobante', {'ticket_id': tickets[0].id})
+    cola_trabajos.ejecutar_pendientes()
+    
+    return {
+        'ticket': tickets[0].id,
+        'ticket_eliminar': tickets[1].id,
+        'curp': tickets[0].curp,
+        'numero_turno': tickets[0].numero_turno,
+        'municipio': tickets[0].municipio_id,
+        'municipio_vacio': municipio_vacio.id,
+        'trabajo': trabajo.id
+    }
+
+def construir_cuerpo(tipo, contexto, secuencia):
+    datos = {
+        'curp': f"PRES{secuencia:06d}HAGSXX00",
+        'nombre': 'PRESUPUESTO',
+        'apellido_paterno': 'CONSULTAS',
+        'apellido_materno': 'SQL',
+        'telefono': '4490000000',
+        'email': 'presupuesto@turnos.mx',
+        'municipio_id': str(contexto['municipio'])
+    }
+    if tipo == 'formulario_nuevo':
+        return {'data': datos}
+    if tipo == 'formulario_edicion':
+        return {'data': {**datos, 'curp': contexto['curp'], 'estatus': 'Pendiente'}}
+    if tipo == 'formulario_busqueda':
+        return {'data': {'curp': contexto['curp'], 'numero_turno': contexto['numero_turno']}}
+    if tipo == 'formulario_login':
+        return {'data': {'username': 'admin', 'password': 'admin123'}}
+    if tipo == 'formulario_municipio':
+        return {'data': {'nombre': f"Municipio {secuencia}", 'codigo': f"M{secuencia:03d}"}}
+    if tipo == 'formulario_municipio_edicion':
+        return {'data': {'nombre': f"Municipio {secuencia}", 'codigo': f"E{secuencia:03d}", 'activo': 'on'}}
+    if tipo == 'json_nuevo':
+        return {'json': datos}
+    if tipo == 'ndjson_masivo':
+        filas = [json.dumps({**datos, 'curp': f"MAS{secuencia:04d}{indice:03d}HAGSXX00"}) for indice in range(20)]
+        return {'data': '\n'.join(filas), 'content_type': 'application/x-ndjson'}
+    return {}
+
+@pytest.mark.parametrize('tickets', [30, 300])
+def test_rutas_dentro_de_su_presupuesto(app, tickets):
+    from benchmarks.datos import sembrar_tickets
+    
+    catalogo_municipios.intervalo = cache_usuarios.intervalo = cache_usuarios.ttl = 3600
+    with app.app_context():
+        sembrar_tickets(tickets)
+        contexto = preparar_contexto()
+        motor = db.engine
+    
+    publico = app.test_client()
+    admin = app.test_client()
+    publico.get('/')
+    admin.post('/auth/login', data={'username': 'admin', 'password': 'admin123'})
+    admin.get('/auth/login')
+    
+    contador = Contador()
+    event.listen(motor, 'before_cursor_execute', contador.sentencia)
+    event.listen(db.Model, 'load', contador.fila, propagate=True)
+    fallas = []
+    try:
+        for secuencia, (endpoint, metodo, url, cuerpo, es_admin, estado, max_consultas, max_filas) in enumerate(PRESUPUESTOS, 1):
+            cliente = admin if es_admin else publico
+            opciones = construir_cuerpo(cuerpo, contexto, secuencia) if cuerpo else {}
+            
+            contador.reiniciar()
+            respuesta = cliente.open(url.format(**contexto), method=metodo, **opciones)
+            respuesta.close()
+            
+            problemas = []
+            if respuesta.status_code != estado:
+                problemas.append(f"estado {respuesta.status_code} != {estado}")
+            destino = REDIRECCIONES.get((endpoint, metodo))
+            if destino and not urlparse(respuesta.location or '').path.startswith(destino):
+                problemas.append(f"redirige a {respuesta.location} en lugar de {destino}")
+            if len(contador.sentencias) > max_consultas:
+                problemas.append(f"{len(contador.sentencias)} consultas > {max_consultas}: " + ' | '.join(
+                    ' '.join(sentencia.split())[:200] for sentencia in contador.sentencias
+                ))
+            if contador.filas > max_filas:
+                problemas.append(f"{contador.filas} filas > {max_filas}")
+            if problemas:
+                fallas.append(f"{metodo} {url} ({endpoint}): {'; '.join(problemas)}")
+    finally:
+        event.remove(motor, 'before_cursor_execute', contador.sentencia)
+        event.remove(db.Model, 'load', contador.fila)
+    
+    assert not fallas, '\n'.join(fallas)
+
+def test_todas_las_rutas_tienen_presupuesto(app):
+    cubiertos = {(endpoint, metodo) for endpoint, metodo, *_ in PRESUPUESTOS}
+    sin_presupuesto = sorted(
+        (regla.endpoint, metodo)
+        for regla in app.url_map.iter_rules()
+        if regla.endpoint.split('.')[0] in ('main', 'auth', 'api')
+        for metodo in regla.methods - {'HEAD', 'OPTIONS'}
+        if (regla.endpoint, metodo) not in cubiertos
+    )
+    
+    assert not sin_presupuesto
\ No newline at end of file
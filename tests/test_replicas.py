@@ -0,0 +1,56 @@
+import pytest
+from flask import g
+from sqlalchemy import create_engine
+from config import Config
+from app.models import db, Municipio, Ticket
+from app.utils.replicas import enrutador_replicas
+
+def _ticket(curp, numero_turno):
+    return {
+        'curp': curp, 'nombre': 'Ana', 'apellido_paterno': 'Ruiz', 'apellido_materno': 'Diaz',
+        'telefono': '4490000000', 'email': 'ana@turnos.mx', 'municipio_id': 1, 'numero_turno': numero_turno
+    }
+
+@pytest.fixture(autouse=True)
+def configurar_replica(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DATABASE_REPLICA_URLS', [f"sqlite:///{tmp_path / 'replica.db'}"])
+
+@pytest.fixture
+def replica(app):
+    motor = enrutador_replicas.motores[0]
+    db.metadata.create_all(motor)
+    with motor.begin() as conexion:
+        conexion.execute(Municipio.__table__.insert(), [
+            {'id': 1, 'nombre': 'Aguascalientes', 'codigo': 'AGS', 'activo': True},
+            {'id': 2, 'nombre': 'Calvillo', 'codigo': 'CAL', 'activo': True}
+        ])
+        conexion.execute(Ticket.__table__.insert(), [_ticket('REPL000000HAGSXX01', 1)])
+    return motor
+
+def _curps(cliente):
+    respuesta = cliente.get('/api/tickets')
+    assert respuesta.status_code == 200
+    return [ticket['curp'] for ticket in respuesta.get_json()]
+
+def test_lecturas_de_solo_lectura_van_a_la_replica(replica, cliente):
+    assert _curps(cliente) == ['REPL000000HAGSXX01']
+
+def test_lecturas_tras_escribir_en_la_misma_peticion_van_a_la_primaria(app, replica):
+    with app.test_request_context('/api/tickets'):
+        g.solo_lectura = True
+        assert [ticket.curp for ticket in Ticket.query] == ['REPL000000HAGSXX01']
+        
+        db.session.execute(Ticket.__table__.insert(), [_ticket('PRIM000000HAGSXX01', 1)])
+        assert [ticket.curp for ticket in Ticket.query] == ['PRIM000000HAGSXX01']
+        db.session.rollback()
+
+def test_lecturas_tras_confirmar_van_a_la_primaria(replica, cliente):
+    assert cliente.post('/api/tickets', json=_ticket('PRIM000000HAGSXX01', None)).status_code == 201
+    
+    assert _curps(cliente) == ['PRIM000000HAGSXX01']
+
+def test_replica_caida_lee_de_la_primaria(app, cliente, tmp_path):
+    enrutador_replicas.motores[0] = create_engine(f"sqlite:///{tmp_path / 'no' / 'existe.db'}")
+    
+    assert _curps(cliente) == []
+    assert enrutador_replicas.estado()[0]['disponible'] is False
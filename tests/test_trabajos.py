@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from app.models import db, Trabajo
+from app.utils.admision import control_admision
+from app.utils.trabajos import TAREAS, cola_trabajos
+from conftest import sembrar_tickets
+
+def _ejecutar(app):
+    with app.app_context():
+        return cola_trabajos.ejecutar_pendientes()
+
+def test_exportacion_solo_visible_para_administradores(app, admin):
+    sembrar_tickets(app, 2)
+    trabajo_id = admin.get('/admin/comprobantes/exportar?async=1&formato=zip').get_json()['id']
+    assert _ejecutar(app) == 1
+    
+    anonimo = app.test_client()
+    assert anonimo.get(f"/api/jobs/{trabajo_id}").status_code == 404
+    assert anonimo.get(f"/api/jobs/{trabajo_id}/resultado").status_code == 404
+    
+    assert admin.get(f"/api/jobs/{trabajo_id}").get_json()['estado'] == 'Completado'
+    respuesta = admin.get(f"/api/jobs/{trabajo_id}/resultado")
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == 'application/zip'
+
+def test_latido_evita_que_otro_trabajador_lo_reclame(app):
+    app.config.update(TRABAJOS_LATIDO=0.1, TRABAJOS_TIMEOUT=1)
+    TAREAS['prueba_lenta'] = lambda parametros, directorio: time.sleep(1.5) or {}
+    try:
+        with app.app_context():
+            trabajo_id = cola_trabajos.encolar('prueba_lenta', {}).id
+        
+        hilo = threading.Thread(target=_ejecutar, args=(app,))
+        hilo.start()
+        time.sleep(1.2)
+        with app.app_context():
+            assert cola_trabajos._reclamar() is None
+        hilo.join()
+        
+        with app.app_context():
+            trabajo = db.session.get(Trabajo, trabajo_id)
+            assert (trabajo.estado, trabajo.intentos) == ('Completado', 1)
+    finally:
+        del TAREAS['prueba_lenta']
+
+def test_resultado_de_un_arrendamiento_perdido_se_descarta(app):
+    with app.app_context():
+        trabajo = cola_trabajos.encolar('comprobante', {'ticket_id': 1})
+        trabajo_id = trabajo.id
+        db.session.query(Trabajo).filter(Trabajo.id == trabajo_id).update({Trabajo.intentos: 5})
+        db.session.commit()
+        
+        assert not cola_trabajos._arrendado(trabajo_id, 1).update({Trabajo.estado: 'Completado'})
+        db.session.rollback()
+        assert db.session.get(Trabajo, trabajo_id).estado == 'Pendiente'
+
+def test_purgar_elimina_trabajos_vencidos_y_sus_archivos(app, admin):
+    sembrar_tickets(app, 1)
+    viejo = admin.get('/comprobante/1?async=1').get_json()['id']
+    reciente = admin.get('/comprobante/1?async=1').get_json()['id']
+    assert _ejecutar(app) == 2
+    
+    with app.app_context():
+        archivo = json.loads(db.session.get(Trabajo, viejo).resultado)['archivo']
+        db.session.query(Trabajo).filter(Trabajo.id == viejo).update(
+            {Trabajo.fecha_actualizacion: datetime.utcnow() - timedelta(days=2)}
+        )
+        db.session.commit()
+        
+        assert cola_trabajos.purgar() == 1
+        assert db.session.get(Trabajo, viejo) is None
+        assert db.session.get(Trabajo, reciente) is not None
+    
+    assert not os.path.exists(archivo)
+
+def test_comprobantes_asincronos_limitados_por_cliente(app, cliente):
+    sembrar_tickets(app, 1)
+    control_admision.activo = True
+    control_admision.rafaga = 2
+    
+    estados = [cliente.get('/comprobante/1?async=1').status_code for _ in range(3)]
+    
+    assert estados == [202, 202, 429]
+    with app.app_context():
+        assert Trabajo.query.count() == 2
\ No newline at end of file
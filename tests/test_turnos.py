@@ -0,0 +1,92 @@
+import random
+import threading
+from app.models import db, ContadorTurno
+from app.utils.turno_manager import TurnoManager
+
+HILOS = 8
+RESERVAS_POR_HILO = 25
+
+def test_reservas_concurrentes_sin_colisiones(app):
+    turno_manager = TurnoManager()
+    rangos = []
+    errores = []
+    lock = threading.Lock()
+    barrera = threading.Barrier(HILOS)
+    
+    def reservar(semilla):
+        generador = random.Random(semilla)
+        barrera.wait()
+        for _ in range(RESERVAS_POR_HILO):
+            cantidad = generador.randint(1, 3)
+            with app.app_context():
+                try:
+                    primero = turno_manager.reservar_turnos(1, cantidad)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    with lock:
+                        errores.append(e)
+                    continue
+            with lock:
+                rangos.append((primero, cantidad))
+    
+    hilos = [threading.Thread(target=reservar, args=(semilla,)) for semilla in range(HILOS)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    
+    assert not errores
+    assert len(rangos) == HILOS * RESERVAS_POR_HILO
+    
+    turnos = [primero + desplazamiento for primero, cantidad in rangos for desplazamiento in range(cantidad)]
+    assert len(turnos) == len(set(turnos))
+    assert sorted(turnos) == list(range(1, len(turnos) + 1))
+    
+    with app.app_context():
+        assert db.session.get(ContadorTurno, 1).ultimo_turno == len(turnos)
+
+def test_contador_continua_desde_tickets_existentes(app):
+    from app.models import Ticket
+    
+    with app.app_context():
+        db.session.add(Ticket(
+            curp='AAAA000000HAGSXX01', nombre='Juan', apellido_paterno='Perez', apellido_materno='Lopez',
+            telefono='4490000000', email='juan@turnos.mx', municipio_id=2, numero_turno=41
+        ))
+        db.session.commit()
+        db.session.execute(ContadorTurno.__table__.delete())
+        db.session.commit()
+        
+        assert TurnoManager().reservar_turnos(2, 3) == 42
+        assert TurnoManager().obtener_siguiente_turno(2) == 45
+
+def test_curp_duplicada_por_codigo_y_consulta(app, cliente):
+    datos = {
+        'curp': 'DUPL000000HAGSXX01', 'nombre': 'Ana', 'apellido_paterno': 'Ruiz', 'apellido_materno': 'Diaz',
+        'telefono': '4490000000', 'email': 'ana@turnos.mx', 'municipio_id': 1
+    }
+    assert cliente.post('/api/tickets', json=datos).status_code == 201
+    
+    respuesta = cliente.post('/api/tickets', json=datos)
+    assert respuesta.status_code == 400
+    assert 'CURP' in respuesta.get_json()['error']
+    
+    assert cliente.post('/api/tickets', json=dict(datos, municipio_id=2)).status_code == 201
+
+def test_otra_violacion_no_es_curp_duplicada(app):
+    import sqlite3
+    from sqlalchemy.exc import IntegrityError
+    
+    with app.app_context():
+        turno_manager = TurnoManager()
+        error = IntegrityError('INSERT', {}, sqlite3.IntegrityError('NOT NULL constraint failed: tickets.nombre'))
+        assert not turno_manager.es_curp_duplicada(error, 1, 'NADIE000000HAGSXX01')
+
+def test_crear_indices_omite_los_de_otro_motor(app):
+    resultado = app.test_cli_runner().invoke(args=['crear-indices'])
+    
+    assert resultado.exit_code == 0
+    assert '⏭️  tickets.ft_tickets_busqueda: solo aplica en mysql, omitido' in resultado.output
+    assert '✅ tickets.ft_tickets_busqueda' not in resultado.output
+    assert '✅ tickets.uq_municipio_curp' in resultado.output
\ No newline at end of file
@@ -0,0 +1,37 @@
+import threading
+from app.models import db, Usuario
+from app.utils.cache_usuarios import cache_usuarios
+
+def _obtener(app, resultado=None):
+    with app.app_context():
+        usuario = cache_usuarios.obtener(1)
+    if resultado is not None:
+        resultado.append(usuario)
+    return usuario
+
+def test_lectura_antes_del_commit_no_conserva_al_usuario_desactivado(app):
+    with app.app_context():
+        db.session.get(Usuario, 1).activo = False
+        db.session.flush()
+        
+        leidos = []
+        lector = threading.Thread(target=_obtener, args=(app, leidos))
+        lector.start()
+        lector.join()
+        assert leidos[0].activo
+        
+        db.session.commit()
+    
+    assert _obtener(app) is None
+
+def test_rollback_no_invalida_la_entrada(app):
+    assert _obtener(app).activo
+    
+    with app.app_context():
+        db.session.get(Usuario, 1).activo = False
+        db.session.flush()
+        db.session.rollback()
+    
+    hits = cache_usuarios.estadisticas()['hits']
+    assert _obtener(app).activo
+    assert cache_usuarios.estadisticas()['hits'] == hits + 1
\ No newline at end of file
@@ -0,0 +1,79 @@
+import json
+from datetime import datetime, timedelta
+from conftest import sembrar_tickets
+from app import routes
+from app.models import db, Evento, Municipio, Ticket
+from app.utils.catalogo import catalogo_municipios
+
+def _etag(cliente):
+    respuesta = cliente.get('/api/tickets')
+    assert respuesta.status_code == 200
+    return respuesta.headers['ETag']
+
+def _sin_cambios(cliente, etag):
+    return cliente.get('/api/tickets', headers={'If-None-Match': etag}).status_code == 304
+
+def _etag_grafica(cliente):
+    respuesta = cliente.get('/admin/graficas/municipios.svg')
+    assert respuesta.status_code == 200
+    return respuesta.headers['ETag']
+
+def test_etag_cambia_al_confirmar_y_no_con_rollback(app, cliente):
+    sembrar_tickets(app, 2)
+    etag = _etag(cliente)
+    assert _sin_cambios(cliente, etag)
+    
+    with app.app_context():
+        Ticket.query.filter_by(numero_turno=1).one().estatus = 'Resuelto'
+        db.session.flush()
+        db.session.rollback()
+    assert _sin_cambios(cliente, etag)
+    
+    with app.app_context():
+        Ticket.query.filter_by(numero_turno=1).one().estatus = 'Resuelto'
+        db.session.commit()
+    assert not _sin_cambios(cliente, etag)
+
+def test_etag_no_depende_del_mayor_id_de_eventos(app, cliente):
+    sembrar_tickets(app, 1)
+    with app.app_context():
+        # Evento de otra transacción que se confirmó antes con un id mayor
+        db.session.execute(Evento.__table__.insert().values(
+            id=1000, tipo='ticket_actualizado', ticket_id=1, municipio_id=1,
+            datos=json.dumps({'estatus': 'Pendiente'}), fecha=datetime.utcnow()
+        ))
+        db.session.commit()
+    etag = _etag(cliente)
+    
+    with app.app_context():
+        # La transacción que tomó un id menor confirma después
+        db.session.execute(Ticket.__table__.update().where(Ticket.id == 1).values(nombre='Beatriz'))
+        db.session.execute(Evento.__table__.insert().values(
+            id=999, tipo='ticket_actualizado', ticket_id=1, municipio_id=1,
+            datos=json.dumps({'estatus': 'Pendiente'}), fecha=datetime.utcnow()
+        ))
+        db.session.info['tickets_modificados'] = True
+        db.session.commit()
+    
+    assert not _sin_cambios(cliente, etag)
+
+
+def test_etag_de_graficas_incluye_catalogo_y_fecha(app, admin, monkeypatch):
+    sembrar_tickets(app, 1)
+    etag = _etag_grafica(admin)
+    assert _etag_grafica(admin) == etag
+    
+    with app.app_context():
+        db.session.get(Municipio, 1).nombre = 'Aguascalientes Centro'
+        catalogo_municipios.invalidar()
+        db.session.commit()
+    renombrado = _etag_grafica(admin)
+    assert renombrado != etag
+    
+    class Manana(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.utcnow() + timedelta(days=1)
+    
+    monkeypatch.setattr(routes, 'datetime', Manana)
+    assert _etag_grafica(admin) != renombrado
\ No newline at end of file